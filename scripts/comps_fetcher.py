@@ -17,6 +17,11 @@ try:
 except ImportError:
     YFINANCE_AVAILABLE = False
 
+try:
+    from scripts import fetch_metrics
+except ImportError:
+    import fetch_metrics
+
 
 def _fetch_market_cap(ticker_str):
     """Fetch market cap for a single ticker via yfinance.
@@ -30,7 +35,8 @@ def _fetch_market_cap(ticker_str):
 
     try:
         tkr = yf.Ticker(ticker_str)
-        info = tkr.info
+        with fetch_metrics.timer("latency.yfinance.info"):
+            info = tkr.info
 
         mkt_cap = info.get("marketCap")
         if mkt_cap and mkt_cap > 0:
@@ -0,0 +1,939 @@
+"""
+edinet_cache.py - On-disk cache for EDINET API responses.
+
+Every documents.json?date=...&type=2 response lists ALL filings submitted on
+that date, for every filer. edinet_fetcher.py only needs one secCode at a time,
+so without a cache the same listing is re-requested for every ticker, every
+search path (annual / interim / tanshin) and every run.
+
+Listing cache layout (one gzip-compressed JSON file per submission date):
+    tmp/edinet_cache/listings/2025/2025-06-25.json.gz
+        {"date": "2025-06-25", "fetched_at": "2025-06-26T08:00:00", "results": [...]}
+
+Freshness rules:
+  - A listing fetched AFTER its date has ended is final (EDINET does not add
+    filings to a past date), so it never expires.
+  - A listing fetched on the same day (i.e. today's listing) is still growing,
+    and is only reused within LISTING_TODAY_TTL_SEC.
+
+Package store: tmp/edinet_data/{docID} keeps only the instance document(s) of a
+package, compressed (zstd when the `zstandard` package is installed, else gzip)
+and decompressed on read, together with a checksummed manifest, so a docID is
+only downloaded once. The store is bounded by a byte budget
+(EDINET_STORE_MAX_BYTES, default 2 GiB); least recently read packages are
+evicted first.
+
+Extraction cache: tmp/edinet_cache/extracted/{docID}.{source}.json.gz keeps the
+financial data extracted from each filing (and the docID it amends, if any), so
+a rerun only parses filings it has not seen — e.g. a newly filed correction.
+
+Fact cache: tmp/edinet_cache/facts.sqlite keeps the normalised facts and
+contexts of every parsed instance document, keyed by the SHA-256 of its bytes
+and the parser's fact-cache version, so re-extracting a known document (another
+extraction version, a forecast scan over the store) never parses XML again.
+
+Concurrent runs sharing the cache coordinate through per-resource file locks
+(cache_lock): the first process fetches a listing or package, the others wait
+and reuse what it stored.
+
+The cache root can be moved with the EDINET_CACHE_DIR environment variable.
+
+Usage:
+    python scripts/edinet_cache.py inspect            # store / listing cache usage
+    python scripts/edinet_cache.py gc --max-bytes 500M
+    python scripts/edinet_cache.py gc --compact       # shrink fully extracted packages
+"""
+
+import os
+import re
+import gzip
+import json
+import shutil
+import sqlite3
+import hashlib
+import logging
+import time
+import threading
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# CONSTANTS
+# =====================================================================
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "tmp", "edinet_cache"
+)
+
+# Today's listing keeps growing during the day — reuse it for 15 minutes only
+LISTING_TODAY_TTL_SEC = 15 * 60
+
+DEFAULT_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "tmp", "edinet_data"
+)
+
+# Byte budget of the package store (override with EDINET_STORE_MAX_BYTES)
+DEFAULT_STORE_MAX_BYTES = 2 * 1024 ** 3
+
+# Download files in the store root: {docID}.type{N}.zip, plus {zip}.part while
+# in flight. Left behind by interrupted runs, they count against the budget.
+_DOWNLOAD_FILE_RE = re.compile(r"^(?P<doc_id>[^.]+)\.type(?P<type>\d+)\.zip(?:\.part)?$")
+
+# Package directory a download lands in, by download type ({docID}{suffix})
+_DOWNLOAD_PACKAGE_SUFFIX = {"5": "_csv"}
+
+# Cross-process locks: how long to wait for another process's fetch, and how
+# often to re-try the lock meanwhile
+DEFAULT_LOCK_TIMEOUT_SEC = 600
+LOCK_POLL_SEC = 0.1
+
+# Fact cache database inside the cache root
+FACT_CACHE_FILENAME = "facts.sqlite"
+
+# Compression of stored instance documents
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 6
+
+
+# =====================================================================
+# PATHS
+# =====================================================================
+def get_cache_dir(cache_dir=None):
+    """Resolve the cache root (argument > EDINET_CACHE_DIR > tmp/edinet_cache)."""
+    root = cache_dir or os.environ.get("EDINET_CACHE_DIR") or DEFAULT_CACHE_DIR
+    return os.path.abspath(root)
+
+
+def _extraction_path(doc_id, source, cache_dir=None):
+    return os.path.join(get_cache_dir(cache_dir), "extracted", f"{doc_id}.{source}.json.gz")
+
+
+def _listing_path(target_date, cache_dir=None):
+    date_str = target_date.strftime("%Y-%m-%d")
+    return os.path.join(get_cache_dir(cache_dir), "listings",
+                        date_str[:4], f"{date_str}.json.gz")
+
+
+# =====================================================================
+# CROSS-PROCESS LOCKS
+# =====================================================================
+class CacheLockTimeout(TimeoutError):
+    """Raised when a cache lock is still held by another process after the timeout."""
+
+
+def _try_lock(f):
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def cache_lock(name, timeout=DEFAULT_LOCK_TIMEOUT_SEC, cache_dir=None):
+    """Hold an exclusive, cross-process lock on a named cache resource.
+
+    Lock files live under {cache root}/locks/ and are released by the OS if
+    the holder dies, so a crashed run never leaves a stale lock. Separate
+    threads of one process exclude each other as well.
+
+    Args:
+        name: Resource key, e.g. "listing-2025-06-25" (file-name safe).
+        timeout: Seconds to wait for the lock.
+        cache_dir: Optional cache root override.
+
+    Yields:
+        bool: True if another holder had to be waited for — the caller should
+        re-check the cache before doing the work itself.
+
+    Raises:
+        CacheLockTimeout: If the lock could not be taken within `timeout`.
+    """
+    path = os.path.join(get_cache_dir(cache_dir), "locks", f"{name}.lock")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+b") as f:
+        deadline = time.monotonic() + timeout
+        waited = False
+        while not _try_lock(f):
+            if time.monotonic() >= deadline:
+                raise CacheLockTimeout(f"Timed out after {timeout:.0f}s waiting for {path}")
+            waited = True
+            time.sleep(LOCK_POLL_SEC)
+        try:
+            yield waited
+        finally:
+            _unlock(f)
+
+
+def package_lock_name(extract_dir):
+    """cache_lock() name of one package directory of a package store.
+
+    Keyed by the store path and the directory name, so that every writer of
+    the package (edinet_fetcher downloads) and gc_store() take the same lock.
+    """
+    extract_dir = os.path.abspath(extract_dir)
+    store_key = hashlib.sha1(os.path.dirname(extract_dir).encode("utf-8")).hexdigest()[:8]
+    return f"package-{store_key}-{os.path.basename(extract_dir)}"
+
+
+# =====================================================================
+# LISTING CACHE
+# =====================================================================
+def load_listing(target_date, cache_dir=None, now=None):
+    """Return the cached documents.json `results` for a date, or None on miss.
+
+    Args:
+        target_date: datetime.date of the submission date.
+        cache_dir: Optional cache root override.
+        now: Optional datetime for freshness checks (default: datetime.now()).
+
+    Returns:
+        list[dict]: Raw EDINET result rows for that date, or None if the date
+        is not cached or the cached copy is stale.
+    """
+    path = _listing_path(target_date, cache_dir)
+    if not os.path.isfile(path):
+        return None
+
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Corrupt listing cache %s (%s), ignoring.", path, e)
+        return None
+
+    now = now or datetime.now()
+    try:
+        fetched_at = datetime.fromisoformat(payload.get("fetched_at", ""))
+    except ValueError:
+        return None
+
+    if fetched_at.date() <= target_date:
+        # Fetched while the date was still open — apply the short TTL
+        if (now - fetched_at).total_seconds() > LISTING_TODAY_TTL_SEC:
+            return None
+
+    return payload.get("results", [])
+
+
+def save_listing(target_date, results, cache_dir=None, now=None):
+    """Store a documents.json `results` array for a date.
+
+    Writes to a temporary file first and renames it into place so a crashed
+    run never leaves a truncated listing behind.
+    """
+    path = _listing_path(target_date, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    payload = {
+        "date": target_date.strftime("%Y-%m-%d"),
+        "fetched_at": (now or datetime.now()).isoformat(timespec="seconds"),
+        "results": results,
+    }
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# =====================================================================
+# PACKAGE CACHE
+# =====================================================================
+# A published docID never changes, so a stored package is cached until it is
+# evicted. Each tmp/edinet_data/{docID}/ directory carries a manifest with the
+# size and SHA-256 of its XBRL/iXBRL files; a package is only reused if every
+# listed file is still present and intact. The manifest's mtime doubles as the
+# package's last-access time for LRU eviction.
+PACKAGE_MANIFEST_NAME = ".manifest.json"
+
+STORE_CODECS = ("zstd", "gzip")
+_CODEC_SUFFIX = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _default_codec():
+    return "zstd" if ZSTD_AVAILABLE else "gzip"
+
+
+def _compress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def _decompress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _write_manifest(extract_dir, doc_id, entries):
+    manifest = {
+        "doc_id": doc_id,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "files": entries,
+    }
+    path = os.path.join(extract_dir, PACKAGE_MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(extract_dir):
+    path = os.path.join(extract_dir, PACKAGE_MANIFEST_NAME)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Corrupt package manifest %s (%s), ignoring.", path, e)
+        return None
+
+
+def _touch(extract_dir):
+    """Mark a package as just used (LRU clock)."""
+    try:
+        os.utime(os.path.join(extract_dir, PACKAGE_MANIFEST_NAME))
+    except OSError:
+        pass
+
+
+def write_package_manifest(extract_dir, doc_id, xbrl_files):
+    """Record the XBRL files of a fully extracted package.
+
+    Args:
+        extract_dir: Root of the extracted package (tmp/edinet_data/{docID}).
+        doc_id: EDINET document ID.
+        xbrl_files: Absolute paths returned by the extraction step.
+    """
+    _write_manifest(extract_dir, doc_id, [
+        {
+            "path": os.path.relpath(path, extract_dir),
+            "size": os.path.getsize(path),
+            "sha256": _sha256_file(path),
+        }
+        for path in xbrl_files
+    ])
+
+
+def load_package(extract_dir):
+    """Return the cached XBRL file list of a fully extracted package, or None.
+
+    A package is valid only if its manifest exists and every listed file
+    matches the recorded size and SHA-256. Compressed packages written by
+    store_members() are not returned (their files cannot be opened directly);
+    use read_package() for those.
+    """
+    manifest = _read_manifest(extract_dir)
+    if manifest is None:
+        return None
+
+    xbrl_files = []
+    for entry in manifest.get("files", []):
+        if entry.get("codec"):
+            return None
+        fpath = os.path.join(extract_dir, entry["path"])
+        if (not os.path.isfile(fpath)
+                or os.path.getsize(fpath) != entry["size"]
+                or _sha256_file(fpath) != entry["sha256"]):
+            logger.warning("Cached package %s failed verification (%s).",
+                           extract_dir, entry["path"])
+            return None
+        xbrl_files.append(os.path.abspath(fpath))
+
+    if xbrl_files:
+        _touch(extract_dir)
+    return xbrl_files if xbrl_files else None
+
+
+def store_members(extract_dir, doc_id, contents, codec=None):
+    """Store selected (name, bytes) package members compressed under extract_dir.
+
+    Replaces whatever was stored for the package before. Each member is written
+    as {package-relative path}.zst (or .gz) and recorded in the manifest with
+    its uncompressed size and SHA-256.
+
+    Args:
+        extract_dir: Package directory (tmp/edinet_data/{docID}).
+        doc_id: EDINET document ID.
+        contents: Iterable of (package-relative name, bytes).
+        codec: "zstd" or "gzip" (default: zstd if installed, else gzip).
+
+    Returns:
+        list[str]: Absolute paths of the written (compressed) files.
+    """
+    codec = codec or _default_codec()
+    extract_dir = os.path.abspath(extract_dir)
+    if os.path.exists(extract_dir):
+        shutil.rmtree(extract_dir)
+
+    stored, entries = [], []
+    for name, data in contents:
+        rel = os.path.join(*name.split("/"))
+        dest = os.path.abspath(os.path.join(extract_dir, rel + _CODEC_SUFFIX[codec]))
+        if not dest.startswith(extract_dir + os.sep):
+            continue  # never write outside the package directory
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(dest, "wb") as f:
+            f.write(_compress(data, codec))
+        stored.append(dest)
+        entries.append({
+            "path": rel,
+            "stored": os.path.relpath(dest, extract_dir),
+            "codec": codec,
+            "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        })
+    _write_manifest(extract_dir, doc_id, entries)
+    return stored
+
+
+def read_package(extract_dir, touch=True):
+    """Return the verified (name, bytes) members of a stored package, or None.
+
+    Works for both compressed packages (store_members) and fully extracted ones
+    (write_package_manifest); names are package-relative paths without the
+    compression suffix. Any missing, undecodable or mismatching member makes
+    the whole package a miss.
+
+    Args:
+        extract_dir: Package directory (tmp/edinet_data/{docID}).
+        touch: Count this read as a use for LRU eviction (False for scans).
+    """
+    manifest = _read_manifest(extract_dir)
+    if manifest is None:
+        return None
+
+    members = []
+    for entry in manifest.get("files", []):
+        codec = entry.get("codec")
+        fpath = os.path.join(extract_dir, entry.get("stored", entry["path"]))
+        if codec == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("Cached package %s is zstd-compressed but zstandard is "
+                           "not installed.", extract_dir)
+            return None
+        try:
+            with open(fpath, "rb") as f:
+                data = f.read()
+            if codec:
+                data = _decompress(data, codec)
+        except Exception as e:  # OSError, EOFError, zstandard.ZstdError
+            logger.warning("Cached package %s unreadable (%s: %s).", extract_dir, entry["path"], e)
+            return None
+        if len(data) != entry["size"] or hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            logger.warning("Cached package %s failed verification (%s).",
+                           extract_dir, entry["path"])
+            return None
+        members.append((entry["path"].replace(os.sep, "/"), data))
+
+    if members and touch:
+        _touch(extract_dir)
+    return members if members else None
+
+
+# =====================================================================
+# EXTRACTION CACHE
+# =====================================================================
+# Like packages, a docID's facts never change; a correction is a new docID that
+# names the original as its parent. Entries are tagged with the caller's
+# extraction version so a parser change invalidates them.
+def load_extraction(doc_id, source, version, cache_dir=None):
+    """Return the cached extraction result of a docID, or None on miss.
+
+    Args:
+        doc_id: EDINET docID.
+        source: Parse source the result was extracted from ("xbrl" / "csv").
+        version: Extraction version the caller expects.
+
+    Returns:
+        The stored result (JSON types, objects as OrderedDict), or None if
+        absent, unreadable or of another version.
+    """
+    path = _extraction_path(doc_id, source, cache_dir)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f, object_pairs_hook=OrderedDict)
+    except (OSError, ValueError) as e:
+        logger.warning("Corrupt extraction cache %s (%s), ignoring.", path, e)
+        return None
+    if payload.get("version") != version:
+        return None
+    return payload.get("result")
+
+
+def save_extraction(doc_id, source, version, result, parent_doc_id=None, cache_dir=None):
+    """Store the extraction result of a docID (atomically, like save_listing).
+
+    Args:
+        result: JSON-serialisable extraction output.
+        parent_doc_id: docID this filing amends, for corrected reports.
+    """
+    path = _extraction_path(doc_id, source, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {
+        "doc_id": doc_id,
+        "parent_doc_id": parent_doc_id,
+        "source": source,
+        "version": version,
+        "extracted_at": datetime.now().isoformat(timespec="seconds"),
+        "result": result,
+    }
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# =====================================================================
+# FACT CACHE
+# =====================================================================
+# One row per (instance content hash, kind); its numeric facts, first texts and
+# contexts hang off the document's rowid. A version mismatch is a miss, and the
+# next save replaces the stale rows.
+_FACT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fact_documents (
+    id           INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    kind         TEXT NOT NULL,
+    version      INTEGER NOT NULL,
+    created_at   TEXT NOT NULL,
+    UNIQUE (content_hash, kind)
+);
+CREATE TABLE IF NOT EXISTS facts (
+    document_id INTEGER NOT NULL,
+    local_name  TEXT NOT NULL,
+    context_id  TEXT NOT NULL,
+    value       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_facts_document ON facts(document_id);
+CREATE TABLE IF NOT EXISTS fact_texts (
+    document_id INTEGER NOT NULL,
+    local_name  TEXT NOT NULL,
+    text        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_fact_texts_document ON fact_texts(document_id);
+CREATE TABLE IF NOT EXISTS fact_contexts (
+    document_id  INTEGER NOT NULL,
+    seq          INTEGER NOT NULL,
+    context_id   TEXT NOT NULL,
+    start_date   TEXT,
+    end_date     TEXT,
+    instant      TEXT,
+    dims         TEXT NOT NULL,
+    has_scenario INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fact_contexts_document ON fact_contexts(document_id);
+"""
+
+
+def get_fact_cache_path(cache_dir=None):
+    """Path of the fact cache database inside the cache root."""
+    return os.path.join(get_cache_dir(cache_dir), FACT_CACHE_FILENAME)
+
+
+def _connect_facts(cache_dir=None):
+    path = get_fact_cache_path(cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.executescript(_FACT_SCHEMA)
+    return conn
+
+
+def load_facts(content_hash, kind, version, cache_dir=None):
+    """Return the cached facts of an instance document, or None on miss.
+
+    Args:
+        content_hash: SHA-256 hex digest of the document bytes.
+        kind: "xbrl" (instance) or "csv" (XBRL-to-CSV file).
+        version: Fact-cache version the caller expects.
+
+    Returns:
+        tuple: (numbers, texts, contexts) as stored by save_facts() — numbers
+        as ((local_name, context_id), value) pairs, texts as (local_name, text)
+        pairs and contexts as (context_id, period, dims, has_scenario) tuples
+        in document order — or None if absent, of another version or
+        unreadable.
+    """
+    try:
+        with closing(_connect_facts(cache_dir)) as conn:
+            row = conn.execute(
+                "SELECT id, version FROM fact_documents WHERE content_hash = ? AND kind = ?",
+                (content_hash, kind)).fetchone()
+            if row is None or row[1] != version:
+                return None
+            doc = row[0]
+            numbers = [((local, ctx), value) for local, ctx, value in conn.execute(
+                "SELECT local_name, context_id, value FROM facts WHERE document_id = ?",
+                (doc,))]
+            texts = conn.execute(
+                "SELECT local_name, text FROM fact_texts WHERE document_id = ?",
+                (doc,)).fetchall()
+            contexts = []
+            for ctx_id, start, end, instant, dims, has_scenario in conn.execute(
+                    "SELECT context_id, start_date, end_date, instant, dims, has_scenario "
+                    "FROM fact_contexts WHERE document_id = ? ORDER BY seq", (doc,)):
+                period = {k: v for k, v in (("start", start), ("end", end),
+                                            ("instant", instant)) if v}
+                contexts.append((ctx_id, period,
+                                 json.loads(dims, object_pairs_hook=OrderedDict),
+                                 bool(has_scenario)))
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning("Unreadable fact cache %s (%s), ignoring.",
+                       get_fact_cache_path(cache_dir), e)
+        return None
+    return numbers, texts, contexts
+
+
+def save_facts(content_hash, kind, version, numbers, texts, contexts, cache_dir=None):
+    """Store the facts of an instance document, replacing any older version.
+
+    Args:
+        numbers: Iterable of ((local_name, context_id), value) pairs.
+        texts: Iterable of (local_name, text) pairs.
+        contexts: Iterable of (context_id, period, dims, has_scenario), with
+                  period as {"instant": d} / {"start": s, "end": e} and dims
+                  as {dimension: member}.
+    """
+    try:
+        with closing(_connect_facts(cache_dir)) as conn, conn:
+            conn.execute("DELETE FROM facts WHERE document_id IN (SELECT id FROM fact_documents "
+                         "WHERE content_hash = ? AND kind = ?)", (content_hash, kind))
+            conn.execute("DELETE FROM fact_texts WHERE document_id IN (SELECT id FROM "
+                         "fact_documents WHERE content_hash = ? AND kind = ?)",
+                         (content_hash, kind))
+            conn.execute("DELETE FROM fact_contexts WHERE document_id IN (SELECT id FROM "
+                         "fact_documents WHERE content_hash = ? AND kind = ?)",
+                         (content_hash, kind))
+            conn.execute("DELETE FROM fact_documents WHERE content_hash = ? AND kind = ?",
+                         (content_hash, kind))
+            doc = conn.execute(
+                "INSERT INTO fact_documents (content_hash, kind, version, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (content_hash, kind, version,
+                 datetime.now().isoformat(timespec="seconds"))).lastrowid
+            conn.executemany(
+                "INSERT INTO facts (document_id, local_name, context_id, value) "
+                "VALUES (?, ?, ?, ?)",
+                ((doc, local, ctx, value) for (local, ctx), value in numbers))
+            conn.executemany(
+                "INSERT INTO fact_texts (document_id, local_name, text) VALUES (?, ?, ?)",
+                ((doc, local, text) for local, text in texts))
+            conn.executemany(
+                "INSERT INTO fact_contexts (document_id, seq, context_id, start_date, "
+                "end_date, instant, dims, has_scenario) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((doc, seq, ctx_id, period.get("start"), period.get("end"),
+                  period.get("instant"), json.dumps(dims, ensure_ascii=False),
+                  int(has_scenario))
+                 for seq, (ctx_id, period, dims, has_scenario) in enumerate(contexts)))
+    except sqlite3.Error as e:
+        logger.warning("Could not write fact cache %s (%s).", get_fact_cache_path(cache_dir), e)
+
+
+def fact_cache_stats(cache_dir=None):
+    """(documents, facts, bytes) of the fact cache; zeros if it does not exist."""
+    path = get_fact_cache_path(cache_dir)
+    if not os.path.isfile(path):
+        return 0, 0, 0
+    with closing(_connect_facts(cache_dir)) as conn:
+        documents = conn.execute("SELECT COUNT(*) FROM fact_documents").fetchone()[0]
+        facts = conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+    return documents, facts, os.path.getsize(path)
+
+
+# =====================================================================
+# PACKAGE STORE MAINTENANCE
+# =====================================================================
+def get_store_dir(store_dir=None):
+    """Resolve the package store root (argument > tmp/edinet_data)."""
+    return os.path.abspath(store_dir or DEFAULT_STORE_DIR)
+
+
+def get_store_budget(max_bytes=None):
+    """Resolve the store byte budget (argument > EDINET_STORE_MAX_BYTES > 2 GiB)."""
+    if max_bytes is not None:
+        return int(max_bytes)
+    env = os.environ.get("EDINET_STORE_MAX_BYTES")
+    return parse_size(env) if env else DEFAULT_STORE_MAX_BYTES
+
+
+def parse_size(text):
+    """Parse a byte size such as "500M", "2G" or "1048576"."""
+    text = str(text).strip().upper().rstrip("B").rstrip("I")
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def _dir_size(path):
+    total, files = 0, 0
+    for root, _dirs, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+                files += 1
+            except OSError:
+                pass
+    return total, files
+
+
+def list_packages(store_dir=None):
+    """Describe every package directory in the store.
+
+    Returns:
+        list[dict]: One dict per directory with keys 'name', 'path', 'bytes',
+        'files', 'last_access' (epoch seconds), 'compressed', 'valid'
+        (manifest present) and 'members' (package-relative names listed in the
+        manifest), sorted least recently used first.
+    """
+    root = get_store_dir(store_dir)
+    if not os.path.isdir(root):
+        return []
+
+    packages = []
+    for entry in os.scandir(root):
+        if not entry.is_dir():
+            continue
+        manifest = _read_manifest(entry.path)
+        size, files = _dir_size(entry.path)
+        manifest_path = os.path.join(entry.path, PACKAGE_MANIFEST_NAME)
+        try:
+            last_access = os.path.getmtime(manifest_path if manifest else entry.path)
+        except OSError:
+            last_access = 0.0
+        packages.append({
+            "name": entry.name,
+            "path": entry.path,
+            "bytes": size,
+            "files": files,
+            "last_access": last_access,
+            "compressed": bool(manifest) and all(
+                f.get("codec") for f in manifest.get("files", [])),
+            "valid": manifest is not None,
+            "members": [f["path"].replace(os.sep, "/")
+                        for f in (manifest or {}).get("files", [])],
+        })
+    packages.sort(key=lambda p: p["last_access"])
+    return packages
+
+
+def list_download_files(store_dir=None):
+    """Describe the download ZIPs and .part files left in the store root.
+
+    Returns:
+        list[dict]: One dict per file with keys 'name', 'path', 'bytes',
+        'files' (1), 'last_access' (modification time) and 'package' (the
+        package directory name its download belongs to), oldest first.
+    """
+    root = get_store_dir(store_dir)
+    if not os.path.isdir(root):
+        return []
+
+    downloads = []
+    for entry in os.scandir(root):
+        m = _DOWNLOAD_FILE_RE.match(entry.name)
+        if not m or not entry.is_file():
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        downloads.append({
+            "name": entry.name,
+            "path": entry.path,
+            "bytes": stat.st_size,
+            "files": 1,
+            "last_access": stat.st_mtime,
+            "package": m.group("doc_id") + _DOWNLOAD_PACKAGE_SUFFIX.get(m.group("type"), ""),
+        })
+    downloads.sort(key=lambda d: d["last_access"])
+    return downloads
+
+
+def gc_store(store_dir=None, max_bytes=None, dry_run=False, protect=()):
+    """Evict least recently used packages until the store fits its byte budget.
+
+    Download ZIPs and .part files left in the store root (see
+    list_download_files()) count against the budget and age out with the
+    packages. A package or download whose lock (see package_lock_name()) is
+    held by a run writing or reading it is skipped rather than deleted under it.
+
+    Args:
+        store_dir: Package store root (default: tmp/edinet_data).
+        max_bytes: Byte budget (default: EDINET_STORE_MAX_BYTES or 2 GiB).
+        dry_run: Only report what would be evicted.
+        protect: Package directory names never evicted (e.g. in use).
+
+    Returns:
+        tuple: (evicted package and download dicts, store bytes after eviction).
+    """
+    budget = get_store_budget(max_bytes)
+    root = get_store_dir(store_dir)
+    entries = sorted(list_packages(store_dir) + list_download_files(store_dir),
+                     key=lambda p: p["last_access"])
+    total = sum(p["bytes"] for p in entries)
+    evicted = []
+    for pkg in entries:
+        if total <= budget:
+            break
+        package = pkg.get("package", pkg["name"])
+        if package in protect:
+            continue
+        if not dry_run:
+            try:
+                with cache_lock(package_lock_name(os.path.join(root, package)), timeout=0):
+                    if "package" in pkg:
+                        os.remove(pkg["path"])
+                    else:
+                        shutil.rmtree(pkg["path"], ignore_errors=True)
+            except CacheLockTimeout:
+                logger.info("Skipping %s: in use by another run.", pkg["name"])
+                continue
+            except OSError as e:
+                logger.warning("Could not remove %s (%s).", pkg["path"], e)
+                continue
+        total -= pkg["bytes"]
+        evicted.append(pkg)
+    if evicted:
+        logger.info("%s %d package(s) and %d download file(s) from %s "
+                    "(%.1f MB left, budget %.1f MB).",
+                    "Would evict" if dry_run else "Evicted",
+                    sum("package" not in p for p in evicted),
+                    sum("package" in p for p in evicted),
+                    root, total / 1_048_576, budget / 1_048_576)
+    return evicted, total
+
+
+def compact_package(extract_dir):
+    """Shrink a fully extracted package to its compressed instance document(s).
+
+    Keeps the manifest-listed .xbrl / .csv members (or every listed member if
+    there is none of those) and drops PDFs, images, AuditDoc and linkbases.
+    A package whose lock (see package_lock_name()) is held by another run is
+    left as it is.
+
+    Returns:
+        bool: True if the package was compacted.
+    """
+    try:
+        with cache_lock(package_lock_name(extract_dir), timeout=0):
+            manifest = _read_manifest(extract_dir)
+            if manifest is None or all(f.get("codec") for f in manifest.get("files", [])):
+                return False
+            members = read_package(extract_dir)
+            if not members:
+                return False
+            instances = [(n, d) for n, d in members
+                         if n.lower().endswith((".xbrl", ".csv"))]
+            store_members(extract_dir, manifest.get("doc_id", os.path.basename(extract_dir)),
+                          instances or members)
+            return True
+    except CacheLockTimeout:
+        logger.info("Skipping package %s: in use by another run.",
+                    os.path.basename(extract_dir))
+        return False
+
+
+# =====================================================================
+# CLI ENTRY POINT
+# =====================================================================
+def main():
+    """CLI: inspect and garbage-collect the package store."""
+    import argparse
+    parser = argparse.ArgumentParser(description="EDINET package store / listing cache")
+    parser.add_argument("--store", default=None, help="Package store (default: tmp/edinet_data)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_inspect = sub.add_parser("inspect", help="Show store and listing cache usage")
+    p_inspect.add_argument("--top", type=int, default=10,
+                           help="Largest packages to list (default: 10)")
+    p_gc = sub.add_parser("gc", help="Evict least recently used packages over the budget")
+    p_gc.add_argument("--max-bytes", default=None,
+                      help="Byte budget, e.g. 500M or 2G (default: $EDINET_STORE_MAX_BYTES or 2G)")
+    p_gc.add_argument("--compact", action="store_true",
+                      help="First shrink fully extracted packages to their instance documents")
+    p_gc.add_argument("--dry-run", action="store_true", help="Only show what would be evicted")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "inspect":
+        packages = list_packages(args.store)
+        downloads = list_download_files(args.store)
+        total = sum(p["bytes"] for p in packages + downloads)
+        listing_bytes, listing_files = _dir_size(os.path.join(get_cache_dir(), "listings"))
+        budget = get_store_budget()
+        print(f"Package store: {get_store_dir(args.store)}")
+        print(f"  Packages:    {len(packages)} "
+              f"({sum(p['compressed'] for p in packages)} compressed, "
+              f"{sum(not p['valid'] for p in packages)} without manifest)")
+        print(f"  Downloads:   {len(downloads)} leftover ZIP/.part file(s), "
+              f"{sum(d['bytes'] for d in downloads) / 1_048_576:,.1f} MB")
+        print(f"  Size:        {total / 1_048_576:,.1f} MB "
+              f"(budget {budget / 1_048_576:,.0f} MB)")
+        print(f"  Codec:       {_default_codec()}")
+        print(f"Listing cache: {listing_files} file(s), {listing_bytes / 1_048_576:,.1f} MB")
+        fact_docs, fact_rows, fact_bytes = fact_cache_stats()
+        print(f"Fact cache:    {fact_docs} document(s), {fact_rows:,} fact(s), "
+              f"{fact_bytes / 1_048_576:,.1f} MB")
+        if packages and args.top:
+            print(f"\nLargest packages:")
+            for pkg in sorted(packages, key=lambda p: -p["bytes"])[:args.top]:
+                accessed = datetime.fromtimestamp(pkg["last_access"]).strftime("%Y-%m-%d %H:%M")
+                kind = "compressed" if pkg["compressed"] else ("extracted" if pkg["valid"] else "incomplete")
+                print(f"  {pkg['name']:<14s} {pkg['bytes'] / 1_048_576:>9,.2f} MB  "
+                      f"{pkg['files']:>5d} file(s)  {kind:<10s}  last used {accessed}")
+        return
+
+    if args.compact:
+        compacted = 0
+        for pkg in list_packages(args.store):
+            if pkg["valid"] and not pkg["compressed"] and not args.dry_run:
+                compacted += compact_package(pkg["path"])
+        print(f"Compacted {compacted} package(s).")
+
+    max_bytes = parse_size(args.max_bytes) if args.max_bytes else None
+    evicted, remaining = gc_store(args.store, max_bytes=max_bytes, dry_run=args.dry_run)
+    verb = "Would evict" if args.dry_run else "Evicted"
+    print(f"{verb} {len(evicted)} package(s)/download(s), "
+          f"{sum(p['bytes'] for p in evicted) / 1_048_576:,.1f} MB; "
+          f"store now {remaining / 1_048_576:,.1f} MB.")
+
+
+if __name__ == "__main__":
+    main()
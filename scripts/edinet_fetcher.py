@@ -10,22 +10,41 @@ Usage:
     export EDINET_API_KEY="your-subscription-key-here"
     python scripts/edinet_fetcher.py 2359           # Fetch 5 years & display merged data
     python scripts/edinet_fetcher.py 2359 --years 3  # Fetch 3 years
+    python scripts/edinet_fetcher.py 2359 --refresh  # Ignore cached packages
+    python scripts/edinet_fetcher.py 2359 --base-url http://127.0.0.1:8089/api/v2
 
 API Reference:
     - Documents List: GET https://api.edinet-fsa.go.jp/api/v2/documents.json
     - Document Download: GET https://api.edinet-fsa.go.jp/api/v2/documents/{docID}
+
+The API root can be pointed elsewhere (e.g. the offline stand-in in
+edinet_stub_server.py) with EDINET_BASE_URL or --base-url.
 """
 
 import os
 import sys
 import time
+import zlib
 import zipfile
+import random
 import logging
+import threading
+import multiprocessing
 import requests
-from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import date, timedelta
 from dotenv import load_dotenv
 
+try:
+    from scripts import edinet_cache, edinet_index, fetch_metrics
+except ImportError:
+    import edinet_cache
+    import edinet_index
+    import fetch_metrics
+
 # Load environment variables from .env file automatically
 load_dotenv()
 
@@ -34,25 +53,99 @@ logger = logging.getLogger(__name__)
 # =====================================================================
 # CONSTANTS
 # =====================================================================
-BASE_URL = "https://api.edinet-fsa.go.jp/api/v2"
+DEFAULT_BASE_URL = "https://api.edinet-fsa.go.jp/api/v2"
+BASE_URL = (os.environ.get("EDINET_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
 DOCUMENTS_LIST_URL = f"{BASE_URL}/documents.json"
 DOCUMENT_DOWNLOAD_URL = f"{BASE_URL}/documents"
 
+# EDINET code list (issuer master, see edinet_index.ingest_issuer_list)
+ISSUER_LIST_URL = os.environ.get(
+    "EDINET_CODELIST_URL",
+    "https://disclosure2dl.edinet-fsa.go.jp/searchdocument/codelist/Edinetcode.zip",
+)
+
 # docTypeCode for 有価証券報告書 (Annual Securities Report)
 DOC_TYPE_ANNUAL_REPORT = "120"
 # docTypeCode for 四半期報告書 (Quarterly Securities Report, abolished Apr 2024)
 DOC_TYPE_QUARTERLY_REPORT = "140"
-# docTypeCode for 半期報告書 (Semi-Annual Securities Report, old system)
-DOC_TYPE_SEMIANNUAL_REPORT = "130"
-# docTypeCode for 半期報告書 (Semi-Annual Securities Report, NEW system post-Apr 2024)
+# docTypeCode for 半期報告書 (Semi-Annual Securities Report; since Apr 2024 also
+# replaces the Q2 quarterly report)
 DOC_TYPE_SEMIANNUAL_REPORT_NEW = "160"
 
+# docTypeCodes of corrected reports (訂正報告書). An amendment lists the docID it
+# corrects as parentDocID; one that re-files XBRL supersedes the original's facts.
+DOC_TYPE_AMENDED_ANNUAL_REPORT = "130"       # 訂正有価証券報告書
+DOC_TYPE_AMENDED_QUARTERLY_REPORT = "150"    # 訂正四半期報告書
+DOC_TYPE_AMENDED_SEMIANNUAL_REPORT = "170"   # 訂正半期報告書
+
+# Version of the per-docID extraction results kept in edinet_cache; bump it when
+# the edinet_parser extract_* output changes so cached results are re-parsed.
+EXTRACTION_VERSION = 1
+
+# documents/{docID}?type=N: 1 = full submission package, 5 = XBRL-to-CSV
+DOWNLOAD_TYPE_PACKAGE = 1
+DOWNLOAD_TYPE_CSV = 5
+
+# Where financial facts are read from: "xbrl" (parse the instance document) or
+# "csv" (EDINET's pre-flattened type=5 CSV, much cheaper to load). Selected by
+# the `source` argument / --source flag, else the EDINET_PARSE_SOURCE env var.
+PARSE_SOURCES = ("xbrl", "csv")
+DEFAULT_PARSE_SOURCE = "xbrl"
+
 # EDINET secCode is 5 digits (ticker + trailing "0"), e.g. 2359 -> "23590"
 SEC_CODE_SUFFIX = "0"
 
-# Rate limiting: EDINET API has a limit of roughly 1-2 requests per second
+# Rate limiting: EDINET API has a limit of roughly 1-2 requests per second.
+# Enforced process-wide by _RATE_LIMITER (one request per REQUEST_DELAY_SEC).
 REQUEST_DELAY_SEC = 0.5
 
+# On HTTP 429 every caller pauses for an exponentially growing cooldown
+# (base * 2^(consecutive 429s - 1), capped) and the request rate is halved.
+RATE_LIMIT_BACKOFF_BASE_SEC = 2.0
+RATE_LIMIT_BACKOFF_MAX_SEC = 60.0
+
+# Per-endpoint (connect, read) timeouts in seconds
+ENDPOINT_TIMEOUTS = {
+    "documents.json": (5, 30),   # daily listing
+    "documents": (10, 120),      # document package download
+    "codelist": (10, 120),       # EDINET code list ZIP
+}
+
+# HTTP statuses worth retrying (rate limit + transient server errors)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Number of candidate dates probed concurrently by the date searches.
+# Throughput is still bounded by _RATE_LIMITER; concurrency only hides latency.
+SEARCH_CONCURRENCY = 4
+
+# fetch_and_parse_multi_year() pipeline: package downloads in flight at once
+# (paced by _RATE_LIMITER like every request).
+DOWNLOAD_CONCURRENCY = 2
+
+# Parsing is pure CPU, so landed filings are parsed in worker processes (see
+# extract_filings): EDINET_PARSE_WORKERS of them, default one per CPU; 0 parses
+# in the calling process. Only the compact extracted dicts come back.
+DEFAULT_PARSE_WORKERS = os.cpu_count() or 1
+
+# Package downloads stream into {zip}.part and resume with an HTTP Range request
+# after a dropped connection (up to DOWNLOAD_RESUME_ATTEMPTS times per call; a
+# .part left by an earlier run is resumed too). The read chunk size scales with
+# the package size between these bounds.
+DOWNLOAD_RESUME_ATTEMPTS = 3
+DOWNLOAD_CHUNK_MIN = 64 * 1024
+DOWNLOAD_CHUNK_MAX = 1024 * 1024
+
+# Concurrent runs sharing the cache fetch each listing / package once: the others
+# wait on a file lock (edinet_cache.cache_lock) and reuse the result. A listing
+# whose lock is not released in time is fetched anyway; a package download
+# that cannot take its lock fails.
+LISTING_LOCK_TIMEOUT_SEC = 60
+PACKAGE_LOCK_TIMEOUT_SEC = 900
+
+# Local filing index (edinet_index.py): searches auto-sync a gap of up to this
+# many days before querying; a longer gap needs an explicit `sync` run.
+INDEX_AUTO_SYNC_MAX_DAYS = 14
+
 
 # =====================================================================
 # EXCEPTIONS
@@ -73,6 +166,10 @@ class EdinetRateLimitError(EdinetApiError):
     """Raised when API rate limit (HTTP 429) is hit."""
 
 
+class EdinetNetworkError(EdinetApiError):
+    """Raised when a request still fails (connection error, timeout, HTTP 5xx) after retries."""
+
+
 # =====================================================================
 # API KEY
 # =====================================================================
@@ -98,46 +195,326 @@ def _get_api_key():
     return key
 
 
+# =====================================================================
+# API ENDPOINT
+# =====================================================================
+def set_base_url(base_url=None):
+    """Point every EDINET request at another API root.
+
+    Args:
+        base_url: e.g. "http://127.0.0.1:8089/api/v2" for edinet_stub_server.py.
+                  None restores EDINET_BASE_URL / the official endpoint.
+    """
+    global BASE_URL, DOCUMENTS_LIST_URL, DOCUMENT_DOWNLOAD_URL
+    BASE_URL = (base_url or os.environ.get("EDINET_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+    DOCUMENTS_LIST_URL = f"{BASE_URL}/documents.json"
+    DOCUMENT_DOWNLOAD_URL = f"{BASE_URL}/documents"
+
+
+# =====================================================================
+# RATE LIMITING
+# =====================================================================
+class _TokenBucket:
+    """Thread-safe token bucket shared by every EDINET request in the process.
+
+    Tokens refill at `rate` per second up to `capacity`. On HTTP 429 the rate
+    is halved (down to `min_rate`) and all callers pause for an exponentially
+    growing cooldown; each successful request restores the rate additively.
+    """
+
+    def __init__(self, rate, capacity=1.0, min_rate=0.2):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._strikes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            fetch_metrics.incr("sleep_sec.rate_limit", wait)
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self._strikes = 0
+            self.rate = min(self.max_rate, self.rate + 0.1 * self.max_rate)
+
+    def on_rate_limited(self, retry_after=None):
+        """Register an HTTP 429. Returns the cooldown applied (seconds)."""
+        with self._lock:
+            self._strikes += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            cooldown = retry_after or min(
+                RATE_LIMIT_BACKOFF_MAX_SEC,
+                RATE_LIMIT_BACKOFF_BASE_SEC * 2 ** (self._strikes - 1),
+            )
+            self._paused_until = max(self._paused_until, time.monotonic() + cooldown)
+            self._tokens = 0.0
+        return cooldown
+
+
+_RATE_LIMITER = _TokenBucket(rate=1.0 / REQUEST_DELAY_SEC)
+
+
+def _retry_after_seconds(resp):
+    """Parse a numeric Retry-After header, or None."""
+    try:
+        return float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+# =====================================================================
+# HTTP CLIENT
+# =====================================================================
+class RetryPolicy:
+    """Retry/backoff settings shared by every EDINET request.
+
+    Args:
+        max_retries: Retries per request after the first attempt.
+        backoff_base: Base delay (seconds) for exponential backoff.
+        backoff_max: Upper bound on a single backoff delay.
+        jitter: Fraction of each delay that is randomized (0 = none, 1 = full jitter).
+        retry_budget: Total retries allowed for the lifetime of the client, so a
+                      bad network day fails fast instead of retrying every call.
+    """
+
+    def __init__(self, max_retries=3, backoff_base=1.0, backoff_max=30.0,
+                 jitter=0.5, retry_budget=100):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_budget = retry_budget
+
+    def backoff(self, attempt):
+        """Jittered exponential delay before retry number `attempt` (1-based)."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(delay * (1 - self.jitter), delay)
+
+
+class EdinetClient:
+    """Pooled, rate-limited HTTP client used by every EDINET call.
+
+    A single requests.Session keeps TCP/TLS connections alive across calls
+    (pool sized for the concurrent date search). Every attempt takes a token
+    from the process-wide _RATE_LIMITER; HTTP 429 feeds the limiter's adaptive
+    backoff, while connection errors, timeouts and 5xx responses are retried
+    with the policy's jittered exponential backoff until the per-request retry
+    count or the client-wide retry budget runs out.
+    """
+
+    def __init__(self, policy=None, timeouts=None, rate_limiter=None,
+                 pool_size=SEARCH_CONCURRENCY * 2):
+        self.policy = policy or RetryPolicy()
+        self.timeouts = dict(ENDPOINT_TIMEOUTS, **(timeouts or {}))
+        self.rate_limiter = rate_limiter or _RATE_LIMITER
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._retries_left = self.policy.retry_budget
+        self._lock = threading.Lock()
+
+    def _take_retry(self):
+        with self._lock:
+            if self._retries_left <= 0:
+                return False
+            self._retries_left -= 1
+            return True
+
+    def get(self, endpoint, url, params=None, stream=False, headers=None):
+        """GET with rate limiting and retries.
+
+        Args:
+            endpoint: Key into the timeout table ("documents.json" or "documents").
+            url: Full request URL.
+            params: Query parameters (including Subscription-Key).
+            stream: Stream the response body (document downloads).
+            headers: Extra request headers (e.g. Range for resumed downloads).
+
+        Returns:
+            requests.Response for any non-retryable status (200, 404, ...).
+
+        Raises:
+            EdinetApiError: HTTP 401 (invalid key) — never retried.
+            EdinetRateLimitError: Still rate-limited after retries.
+            EdinetNetworkError: Connection errors / timeouts / 5xx after retries.
+        """
+        timeout = self.timeouts.get(endpoint, (10, 60))
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            error = None
+            fetch_metrics.incr(f"requests.{endpoint}")
+            start = time.monotonic()
+            try:
+                resp = self.session.get(url, params=params, timeout=timeout, stream=stream,
+                                        headers=headers)
+            except requests.RequestException as e:
+                resp, error = None, e
+                fetch_metrics.incr(f"errors.{endpoint}")
+            # Time to headers; streamed bodies are accounted in bytes.<endpoint>
+            fetch_metrics.observe(f"latency.{endpoint}", time.monotonic() - start)
+
+            if resp is not None:
+                fetch_metrics.incr(f"status.{endpoint}.{resp.status_code}")
+                if resp.status_code == 401:
+                    resp.close()
+                    raise EdinetApiError(
+                        "HTTP 401 Unauthorized: API key is invalid or expired. "
+                        "Please verify your EDINET_API_KEY."
+                    )
+                if resp.status_code not in RETRYABLE_STATUSES:
+                    self.rate_limiter.on_success()
+                    return resp
+                resp.close()
+
+            attempt += 1
+            can_retry = attempt <= self.policy.max_retries and self._take_retry()
+
+            if resp is not None and resp.status_code == 429:
+                cooldown = self.rate_limiter.on_rate_limited(_retry_after_seconds(resp))
+                if not can_retry:
+                    raise EdinetRateLimitError(
+                        "HTTP 429 Too Many Requests: EDINET API rate limit exceeded "
+                        f"({url}). Please wait and try again."
+                    )
+                logger.warning("Rate limit hit (%s). Backing off %.0fs...", endpoint, cooldown)
+                fetch_metrics.incr(f"retries.{endpoint}")
+                continue
+
+            reason = str(error) if error is not None else f"HTTP {resp.status_code}"
+            if not can_retry:
+                raise EdinetNetworkError(f"Request to {url} failed: {reason}")
+            delay = self.policy.backoff(attempt)
+            logger.warning("%s on %s (attempt %d/%d). Retrying in %.1fs...",
+                           reason, endpoint, attempt, self.policy.max_retries, delay)
+            fetch_metrics.incr(f"retries.{endpoint}")
+            fetch_metrics.incr("sleep_sec.backoff", delay)
+            time.sleep(delay)
+
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide EdinetClient (created on first use)."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = EdinetClient()
+        return _CLIENT
+
+
+def set_client(client):
+    """Replace the process-wide EdinetClient (e.g. with a custom RetryPolicy)."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        _CLIENT = client
+
+
 # =====================================================================
 # CORE FUNCTIONS
 # =====================================================================
-def _search_single_date(api_key, target_date, sec_code, doc_type_code=DOC_TYPE_ANNUAL_REPORT):
-    """Query EDINET documents.json for a single date and return matching documents.
+def _fetch_listing(api_key, target_date):
+    """Return all documents.json results for a single date, using the listing cache.
+
+    Each documents.json?type=2 response lists every filing submitted that day,
+    so it is cached per date (see edinet_cache.py) and shared by every secCode
+    and every search path. Only a real API request goes through the shared
+    EdinetClient (rate limit + retries) — cache hits cost nothing. A cache miss
+    is fetched under a per-date cross-process lock, so concurrent runs (and
+    threads) request each date once. Safe to call from multiple threads.
 
     Returns:
-        list[dict]: Matching documents (may be empty).
-        None: If the request should be retried (rate limit).
+        list[dict]: Raw EDINET result rows (may be empty).
+        None: If the listing could not be fetched (still rate-limited after the
+              client's retries, network error or HTTP error). Never cached, so
+              the date is requested again next time.
 
     Raises:
         EdinetApiError: On auth failure.
     """
+    cached = edinet_cache.load_listing(target_date)
+    fetch_metrics.record_cache("listing", cached is not None)
+    if cached is not None:
+        return cached
+
+    date_str = target_date.strftime("%Y-%m-%d")
+    try:
+        with edinet_cache.cache_lock(f"listing-{date_str}",
+                                     timeout=LISTING_LOCK_TIMEOUT_SEC) as waited:
+            if waited:
+                cached = edinet_cache.load_listing(target_date)
+                if cached is not None:
+                    fetch_metrics.incr("single_flight.listing")
+                    return cached
+            return _request_listing(api_key, target_date)
+    except edinet_cache.CacheLockTimeout as e:
+        logger.warning("%s; fetching %s without the lock.", e, date_str)
+        return _request_listing(api_key, target_date)
+
+
+def _request_listing(api_key, target_date):
+    """Request one date's documents.json from the API and cache it (see _fetch_listing)."""
     date_str = target_date.strftime("%Y-%m-%d")
     params = {"date": date_str, "type": 2, "Subscription-Key": api_key}
 
     try:
-        resp = requests.get(DOCUMENTS_LIST_URL, params=params, timeout=30)
-    except requests.RequestException as e:
+        resp = get_client().get("documents.json", DOCUMENTS_LIST_URL, params=params)
+    except EdinetRateLimitError:
+        logger.warning("Persistent rate limit on %s, skipping.", date_str)
+        return None
+    except EdinetNetworkError as e:
         logger.warning("Network error on %s: %s", date_str, e)
-        return []
+        return None
 
-    if resp.status_code == 401:
-        raise EdinetApiError(
-            "HTTP 401 Unauthorized: API key is invalid or expired. "
-            "Please verify your EDINET_API_KEY."
-        )
-    if resp.status_code == 429:
-        logger.warning("Rate limit hit on %s. Waiting 5s...", date_str)
-        time.sleep(5)
-        return None  # signal retry
     if resp.status_code != 200:
         logger.warning("HTTP %d on %s, skipping.", resp.status_code, date_str)
-        return []
+        return None
+
+    fetch_metrics.incr("bytes.documents.json", len(resp.content))
+    results = resp.json().get("results", [])
+    edinet_cache.save_listing(target_date, results)
+    edinet_index.record_amendments(results)
+    return results
+
+
+def _match_listing(results, sec_codes, doc_type_code=DOC_TYPE_ANNUAL_REPORT):
+    """Pick the documents of the given secCodes out of one day's listing.
+
+    Args:
+        results: Raw documents.json result rows.
+        sec_codes: Collection of 5-digit secCodes.
+        doc_type_code: docTypeCode to keep, or None for every type.
 
-    matches = []
-    for doc in resp.json().get("results", []):
-        if (doc.get("secCode") == sec_code
+    Returns:
+        dict: {sec_code: [document dict, ...]} for secCodes with matches.
+    """
+    matches = {}
+    for doc in results:
+        sec_code = doc.get("secCode")
+        if (sec_code in sec_codes
                 and (doc_type_code is None or doc.get("docTypeCode") == doc_type_code)):
-            matches.append({
+            matches.setdefault(sec_code, []).append({
                 "doc_id": doc["docID"],
                 "filer_name": doc.get("filerName", ""),
                 "doc_description": doc.get("docDescription", ""),
@@ -149,6 +526,213 @@ def _search_single_date(api_key, target_date, sec_code, doc_type_code=DOC_TYPE_A
     return matches
 
 
+def _search_single_date(api_key, target_date, sec_code, doc_type_code=DOC_TYPE_ANNUAL_REPORT):
+    """Query EDINET documents.json for a single date and return matching documents.
+
+    Returns:
+        list[dict]: Matching documents (may be empty).
+        None: If the date's listing could not be fetched (see _fetch_listing()).
+
+    Raises:
+        EdinetApiError: On auth failure.
+    """
+    results = _fetch_listing(api_key, target_date)
+    if results is None:
+        return None
+    return _match_listing(results, {sec_code}, doc_type_code).get(sec_code, [])
+
+
+def _search_date_multi(api_key, target_date, sec_codes, doc_type_code=DOC_TYPE_ANNUAL_REPORT):
+    """Like _search_single_date() for several secCodes; returns {sec_code: [docs]}."""
+    results = _fetch_listing(api_key, target_date)
+    if results is None:
+        return None
+    return _match_listing(results, sec_codes, doc_type_code)
+
+
+def _probe_concurrently(search, dates, stop=None):
+    """Run search(date) for candidate dates concurrently, yielding (date, result) in input order.
+
+    Up to SEARCH_CONCURRENCY dates are in flight at once; the request rate is
+    still capped by _RATE_LIMITER. `dates` may be a lazy iterable — it is only
+    advanced as slots free up, and no new probe is started once stop() is True.
+    Probes already in flight when the search stops only warm the listing cache.
+    """
+    date_iter = iter(dates)
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=SEARCH_CONCURRENCY) as pool:
+        def fill():
+            while len(pending) < SEARCH_CONCURRENCY and not (stop and stop()):
+                d = next(date_iter, None)
+                if d is None:
+                    return
+                pending.append((d, pool.submit(search, d)))
+
+        fill()
+        while pending:
+            d, future = pending.popleft()
+            yield d, future.result()
+            fill()
+
+
+def _probe_dates(api_key, dates, sec_code, doc_type_code=DOC_TYPE_ANNUAL_REPORT, stop=None):
+    """Probe candidate dates for one secCode, yielding (date, matches) in input order.
+
+    See _probe_concurrently() for the concurrency and stop() semantics.
+    """
+    for d, result in _probe_concurrently(
+            lambda d: _search_single_date(api_key, d, sec_code, doc_type_code),
+            dates, stop):
+        yield d, result or []
+
+
+def _sweep_dates(api_key, dates, sec_codes, doc_type_code=DOC_TYPE_ANNUAL_REPORT, stop=None):
+    """Probe candidate dates once for many secCodes, yielding (date, {sec_code: matches}).
+
+    See _probe_concurrently() for the concurrency and stop() semantics.
+    """
+    sec_codes = frozenset(sec_codes)
+    for d, result in _probe_concurrently(
+            lambda d: _search_date_multi(api_key, d, sec_codes, doc_type_code),
+            dates, stop):
+        yield d, result or {}
+
+
+# =====================================================================
+# LOCAL FILING INDEX
+# =====================================================================
+def sync_filing_index(start=None, end=None):
+    """Ingest daily documents.json listings into the local filing index.
+
+    Args:
+        start: First submission date to ingest. Defaults to the day after the
+               last final date in the index (incremental sync).
+        end: Last date to ingest (default: today; today's listing is stored
+             as non-final and fetched again on the next sync).
+
+    Returns:
+        tuple: (dates ingested, first date not ingested). The sync stops at
+        the first date whose listing cannot be fetched and returns it, so
+        the next sync resumes there; the second item is None if the sync
+        reached `end`.
+    """
+    api_key = _get_api_key()
+    today = date.today()
+    end = min(end or today, today)
+
+    if start is None:
+        last = edinet_index.last_synced_date()
+        if last is None:
+            logger.warning("Filing index is empty. Run a backfill first: "
+                           "python scripts/edinet_index.py backfill")
+            return 0, None
+        start = last + timedelta(days=1)
+
+    days = edinet_index.missing_dates(start, end)
+    logger.info("Syncing filing index: %d date(s) from %s to %s", len(days), start, end)
+
+    synced = 0
+    for i, d in enumerate(days, 1):
+        results = _fetch_listing(api_key, d)
+        if results is None:
+            logger.warning("Listing of %s could not be fetched, stopping sync.", d)
+            return synced, d
+        edinet_index.ingest_listing(d, results, final=d < today)
+        synced += 1
+        if i % 50 == 0:
+            logger.info("  ... %d/%d dates synced (through %s)", i, len(days), d)
+
+    return synced, None
+
+
+def _filing_index_ready(window_start):
+    """Return True if the local filing index can answer a search back to window_start.
+
+    The index must already cover window_start (i.e. a backfill was run). A short
+    gap since the last sync (<= INDEX_AUTO_SYNC_MAX_DAYS) is synced on the fly;
+    anything longer falls back to date-window probing.
+    """
+    first = edinet_index.first_synced_date()
+    if first is None or first > window_start:
+        return False
+
+    today = date.today()
+    last = edinet_index.last_synced_date() or first
+    if (today - last).days > INDEX_AUTO_SYNC_MAX_DAYS:
+        logger.info("Filing index is %d days behind (last sync %s). Run "
+                    "`python scripts/edinet_index.py sync`; using date search.",
+                    (today - last).days, last)
+        return False
+
+    sync_filing_index(start=last + timedelta(days=1), end=today)
+    return edinet_index.covers(window_start, today - timedelta(days=1))
+
+
+# Annual report filing seasons:
+# (peak_start_month, peak_start_day, peak_end_month, peak_end_day),
+# ordered by frequency in Japanese market
+ANNUAL_FILING_SEASONS = [
+    (6, 18, 7, 2),    # March FY → June-July (~70% of companies)
+    (3, 18, 4, 2),    # December FY → March-April
+    (9, 18, 10, 2),   # June FY → Sep-Oct
+    (12, 18, 1, 8),   # September FY → Dec-Jan
+]
+
+
+def _check_issuer(ticker_code, sec_code):
+    """Reject a ticker missing from the issuer master before any API call.
+
+    Only active once an issuer master has been loaded
+    (`python scripts/edinet_index.py issuers --download`).
+
+    Returns:
+        dict: The issuer master row, or None if no master is loaded.
+
+    Raises:
+        EdinetDocumentNotFound: If the master is loaded and has no such secCode.
+    """
+    if not edinet_index.issuer_list_loaded_at():
+        return None
+    issuer = edinet_index.lookup_issuer(sec_code)
+    if issuer is None:
+        raise EdinetDocumentNotFound(
+            f"secCode={sec_code} (ticker={ticker_code}) is not in the EDINET code list. "
+            "Check the ticker, or refresh the issuer master with "
+            "'python scripts/edinet_index.py issuers --download'."
+        )
+    return issuer
+
+
+def _known_tickers(tickers):
+    """Tickers that pass _check_issuer(); the others are logged and dropped."""
+    known = []
+    for t in tickers:
+        try:
+            _check_issuer(t, str(t).strip() + SEC_CODE_SUFFIX)
+        except EdinetDocumentNotFound as e:
+            logger.warning("%s", e)
+            continue
+        known.append(t)
+    return known
+
+
+def _annual_filing_month(fiscal_year_end):
+    """Month an issuer files its annual report in (FY end + ~3 months)."""
+    return (int(fiscal_year_end[5:7]) + 2) % 12 + 1
+
+
+def _annual_from_index(sec_code, num_years):
+    """Newest `num_years` annual reports of a secCode from the local filing index."""
+    found_docs = []
+    seen_period_ends = set()
+    for doc in edinet_index.query_filings(sec_code, [DOC_TYPE_ANNUAL_REPORT]):
+        if doc["period_end"] not in seen_period_ends:
+            seen_period_ends.add(doc["period_end"])
+            found_docs.append(doc)
+    return found_docs[:num_years]
+
+
 def get_document_ids(ticker_code, num_years=5):
     """Find annual report docIDs for the past `num_years` years.
 
@@ -162,7 +746,23 @@ def get_document_ids(ticker_code, num_years=5):
       Fallback: If Phase 1 (June) yields nothing, try other filing seasons
                (March, September, December) with the same strategy.
 
-    Expected API calls: ~15-40 for March FY companies (~8-20 seconds).
+    Expected API calls: ~15-40 for March FY companies (~8-20 seconds) on a cold
+    cache. Every probed date's listing is kept in edinet_cache, so repeat runs
+    (and other tickers filing on the same dates) are served from disk.
+
+    Found reports are recorded in the issuer's filing calendar
+    (edinet_index.filing_calendar). On later runs the known submit dates are
+    probed first, Phase 2 starts from the latest one, and the season matching
+    the issuer's fiscal year end is tried before the others. Before the first
+    report is found, the fiscal year end comes from the issuer master (EDINET
+    code list), which also rejects unknown tickers without any API call.
+
+    If the local filing index (edinet_index.py) covers the last `num_years`
+    years, the search is a single index query and no date probing is done.
+
+    Only original reports are returned; corrected reports (訂正有価証券報告書)
+    are looked up per docID with edinet_index.amendment_chain() and merged by
+    fetch_and_parse_multi_year().
 
     Args:
         ticker_code: Stock ticker code (e.g. "2359" or 2359).
@@ -170,62 +770,70 @@ def get_document_ids(ticker_code, num_years=5):
 
     Returns:
         list[dict]: Document metadata sorted newest-first.
+
+    Raises:
+        EdinetDocumentNotFound: If no report is found, or the ticker is not in
+                                the loaded issuer master.
     """
     api_key = _get_api_key()
     sec_code = str(ticker_code).strip() + SEC_CODE_SUFFIX
     today = date.today()
     current_year = today.year
+    _check_issuer(ticker_code, sec_code)
+
+    if _filing_index_ready(today - timedelta(days=366 * num_years)):
+        found_docs = _annual_from_index(sec_code, num_years)
+        if not found_docs:
+            raise EdinetDocumentNotFound(
+                f"No 有価証券報告書 (docTypeCode={DOC_TYPE_ANNUAL_REPORT}) found "
+                f"for secCode={sec_code} (ticker={ticker_code}) in the local filing index."
+            )
+        logger.info("Filing index: %d report(s) for ticker=%s",
+                    len(found_docs), ticker_code)
+        return found_docs
 
     found_docs = []
     seen_period_ends = set()
     searched_dates = set()
     api_calls = 0
 
-    def search_date(d):
-        """Search a single date, returns True if new doc(s) found."""
+    def probeable(d):
+        return d not in searched_dates and d <= today and d.weekday() < 5
+
+    def record(d, result):
+        """Record docs found on a probed date. Returns True if new doc(s) found."""
         nonlocal api_calls
-        if d in searched_dates or d > today or d.weekday() >= 5:
-            return False
         searched_dates.add(d)
-
-        result = _search_single_date(api_key, d, sec_code)
         api_calls += 1
-
-        if result is None:  # rate limited
-            time.sleep(5)
-            result = _search_single_date(api_key, d, sec_code)
-            api_calls += 1
-            if result is None:
-                return False
-
         found_new = False
         for doc in result:
             pe = doc["period_end"]
-            if pe not in seen_period_ends:
+            if pe not in seen_period_ends and len(found_docs) < num_years:
                 seen_period_ends.add(pe)
                 found_docs.append(doc)
                 found_new = True
                 logger.info("Found [%d/%d]: docID=%s, period=%s (API calls: %d)",
                             len(found_docs), num_years, doc["doc_id"], pe, api_calls)
-
-        time.sleep(REQUEST_DELAY_SEC)
         return found_new
 
     def search_window(year, month_start, day_start, month_end, day_end):
         """Search a date range for a given year. Returns True if doc found."""
         end_year = year + 1 if month_end < month_start else year
         try:
-            d = date(year, month_start, day_start)
+            start = date(year, month_start, day_start)
             end = date(end_year, month_end, day_end)
         except ValueError:
             return False
-        while d <= end:
-            if len(found_docs) >= num_years:
-                return True
-            if search_date(d):
-                return True
-            d += timedelta(days=1)
-        return False
+        dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        dates = [d for d in dates if probeable(d)]
+
+        found = False
+        for d, result in _probe_dates(
+                api_key, dates, sec_code,
+                stop=lambda: found or len(found_docs) >= num_years):
+            if record(d, result):
+                found = True
+        return found or len(found_docs) >= num_years
 
     def adaptive_search(reference_submit_date):
         """Phase 2: Use known filing date to predict and find remaining years."""
@@ -234,30 +842,57 @@ def get_document_ids(ticker_code, num_years=5):
         logger.info("Phase 2 (adaptive): filing pattern = month %d, day ~%d",
                      ref_month, ref_day)
 
-        for year in range(current_year, current_year - num_years - 2, -1):
-            if len(found_docs) >= num_years:
-                break
-            try:
-                predicted = date(year, ref_month, ref_day)
-            except ValueError:
-                predicted = date(year, ref_month, 28)
-            # Search ±5 days around predicted date, closest first
-            for delta in [0, -1, 1, -2, 2, -3, 3, -4, 4, -5, 5]:
-                if len(found_docs) >= num_years:
-                    break
-                search_date(predicted + timedelta(days=delta))
+        found_years = set()
+        year_of = {}
+
+        def candidates():
+            # ±5 days around the predicted date for each year, closest first.
+            # Generated lazily so a year stops being probed once its report is found.
+            for year in range(current_year, current_year - num_years - 2, -1):
+                try:
+                    predicted = date(year, ref_month, ref_day)
+                except ValueError:
+                    predicted = date(year, ref_month, 28)
+                for delta in [0, -1, 1, -2, 2, -3, 3, -4, 4, -5, 5]:
+                    if year in found_years:
+                        break
+                    d = predicted + timedelta(days=delta)
+                    if probeable(d):
+                        year_of[d] = year
+                        yield d
+
+        for d, result in _probe_dates(api_key, candidates(), sec_code,
+                                      stop=lambda: len(found_docs) >= num_years):
+            if record(d, result) or result:
+                found_years.add(year_of[d])
 
     logger.info("Searching for %d annual reports: secCode=%s (ticker=%s)",
                 num_years, sec_code, ticker_code)
 
-    # Filing seasons: (peak_start_month, peak_start_day, peak_end_month, peak_end_day)
-    # Ordered by frequency in Japanese market
-    SEASONS = [
-        (6, 18, 7, 2),    # March FY → June-July (~70% of companies)
-        (3, 18, 4, 2),    # December FY → March-April
-        (9, 18, 10, 2),   # June FY → Sep-Oct
-        (12, 18, 1, 8),   # September FY → Dec-Jan
-    ]
+    SEASONS = list(ANNUAL_FILING_SEASONS)
+
+    # Learned filing calendar: probe known submit dates first (their listings
+    # are usually cached), then predict the remaining years from the latest one
+    calendar = edinet_index.filing_calendar(sec_code)
+    known_dates = []
+    for _, submit in calendar["submit_dates"].get(DOC_TYPE_ANNUAL_REPORT, []):
+        try:
+            known_dates.append(date.fromisoformat(submit))
+        except ValueError:
+            continue
+    if known_dates:
+        logger.info("Filing calendar: %d known annual submit date(s), latest %s",
+                    len(known_dates), known_dates[0])
+        for d, result in _probe_dates(api_key, [d for d in known_dates if probeable(d)],
+                                      sec_code, stop=lambda: len(found_docs) >= num_years):
+            record(d, result)
+        if len(found_docs) < num_years:
+            adaptive_search(known_dates[0])
+
+    # The issuer's fiscal year end tells which season it files in (FY end + ~3 months)
+    if calendar["fiscal_year_end"]:
+        filing_month = _annual_filing_month(calendar["fiscal_year_end"])
+        SEASONS.sort(key=lambda season: season[0] != filing_month)
 
     for season_idx, (ms, ds, me, de) in enumerate(SEASONS):
         if len(found_docs) >= num_years:
@@ -294,6 +929,7 @@ def get_document_ids(ticker_code, num_years=5):
         )
 
     found_docs.sort(key=lambda d: d["period_end"], reverse=True)
+    edinet_index.record_filing_dates(sec_code, found_docs)
     logger.info("Done: %d report(s) for ticker=%s in %d API calls",
                 len(found_docs), ticker_code, api_calls)
     return found_docs[:num_years]
@@ -305,77 +941,224 @@ def get_latest_document_id(ticker_code, search_days=400):
     return docs[0]
 
 
-def get_latest_interim_id(ticker_code, fiscal_year_end=None):
-    """Find the most recent interim report for a ticker.
+def get_document_ids_batch(tickers, num_years=5):
+    """Find annual report docIDs for several tickers in one date sweep.
 
-    Searches for:
-      - docTypeCode=160 (半期報告書, new semi-annual post-Apr 2024)
-      - docTypeCode=140 (四半期報告書, legacy Q1/Q2/Q3, abolished Apr 2024)
-      - docTypeCode=130 (半期報告書, old semi-annual)
-      - Broad secCode-based search for post-2024 Q1/Q3 (any doc type)
+    Each documents.json listing covers every filer of that day, so every
+    probed date is fetched once and fanned out to all requested secCodes:
+    resolution cost grows with the number of distinct dates, not with
+    tickers × dates. Per ticker the targeting of get_document_ids() is kept:
+    known submit dates from the filing calendar and, once a ticker's first
+    report is found, ±5-day predictions for its remaining years are probed
+    before the shared filing-season sweep continues.
 
-    If fiscal_year_end is provided (e.g. "2024-03-31"), uses Adaptive Search:
-      1. Compute the 3 quarter-end dates from FY end
-      2. Estimate filing date = quarter_end + 45 days
-      3. Search ±5 days around each estimated filing date
-    Otherwise falls back to window-based search.
+    Args:
+        tickers: Iterable of stock ticker codes.
+        num_years: Number of annual reports to find per ticker (default: 5).
 
-    Returns the newest one found (by period_end), or None.
+    Returns:
+        dict: {ticker: [document dict, ...] sorted newest-first}. The list is
+        empty for tickers with no annual report in any filing season, and for
+        tickers missing from the issuer master (never probed).
     """
+    tickers = list(tickers)
+    results = {t: [] for t in tickers}
+    results.update(_document_ids_batch(_known_tickers(tickers), num_years))
+    return results
+
+
+def _document_ids_batch(tickers, num_years):
+    """Date sweep behind get_document_ids_batch() for validated tickers."""
     api_key = _get_api_key()
-    sec_code = str(ticker_code).strip() + SEC_CODE_SUFFIX
     today = date.today()
-    searched_dates = set()
+    current_year = today.year
+    sec_of = {t: str(t).strip() + SEC_CODE_SUFFIX for t in tickers}
+    ticker_of = {sec: t for t, sec in sec_of.items()}
+
+    if _filing_index_ready(today - timedelta(days=366 * num_years)):
+        return {t: _annual_from_index(sec, num_years) for t, sec in sec_of.items()}
+
+    found = {t: [] for t in sec_of}
+    seen_period_ends = {t: set() for t in sec_of}
+    found_years = {t: set() for t in sec_of}
+    predictions = {t: deque() for t in sec_of}   # (year or None, date), probed first
+    has_pattern = set()
+    year_of_probe = {}                           # date -> {ticker: predicted year}
+    searched = set()
+
+    def complete(t):
+        return len(found[t]) >= num_years
+
+    def predict(t, ref):
+        has_pattern.add(t)
+        for year in range(current_year, current_year - num_years - 2, -1):
+            try:
+                predicted = date(year, ref.month, ref.day)
+            except ValueError:
+                predicted = date(year, ref.month, 28)
+            for delta in [0, -1, 1, -2, 2, -3, 3, -4, 4, -5, 5]:
+                predictions[t].append((year, predicted + timedelta(days=delta)))
+
+    # Learned filing calendars: known submit dates first, then predictions
+    season_votes = {}
+    for t, sec in sec_of.items():
+        calendar = edinet_index.filing_calendar(sec)
+        known_dates = []
+        for _, submit in calendar["submit_dates"].get(DOC_TYPE_ANNUAL_REPORT, []):
+            try:
+                known_dates.append(date.fromisoformat(submit))
+            except ValueError:
+                continue
+        if known_dates:
+            predictions[t].extend((None, d) for d in known_dates)
+            predict(t, known_dates[0])
+        if calendar["fiscal_year_end"]:
+            month = _annual_filing_month(calendar["fiscal_year_end"])
+            season_votes[month] = season_votes.get(month, 0) + 1
+
+    # Shared season sweep: seasons most of the batch files in go first
+    seasons = sorted(ANNUAL_FILING_SEASONS, key=lambda s: -season_votes.get(s[0], 0))
+    season_dates = []
+    for ms, ds, me, de in seasons:
+        for year in range(current_year, current_year - num_years - 2, -1):
+            end_year = year + 1 if me < ms else year
+            try:
+                start = date(year, ms, ds)
+                end = date(end_year, me, de)
+            except ValueError:
+                continue
+            season_dates.extend(start + timedelta(days=i) for i in range((end - start).days + 1))
+    season_iter = iter(season_dates)
+
+    def probeable(d):
+        return d not in searched and d <= today and d.weekday() < 5
+
+    def next_targeted():
+        for t in sec_of:
+            if complete(t):
+                continue
+            while predictions[t]:
+                year, d = predictions[t].popleft()
+                if year is not None and year in found_years[t]:
+                    continue
+                if probeable(d):
+                    if year is not None:
+                        year_of_probe.setdefault(d, {})[t] = year
+                    return d
+        return None
+
+    def candidates():
+        while not all(complete(t) for t in sec_of):
+            d = next_targeted()
+            if d is None:
+                d = next((s for s in season_iter if probeable(s)), None)
+                if d is None:
+                    return
+            searched.add(d)
+            yield d
+
+    logger.info("Batch search for %d annual report(s) of %d ticker(s)", num_years, len(sec_of))
     api_calls = 0
+    for d, matches in _sweep_dates(api_key, candidates(), sec_of.values(),
+                                   stop=lambda: all(complete(t) for t in sec_of)):
+        api_calls += 1
+        for sec, docs in matches.items():
+            t = ticker_of[sec]
+            found_years[t].add(year_of_probe.get(d, {}).get(t, d.year))
+            for doc in docs:
+                pe = doc["period_end"]
+                if pe not in seen_period_ends[t] and not complete(t):
+                    seen_period_ends[t].add(pe)
+                    found[t].append(doc)
+                    logger.info("Found [%s %d/%d]: docID=%s, period=%s (API calls: %d)",
+                                t, len(found[t]), num_years, doc["doc_id"], pe, api_calls)
+            if t not in has_pattern and found[t]:
+                try:
+                    predict(t, date.fromisoformat(found[t][0]["submit_date"][:10]))
+                except ValueError:
+                    pass
 
-    logger.info("Searching for latest interim report (160/140/130): secCode=%s", sec_code)
+    for t, docs in found.items():
+        docs.sort(key=lambda d: d["period_end"], reverse=True)
+        edinet_index.record_filing_dates(sec_of[t], docs)
+        if not docs:
+            logger.warning("No 有価証券報告書 found for ticker=%s in any filing season.", t)
+    logger.info("Batch done: %d ticker(s) in %d API calls", len(found), api_calls)
+    return found
 
-    doc_types = [DOC_TYPE_SEMIANNUAL_REPORT_NEW, DOC_TYPE_SEMIANNUAL_REPORT, DOC_TYPE_QUARTERLY_REPORT]
-    MAX_API_CALLS = 50  # safety budget across all search phases
 
-    # Interim doc types that may contain financial data (for broad search)
-    INTERIM_DOC_TYPES = {
-        DOC_TYPE_QUARTERLY_REPORT, DOC_TYPE_SEMIANNUAL_REPORT,
-        DOC_TYPE_SEMIANNUAL_REPORT_NEW,
-    }
+# Interim doc types that may contain financial data (for broad search)
+INTERIM_DOC_TYPES = {DOC_TYPE_QUARTERLY_REPORT, DOC_TYPE_SEMIANNUAL_REPORT_NEW}
 
-    def _try_date(d, doc_types_to_search):
-        """Search a single date for interim reports. Returns (doc, calls) or (None, calls).
+# Safety budget of candidate dates per interim search (across all phases)
+INTERIM_MAX_API_CALLS = 50
 
-        If doc_types_to_search contains None, does a broad search (all doc types)
-        and filters results to INTERIM_DOC_TYPES.
-        """
-        calls = 0
-        if d > today or d.weekday() >= 5 or d in searched_dates:
-            return None, 0
-        searched_dates.add(d)
-        for doc_type in doc_types_to_search:
-            result = _search_single_date(api_key, d, sec_code, doc_type)
-            calls += 1
-            if result is None:
-                # 429 rate limit — _search_single_date already slept 5s, retry once
-                result = _search_single_date(api_key, d, sec_code, doc_type)
-                calls += 1
-            if result is None:
-                # Still rate-limited after retry — give up on this date
-                logger.warning("Persistent rate limit on %s, skipping.", d)
-                return None, calls
-            if result:
-                # If broad search (doc_type=None), filter to interim doc types
-                if doc_type is None:
-                    result = [r for r in result
-                              if r.get("doc_type_code_raw") in INTERIM_DOC_TYPES]
-                    if not result:
-                        time.sleep(REQUEST_DELAY_SEC)
-                        continue
-                doc = result[0]
-                doc["doc_type_code"] = doc.get("doc_type_code_raw", doc_type)
-                logger.info("Found interim: docType=%s, docID=%s, period=%s, desc=%s",
-                            doc["doc_type_code"], doc["doc_id"], doc["period_end"],
-                            doc["doc_description"])
-                return doc, calls
-            time.sleep(REQUEST_DELAY_SEC)
-        return None, calls
+# Fallback interim filing windows: (start_month, start_day, end_month, end_day)
+INTERIM_WINDOWS = [
+    (2, 1, 2, 28),    # Q3 filing (Jan-Feb) or semi-annual for Sep FY
+    (1, 15, 1, 31),   # Q3 filing (late Jan)
+    (11, 1, 11, 30),  # Q2/semi-annual filing (Nov) for Mar FY
+    (10, 15, 10, 31), # Q2/semi-annual filing (late Oct)
+    (8, 1, 8, 31),    # Q1 filing (Aug) — legacy only
+    (7, 15, 7, 31),   # Q1 filing (late Jul) — legacy only
+]
+
+
+def _pick_interim(result, doc_types_to_search):
+    """Pick the first interim report on a date, in doc type preference order.
+
+    A None entry in doc_types_to_search is a broad search (any doc type for
+    this secCode), filtered to INTERIM_DOC_TYPES.
+    """
+    for doc_type in doc_types_to_search:
+        if doc_type is None:
+            hits = [r for r in result if r.get("doc_type_code_raw") in INTERIM_DOC_TYPES]
+        else:
+            hits = [r for r in result if r.get("doc_type_code_raw") == doc_type]
+        if hits:
+            doc = hits[0]
+            doc["doc_type_code"] = doc.get("doc_type_code_raw", doc_type)
+            logger.info("Found interim: docType=%s, docID=%s, period=%s, desc=%s",
+                        doc["doc_type_code"], doc["doc_id"], doc["period_end"],
+                        doc["doc_description"])
+            return doc
+    return None
+
+
+def _interim_search_plan(sec_code, fiscal_year_end, today):
+    """Yield the candidate dates of an interim search as (date, doc_types, phase).
+
+    Phase "adaptive" predicts filing dates from the fiscal year end (argument,
+    else the issuer's filing calendar) and the issuer's last observed filing
+    lag; phase "window" covers INTERIM_WINDOWS for the last two years. Dates
+    are weekdays up to today and never repeat across phases.
+    """
+    doc_types = [DOC_TYPE_SEMIANNUAL_REPORT_NEW, DOC_TYPE_QUARTERLY_REPORT]
+    seen = set()
+
+    def fresh(dates):
+        for d in dates:
+            if d > today or d.weekday() >= 5 or d in seen:
+                continue
+            seen.add(d)
+            yield d
+
+    # Learned filing calendar: fiscal year end and the quarter-end -> filing lag
+    calendar = edinet_index.filing_calendar(sec_code)
+    fiscal_year_end = fiscal_year_end or calendar["fiscal_year_end"]
+    filing_lag_days = 45
+    known_interims = sorted(
+        (row for dt in doc_types for row in calendar["submit_dates"].get(dt, [])),
+        reverse=True,
+    )
+    if known_interims:
+        try:
+            period_end, submit = known_interims[0]
+            filing_lag_days = (date.fromisoformat(submit) - date.fromisoformat(period_end)).days
+            logger.info("Filing calendar: last interim filed %d days after period end",
+                        filing_lag_days)
+        except ValueError:
+            pass
 
     # --- Adaptive Search: use fiscal_year_end to predict filing dates ---
     if fiscal_year_end:
@@ -385,7 +1168,7 @@ def get_latest_interim_id(ticker_code, fiscal_year_end=None):
             fy_month = None
 
         if fy_month:
-            import calendar
+            import calendar as _calendar
             # Compute quarter-end months from FY start.
             # FY start = fy_month + 1 (e.g. March FY -> April start)
             # Q1 end = end of month FY_start+2, Q2 = +5, Q3 = +8
@@ -405,16 +1188,16 @@ def get_latest_interim_id(ticker_code, fiscal_year_end=None):
                 for qi, qm in enumerate(reversed(quarter_months)):
                     q_label = ["Q3", "Q2", "Q1"][qi]
                     q_year = base_year - 1 if qm > fy_month else base_year
-                    q_day = calendar.monthrange(q_year, qm)[1]
+                    q_day = _calendar.monthrange(q_year, qm)[1]
                     q_end = date(q_year, qm, q_day)
-                    est_filing = q_end + timedelta(days=45)
+                    est_filing = q_end + timedelta(days=filing_lag_days)
                     # Skip future or too old (>18 months)
                     if est_filing > today or (today - est_filing).days > 540:
                         continue
                     # Post-Apr 2024 reform:
                     #   Q2: semi-annual (160) filed to EDINET
                     #   Q1/Q3: typically TDNet only, but do broad search as fallback
-                    # Pre-Apr 2024: search old quarterly (140) and semi-annual (130)
+                    # Pre-Apr 2024: search old quarterly (140) and semi-annual (160)
                     if q_end >= date(2024, 4, 1):
                         if q_label == "Q2":
                             q_doc_types = [DOC_TYPE_SEMIANNUAL_REPORT_NEW]
@@ -422,9 +1205,16 @@ def get_latest_interim_id(ticker_code, fiscal_year_end=None):
                             # Broad search: None = match any doc type for this secCode
                             q_doc_types = [None]
                     else:
-                        q_doc_types = [DOC_TYPE_QUARTERLY_REPORT, DOC_TYPE_SEMIANNUAL_REPORT]
+                        q_doc_types = [DOC_TYPE_QUARTERLY_REPORT,
+                                       DOC_TYPE_SEMIANNUAL_REPORT_NEW]
                     candidate_dates.append((q_end, est_filing, q_doc_types))
 
+            # Quarter-ends in months the issuer is known to file interims for go
+            # first (e.g. only the semi-annual Q2 since the 2024 reform)
+            known_months = {int(pe[5:7]) for pe, _ in known_interims if len(pe) >= 7}
+            if known_months:
+                candidate_dates.sort(key=lambda c: c[0].month not in known_months)
+
             logger.info("Adaptive interim search: %d candidate quarter-ends", len(candidate_dates))
 
             # Build spiral offsets: 0, -1, +1, -2, +2, ...±20
@@ -433,84 +1223,208 @@ def get_latest_interim_id(ticker_code, fiscal_year_end=None):
                 offsets.extend([-i, i])
 
             for q_end, est_filing, q_doc_types in candidate_dates:
-                if api_calls >= MAX_API_CALLS:
-                    logger.info("Adaptive search: hit API call budget (%d), stopping.", api_calls)
-                    break
-                # Try each doc type separately across all offsets
-                # (1 API call per date instead of 2)
-                for doc_type in q_doc_types:
-                    found = False
-                    for offset in offsets:
-                        if api_calls >= MAX_API_CALLS:
-                            break
-                        d = est_filing + timedelta(days=offset)
-                        doc, calls = _try_date(d, [doc_type])
-                        api_calls += calls
-                        if doc:
-                            logger.info("Adaptive interim search: found in %d API calls", api_calls)
-                            return doc
-                    if found:
-                        break
-
-            if api_calls < MAX_API_CALLS:
-                logger.info("Adaptive interim search exhausted (%d API calls), "
-                            "falling back to window search", api_calls)
-            else:
-                logger.info("API call budget exhausted (%d calls), no interim found.", api_calls)
-                return None
+                for d in fresh(est_filing + timedelta(days=o) for o in offsets):
+                    yield d, q_doc_types, "adaptive"
 
     # --- Fallback: window-based search ---
     current_year = today.year
-
-    INTERIM_WINDOWS = [
-        (2, 1, 2, 28),    # Q3 filing (Jan-Feb) or semi-annual for Sep FY
-        (1, 15, 1, 31),   # Q3 filing (late Jan)
-        (11, 1, 11, 30),  # Q2/semi-annual filing (Nov) for Mar FY
-        (10, 15, 10, 31), # Q2/semi-annual filing (late Oct)
-        (8, 1, 8, 31),    # Q1 filing (Aug) — legacy only
-        (7, 15, 7, 31),   # Q1 filing (late Jul) — legacy only
-    ]
-
     for ms, ds, me, de in INTERIM_WINDOWS:
-        if api_calls >= MAX_API_CALLS:
-            break
         for year in range(current_year, current_year - 2, -1):
-            if api_calls >= MAX_API_CALLS:
-                break
             try:
-                d = date(year, ms, ds)
+                start = date(year, ms, ds)
                 end = date(year, me, de)
             except ValueError:
                 continue
-            while d <= end:
-                if api_calls >= MAX_API_CALLS:
-                    break
-                doc, calls = _try_date(d, doc_types)
-                api_calls += calls
-                if doc:
-                    logger.info("Window interim search: found in %d API calls", api_calls)
-                    return doc
-                d += timedelta(days=1)
+            for d in fresh(start + timedelta(days=i) for i in range((end - start).days + 1)):
+                yield d, doc_types, "window"
 
-    logger.info("No interim report found for secCode=%s (%d API calls)", sec_code, api_calls)
-    return None
 
+def _interims_from_index(sec_code):
+    """Latest interim report of a secCode from the local filing index, or None."""
+    docs = edinet_index.query_filings(
+        sec_code, [DOC_TYPE_SEMIANNUAL_REPORT_NEW, DOC_TYPE_QUARTERLY_REPORT])
+    if not docs:
+        logger.info("No interim report for secCode=%s in the filing index.", sec_code)
+        return None
+    doc = docs[0]
+    doc["doc_type_code"] = doc["doc_type_code_raw"]
+    logger.info("Found interim (index): docType=%s, docID=%s, period=%s, desc=%s",
+                doc["doc_type_code"], doc["doc_id"], doc["period_end"],
+                doc["doc_description"])
+    return doc
 
-def fetch_tanshin(securities_code, edinet_api_key=None):
-    """Fetch the latest 決算短信 (earnings summary) containing forecast data.
 
-    Searches for docTypeCode="140" (四半期報告書/決算短信) and downloads the XBRL.
-    Then extracts forecast/guidance data (業績予想) from the XBRL.
+def get_latest_interim_id(ticker_code, fiscal_year_end=None):
+    """Find the most recent interim report for a ticker.
 
-    Args:
-        securities_code: Stock ticker code (e.g. "7974" or 7974).
-        edinet_api_key: Optional API key override. If None, reads from environment.
+    Searches for:
+      - docTypeCode=160 (半期報告書, new semi-annual post-Apr 2024)
+      - docTypeCode=140 (四半期報告書, legacy Q1/Q2/Q3, abolished Apr 2024)
+      - Broad secCode-based search for post-2024 Q1/Q3 (any doc type)
 
-    Returns:
-        dict with keys:
-            'forecast_data': {forecast_revenue, forecast_operating_income, ...} in JPY mn
-            'doc_id': EDINET document ID
-            'period_end': Period end date string
+    If fiscal_year_end is provided (e.g. "2024-03-31"), or known from the
+    issuer's filing calendar, uses Adaptive Search:
+      1. Compute the 3 quarter-end dates from FY end
+      2. Estimate filing date = quarter_end + the issuer's last observed
+         filing lag (45 days if the calendar has no interim report yet)
+      3. Search outward from each estimated filing date
+    Otherwise falls back to window-based search (see _interim_search_plan).
+    A found report is recorded in the filing calendar.
+
+    If the local filing index covers the last 18 months, the index is queried
+    directly and none of the date heuristics above are needed.
+
+    Returns the newest one found (by period_end), or None.
+    """
+    api_key = _get_api_key()
+    sec_code = str(ticker_code).strip() + SEC_CODE_SUFFIX
+    today = date.today()
+
+    if not _known_tickers([ticker_code]):
+        return None
+
+    logger.info("Searching for latest interim report (160/140): secCode=%s", sec_code)
+
+    if _filing_index_ready(today - timedelta(days=540)):
+        return _interims_from_index(sec_code)
+
+    api_calls = 0
+    in_flight = 0
+    phase_of = {}
+    found = None
+
+    def candidates():
+        nonlocal in_flight
+        for d, doc_types, phase in _interim_search_plan(sec_code, fiscal_year_end, today):
+            if api_calls + in_flight >= INTERIM_MAX_API_CALLS:
+                logger.info("API call budget exhausted (%d calls), no interim found.",
+                            INTERIM_MAX_API_CALLS)
+                return
+            phase_of[d] = (doc_types, phase)
+            in_flight += 1
+            yield d
+
+    for d, result in _probe_dates(api_key, candidates(), sec_code, doc_type_code=None,
+                                  stop=lambda: found is not None):
+        in_flight -= 1
+        api_calls += 1
+        if found is None:
+            doc_types, phase = phase_of[d]
+            found = _pick_interim(result, doc_types)
+            if found:
+                logger.info("%s interim search: found in %d API calls",
+                            phase.capitalize(), api_calls)
+
+    if found:
+        edinet_index.record_filing_dates(sec_code, [found])
+        return found
+
+    logger.info("No interim report found for secCode=%s (%d API calls)", sec_code, api_calls)
+    return None
+
+
+def get_latest_interim_ids_batch(tickers, fiscal_year_ends=None):
+    """Find the latest interim report for several tickers in one date sweep.
+
+    Each ticker's candidate dates come from the same plan as
+    get_latest_interim_id(); the plans are interleaved and every date's
+    listing is fetched once and checked for all tickers, so tickers sharing
+    a fiscal year end share their probes.
+
+    Args:
+        tickers: Iterable of stock ticker codes.
+        fiscal_year_ends: Optional {ticker: "YYYY-MM-DD"} of latest FY ends.
+
+    Returns:
+        dict: {ticker: interim document dict or None}; None also for tickers
+        missing from the issuer master (never probed).
+    """
+    tickers = list(tickers)
+    results = {t: None for t in tickers}
+    results.update(_interim_ids_batch(_known_tickers(tickers), fiscal_year_ends))
+    return results
+
+
+def _interim_ids_batch(tickers, fiscal_year_ends):
+    """Date sweep behind get_latest_interim_ids_batch() for validated tickers."""
+    api_key = _get_api_key()
+    today = date.today()
+    fiscal_year_ends = fiscal_year_ends or {}
+    sec_of = {t: str(t).strip() + SEC_CODE_SUFFIX for t in tickers}
+    found = {t: None for t in sec_of}
+
+    if _filing_index_ready(today - timedelta(days=540)):
+        return {t: _interims_from_index(sec) for t, sec in sec_of.items()}
+
+    plans = {t: _interim_search_plan(sec, fiscal_year_ends.get(t), today)
+             for t, sec in sec_of.items()}
+    budget = {t: INTERIM_MAX_API_CALLS for t in sec_of}
+    unresolved = set(sec_of)
+    planning = set(sec_of)   # tickers whose plan still has dates and budget
+    swept = {}     # date -> {sec_code: matches}
+    waiting = {}   # date -> [(ticker, doc_types)] awaiting that date's listing
+
+    def resolve(t, matches, doc_types):
+        if t in unresolved:
+            doc = _pick_interim(matches.get(sec_of[t], []), doc_types)
+            if doc:
+                found[t] = doc
+                unresolved.discard(t)
+
+    def candidates():
+        # Round-robin over the tickers' plans; a date already swept for another
+        # ticker is answered from memory instead of being probed again
+        while planning & unresolved:
+            for t in list(planning):
+                if t not in unresolved or budget[t] <= 0:
+                    planning.discard(t)
+                    continue
+                step = next(plans[t], None)
+                if step is None:
+                    planning.discard(t)
+                    continue
+                d, doc_types, _ = step
+                budget[t] -= 1
+                if d in swept:
+                    resolve(t, swept[d], doc_types)
+                elif d in waiting:
+                    waiting[d].append((t, doc_types))
+                else:
+                    waiting[d] = [(t, doc_types)]
+                    yield d
+
+    api_calls = 0
+    for d, matches in _sweep_dates(api_key, candidates(), sec_of.values(),
+                                   doc_type_code=None, stop=lambda: not unresolved):
+        api_calls += 1
+        swept[d] = matches
+        for t, doc_types in waiting.pop(d, []):
+            resolve(t, matches, doc_types)
+
+    for t, doc in found.items():
+        if doc:
+            edinet_index.record_filing_dates(sec_of[t], [doc])
+    logger.info("Batch interim search: %d/%d ticker(s) resolved in %d API calls",
+                sum(1 for doc in found.values() if doc), len(found), api_calls)
+    return found
+
+
+def fetch_tanshin(securities_code, edinet_api_key=None, refresh=False):
+    """Fetch the latest 決算短信 (earnings summary) containing forecast data.
+
+    Searches for docTypeCode="140" (四半期報告書/決算短信) and downloads the XBRL.
+    Then extracts forecast/guidance data (業績予想) from the XBRL.
+
+    Args:
+        securities_code: Stock ticker code (e.g. "7974" or 7974).
+        edinet_api_key: Optional API key override. If None, reads from environment.
+        refresh: If True, re-download the package even if it is cached.
+
+    Returns:
+        dict with keys:
+            'forecast_data': {forecast_revenue, forecast_operating_income, ...} in JPY mn
+            'doc_id': EDINET document ID
+            'period_end': Period end date string
         Returns None if no tanshin found or no forecast data extracted.
     """
     if edinet_api_key:
@@ -543,39 +1457,36 @@ def fetch_tanshin(securities_code, edinet_api_key=None):
                 result = _search_single_date(api_key, d, sec_code, doc_type)
                 api_calls += 1
                 if result is None:
-                    time.sleep(3)
                     continue
                 if result:
                     found_doc = result[0]
                     logger.info("Found tanshin candidate: docID=%s, period=%s, type=%s",
                                 found_doc["doc_id"], found_doc["period_end"], doc_type)
                     break
-                time.sleep(REQUEST_DELAY_SEC)
 
     if not found_doc:
         logger.info("No 決算短信 found for secCode=%s (%d API calls)", sec_code, api_calls)
         return None
 
-    # Download and extract XBRL
+    # Download the package and read its XBRL instance
     try:
-        dl_result = download_and_extract_xbrl(found_doc["doc_id"])
+        dl_result = fetch_xbrl_instance(found_doc["doc_id"], refresh=refresh)
     except EdinetApiError as e:
         logger.warning("Failed to download tanshin docID=%s: %s", found_doc["doc_id"], e)
         return None
 
-    xbrl_files = [f for f in dl_result["xbrl_files"] if f.lower().endswith(".xbrl")]
-    if not xbrl_files:
-        logger.warning("No XBRL files in tanshin docID=%s", found_doc["doc_id"])
-        return None
-
     # Parse and extract forecast data
     try:
-        from scripts.edinet_parser import parse_xbrl_file, extract_forecast_data
+        from scripts.edinet_parser import extract_forecast_data
     except ImportError:
-        from edinet_parser import parse_xbrl_file, extract_forecast_data
+        from edinet_parser import extract_forecast_data
 
-    soup = parse_xbrl_file(xbrl_files[0])
-    forecast_data = extract_forecast_data(soup)
+    try:
+        facts = _load_filing_facts(*_instance_payload(dl_result))
+    except ValueError as e:
+        logger.warning("Unreadable tanshin docID=%s: %s", found_doc["doc_id"], e)
+        return None
+    forecast_data = extract_forecast_data(facts)
 
     if not forecast_data:
         logger.info("No forecast data found in tanshin docID=%s", found_doc["doc_id"])
@@ -588,100 +1499,307 @@ def fetch_tanshin(securities_code, edinet_api_key=None):
     }
 
 
-def download_and_extract_xbrl(doc_id, output_dir=None):
-    """Download a full disclosure ZIP from EDINET and extract XBRL files.
-
-    Args:
-        doc_id: EDINET document ID string (e.g. "S100XXXX").
-        output_dir: Directory to extract files into. Defaults to a temp directory
-                    under the script's parent folder.
+def download_issuer_list():
+    """Download the current EDINET code list (Edinetcode.zip).
 
     Returns:
-        dict with keys:
-            'extract_dir': Path to the extracted root directory.
-            'xbrl_files': List of absolute paths to .xbrl and iXBRL (.htm) files
-                          found in XBRL/PublicDoc/.
-            'doc_id': The document ID used.
+        bytes: The ZIP, for edinet_index.ingest_issuer_list().
 
     Raises:
-        EdinetApiKeyMissing: If API key is not configured.
-        EdinetApiError: On download or extraction failure.
+        EdinetApiError: On download failure.
     """
-    api_key = _get_api_key()
+    try:
+        resp = get_client().get("codelist", ISSUER_LIST_URL)
+    except EdinetNetworkError as e:
+        raise EdinetApiError(f"Network error downloading the EDINET code list: {e}") from e
+    if resp.status_code != 200:
+        raise EdinetApiError(f"HTTP {resp.status_code} downloading the EDINET code list.")
+    fetch_metrics.incr("bytes.codelist", len(resp.content))
+    return resp.content
+
 
+def _default_output_dir(output_dir=None):
     if output_dir is None:
         script_dir = os.path.dirname(os.path.abspath(__file__))
         output_dir = os.path.join(script_dir, "..", "tmp", "edinet_data")
+    return os.path.abspath(output_dir)
+
+
+def _chunk_size(total_bytes):
+    """Read chunk size for a download of total_bytes (None = unknown)."""
+    if not total_bytes:
+        return DOWNLOAD_CHUNK_MIN
+    return max(DOWNLOAD_CHUNK_MIN, min(DOWNLOAD_CHUNK_MAX, total_bytes // 32))
+
+
+def _content_range_total(resp):
+    """Total size from a 'Content-Range: bytes a-b/total' header, or None."""
+    total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def _verify_package_zip(path, doc_id, expected_size=None):
+    """Check a downloaded package's size and every member's CRC.
+
+    Raises:
+        EdinetApiError: If the file is truncated or not an intact ZIP.
+    """
+    size = os.path.getsize(path)
+    if expected_size is not None and size != expected_size:
+        raise EdinetApiError(
+            f"Download of docID={doc_id} is truncated ({size} of {expected_size} bytes)."
+        )
+    try:
+        with zipfile.ZipFile(path, "r") as zf:
+            bad_member = zf.testzip()
+    except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+        raise EdinetApiError(
+            f"Downloaded file for docID={doc_id} is not a valid ZIP: {e}"
+        ) from e
+    if bad_member is not None:
+        raise EdinetApiError(f"CRC mismatch in docID={doc_id} member {bad_member}.")
+
+
+def _stream_to_part(doc_id, download_url, params, part_path, download_type):
+    """Stream a package body into part_path, resuming after dropped connections.
+
+    Returns:
+        tuple: (expected_size or None, resumed) where resumed is True if any
+        bytes came from an earlier attempt or run (HTTP 206 / 416).
+    """
+    expected_size = None
+    resumed = False
+    total_bytes = 0
+    try:
+        for attempt in range(DOWNLOAD_RESUME_ATTEMPTS + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else None
 
-    output_dir = os.path.abspath(output_dir)
+            try:
+                resp = get_client().get("documents", download_url, params=params,
+                                        stream=True, headers=headers)
+            except EdinetNetworkError as e:
+                raise EdinetApiError(f"Network error downloading docID={doc_id}: {e}") from e
+
+            if resp.status_code == 416 and offset:
+                # Nothing left to send: the .part already holds the whole body
+                resp.close()
+                return _content_range_total(resp) or offset, True
+            if resp.status_code == 404:
+                resp.close()
+                raise EdinetApiError(
+                    f"HTTP 404 Not Found: Document docID={doc_id} does not exist on EDINET."
+                )
+            if resp.status_code not in (200, 206):
+                detail = resp.text[:200]
+                resp.close()
+                raise EdinetApiError(
+                    f"HTTP {resp.status_code} error downloading docID={doc_id}: {detail}"
+                )
+
+            # Verify we received a ZIP file
+            content_type = resp.headers.get("Content-Type", "")
+            if "zip" not in content_type and "octet-stream" not in content_type:
+                resp.close()
+                raise EdinetApiError(
+                    f"Unexpected Content-Type '{content_type}' for docID={doc_id}. "
+                    f"Expected a ZIP file (type={download_type}). "
+                    "The API may have returned an error page."
+                )
+
+            if resp.status_code == 206:
+                expected_size = _content_range_total(resp)
+                resumed, mode = True, "ab"
+                logger.info("Resuming docID=%s at %.1f MB", doc_id, offset / 1_048_576)
+            else:
+                length = resp.headers.get("Content-Length", "")
+                expected_size = int(length) if length.isdigit() else None
+                resumed, mode = False, "wb"
+
+            try:
+                with open(part_path, mode) as f:
+                    for chunk in resp.iter_content(chunk_size=_chunk_size(expected_size)):
+                        f.write(chunk)
+                        total_bytes += len(chunk)
+            except requests.RequestException as e:
+                if attempt == DOWNLOAD_RESUME_ATTEMPTS:
+                    raise EdinetApiError(
+                        f"Download of docID={doc_id} kept failing after "
+                        f"{DOWNLOAD_RESUME_ATTEMPTS} resumes: {e}"
+                    ) from e
+                logger.warning("Download of docID=%s interrupted at %.1f MB (%s). Resuming...",
+                               doc_id, os.path.getsize(part_path) / 1_048_576, e)
+                fetch_metrics.incr("retries.documents")
+                continue
+            finally:
+                resp.close()
+            return expected_size, resumed
+    finally:
+        fetch_metrics.incr("bytes.documents", total_bytes)
+
+
+def _download_package_zip(doc_id, output_dir, download_type=DOWNLOAD_TYPE_PACKAGE):
+    """Download a package ZIP for a docID into output_dir.
+
+    The body is streamed into {zip}.part. If the connection drops, the download
+    resumes from the bytes already on disk with an HTTP Range request (a server
+    answering 200 instead of 206 restarts it from scratch). The finished file
+    is only renamed into place after its size and ZIP CRCs verify; a resumed
+    file that fails verification is downloaded once more from scratch.
+
+    Args:
+        doc_id: EDINET document ID string.
+        output_dir: Directory the ZIP is written to.
+        download_type: DOWNLOAD_TYPE_PACKAGE (type=1) or DOWNLOAD_TYPE_CSV (type=5).
+
+    Returns:
+        str: Path of the downloaded ZIP (caller removes it).
+
+    Raises:
+        EdinetApiError: On download failure (see download_and_extract_xbrl)
+                        or a package that fails verification.
+    """
+    api_key = _get_api_key()
     os.makedirs(output_dir, exist_ok=True)
 
-    # Download ZIP (type=1: full submission package including XBRL)
+    # Download ZIP (type=1: full submission package, type=5: XBRL-to-CSV)
     download_url = f"{DOCUMENT_DOWNLOAD_URL}/{doc_id}"
     params = {
-        "type": 1,
+        "type": download_type,
         "Subscription-Key": api_key,
     }
+    zip_path = os.path.join(output_dir, f"{doc_id}.type{download_type}.zip")
+    part_path = f"{zip_path}.part"
 
-    logger.info("Downloading ZIP for docID=%s ...", doc_id)
+    logger.info("Downloading ZIP (type=%d) for docID=%s ...", download_type, doc_id)
 
+    expected_size, resumed = _stream_to_part(doc_id, download_url, params, part_path,
+                                             download_type)
     try:
-        resp = requests.get(download_url, params=params, timeout=120, stream=True)
-    except requests.RequestException as e:
-        raise EdinetApiError(f"Network error downloading docID={doc_id}: {e}") from e
+        _verify_package_zip(part_path, doc_id, expected_size)
+    except EdinetApiError as e:
+        os.remove(part_path)  # never resume from a corrupt file
+        if not resumed:
+            raise
+        logger.warning("%s Downloading docID=%s again from scratch.", e, doc_id)
+        expected_size, _ = _stream_to_part(doc_id, download_url, params, part_path,
+                                           download_type)
+        try:
+            _verify_package_zip(part_path, doc_id, expected_size)
+        except EdinetApiError:
+            os.remove(part_path)
+            raise
+    os.replace(part_path, zip_path)
 
-    if resp.status_code == 401:
-        raise EdinetApiError(
-            "HTTP 401 Unauthorized: API key is invalid or expired."
-        )
-    if resp.status_code == 404:
-        raise EdinetApiError(
-            f"HTTP 404 Not Found: Document docID={doc_id} does not exist on EDINET."
-        )
-    if resp.status_code == 429:
-        raise EdinetRateLimitError(
-            "HTTP 429 Too Many Requests: EDINET API rate limit exceeded. "
-            "Please wait and try again."
-        )
-    if resp.status_code != 200:
-        raise EdinetApiError(
-            f"HTTP {resp.status_code} error downloading docID={doc_id}: "
-            f"{resp.text[:200]}"
-        )
+    logger.info("Downloaded %s (%.1f MB)", zip_path, os.path.getsize(zip_path) / 1_048_576)
+    return zip_path
 
-    # Verify we received a ZIP file
-    content_type = resp.headers.get("Content-Type", "")
-    if "zip" not in content_type and "octet-stream" not in content_type:
-        raise EdinetApiError(
-            f"Unexpected Content-Type '{content_type}' for docID={doc_id}. "
-            "Expected a ZIP file (type=1). The API may have returned an error page."
-        )
 
-    # Save ZIP
-    zip_path = os.path.join(output_dir, f"{doc_id}.zip")
-    total_bytes = 0
-    with open(zip_path, "wb") as f:
-        for chunk in resp.iter_content(chunk_size=8192):
-            f.write(chunk)
-            total_bytes += len(chunk)
+@contextmanager
+def _package_lock(extract_dir):
+    """Single-flight lock on one package directory across threads and processes.
+
+    Yields True if another holder had to be waited for (re-check the cache).
+
+    Raises:
+        EdinetApiError: If the lock is not released within PACKAGE_LOCK_TIMEOUT_SEC.
+    """
+    name = edinet_cache.package_lock_name(extract_dir)
+    try:
+        with edinet_cache.cache_lock(name, timeout=PACKAGE_LOCK_TIMEOUT_SEC) as waited:
+            yield waited
+    except edinet_cache.CacheLockTimeout as e:
+        raise EdinetApiError(f"Another run is still fetching {extract_dir}: {e}") from e
+
+
+def _cached_extracted_package(doc_id, extract_dir):
+    """download_and_extract_xbrl() result for a cached extracted package, or None."""
+    cached_files = edinet_cache.load_package(extract_dir)
+    if not cached_files:
+        return None
+    logger.info("Using cached package for docID=%s (%d file(s))", doc_id, len(cached_files))
+    return {
+        "extract_dir": extract_dir,
+        "xbrl_files": cached_files,
+        "doc_id": doc_id,
+        "from_cache": True,
+    }
+
+
+def download_and_extract_xbrl(doc_id, output_dir=None, refresh=False):
+    """Download a full disclosure ZIP from EDINET and extract XBRL files.
+
+    Extracts the package's fact documents (.xbrl instances and *_ixbrl.htm,
+    AuditDoc excluded) uncompressed to disk; PDFs, images and schemas are not
+    kept. Pipelines that only need the facts should use fetch_xbrl_instance(),
+    which stores the instance compressed.
 
-    logger.info("Downloaded %s (%.1f MB)", zip_path, total_bytes / 1_048_576)
+    A published docID never changes, so an already extracted package whose
+    manifest verifies (see edinet_cache.load_package) is returned without any
+    network access. Concurrent calls for the same docID (other threads or
+    processes) download it once; the others wait and reuse the result.
 
-    # Extract ZIP
+    Args:
+        doc_id: EDINET document ID string (e.g. "S100XXXX").
+        output_dir: Directory to extract files into. Defaults to a temp directory
+                    under the script's parent folder.
+        refresh: If True, ignore the cached package and download again.
+
+    Returns:
+        dict with keys:
+            'extract_dir': Path to the extracted root directory.
+            'xbrl_files': List of absolute paths to .xbrl and iXBRL (.htm) files
+                          found in XBRL/PublicDoc/.
+            'doc_id': The document ID used.
+            'from_cache': True if the package was served from the cache.
+
+    Raises:
+        EdinetApiKeyMissing: If API key is not configured.
+        EdinetRateLimitError: If still rate-limited after the client's retries.
+        EdinetApiError: On download or extraction failure.
+    """
+    output_dir = _default_output_dir(output_dir)
     extract_dir = os.path.join(output_dir, doc_id)
+
+    if not refresh:
+        cached = _cached_extracted_package(doc_id, extract_dir)
+        fetch_metrics.record_cache("package", bool(cached))
+        if cached:
+            return cached
+
+    with _package_lock(extract_dir) as waited:
+        if waited and not refresh:
+            cached = _cached_extracted_package(doc_id, extract_dir)
+            if cached:
+                fetch_metrics.incr("single_flight.package")
+                return cached
+        return _download_and_extract(doc_id, output_dir, extract_dir)
+
+
+def _download_and_extract(doc_id, output_dir, extract_dir):
+    """Download step of download_and_extract_xbrl() (caller holds the package lock)."""
+    zip_path = _download_package_zip(doc_id, output_dir)
+
+    # Extract the fact documents only; PDFs, images, AuditDoc and schemas
+    # would just fill the package store
     if os.path.exists(extract_dir):
         import shutil
         shutil.rmtree(extract_dir)
 
     try:
         with zipfile.ZipFile(zip_path, "r") as zf:
-            zf.extractall(extract_dir)
+            members = [info.filename for info in zf.infolist()
+                       if not info.is_dir() and _is_fact_document(info.filename)]
+            zf.extractall(extract_dir, members=members)
     except zipfile.BadZipFile as e:
         raise EdinetApiError(
             f"Downloaded file for docID={doc_id} is not a valid ZIP: {e}"
         ) from e
+    finally:
+        os.remove(zip_path)
+        logger.info("Cleaned up ZIP file: %s", zip_path)
 
-    logger.info("Extracted to: %s", extract_dir)
+    logger.info("Extracted %d fact document(s) to: %s", len(members), extract_dir)
 
     # Find XBRL/iXBRL files in XBRL/PublicDoc/
     xbrl_files = _find_xbrl_files(extract_dir)
@@ -697,17 +1815,292 @@ def download_and_extract_xbrl(doc_id, output_dir=None):
     for f in xbrl_files:
         logger.info("  %s", f)
 
-    # Clean up ZIP file (keep extracted data)
-    os.remove(zip_path)
-    logger.info("Cleaned up ZIP file: %s", zip_path)
+    if xbrl_files:
+        edinet_cache.write_package_manifest(extract_dir, doc_id, xbrl_files)
 
     return {
         "extract_dir": extract_dir,
         "xbrl_files": xbrl_files,
         "doc_id": doc_id,
+        "from_cache": False,
+    }
+
+
+def _instance_members(zf):
+    """Kind and names of the fact documents in a package ZIP (central directory only).
+
+    Prefers XBRL/PublicDoc/*.xbrl; falls back to any .xbrl outside AuditDoc,
+    and for packages without an instance document to their Inline XBRL set
+    (PublicDoc/*_ixbrl.htm).
+
+    Returns:
+        tuple: ("xbrl", names) or ("ixbrl", names); names is empty if the
+        package has neither.
+    """
+    try:
+        from scripts.edinet_parser import ixbrl_members
+    except ImportError:
+        from edinet_parser import ixbrl_members
+    names = [info.filename for info in zf.infolist() if not info.is_dir()]
+    public = [n for n in names
+              if n.lower().endswith(".xbrl") and n.split("/")[-2:-1] == ["PublicDoc"]]
+    if public:
+        return "xbrl", sorted(public)
+    instances = sorted(n for n in names
+                       if n.lower().endswith(".xbrl") and "AuditDoc" not in n.split("/"))
+    if instances:
+        return "xbrl", instances
+    return "ixbrl", ixbrl_members(names)
+
+
+def _instance_result(doc_id, kind, contents, extract_dir, from_cache):
+    """fetch_xbrl_instance() result for the (name, bytes) fact documents of a filing."""
+    return {
+        "doc_id": doc_id,
+        "instance_kind": kind,
+        "instance_name": contents[0][0].rsplit("/", 1)[-1],
+        "instance_bytes": contents[0][1],
+        "documents": contents,
+        "members": [name for name, _ in contents],
+        "extract_dir": extract_dir,
+        "from_cache": from_cache,
     }
 
 
+def _instance_payload(result):
+    """(kind, payload) of a fetch_xbrl_instance() result for _load_filing_facts()."""
+    if result.get("instance_kind") == "ixbrl":
+        return "ixbrl", result["documents"]
+    return "xbrl", result["instance_bytes"]
+
+
+def fetch_xbrl_instance(doc_id, output_dir=None, refresh=False, extract=False):
+    """Fetch the XBRL instance document of a filing without extracting the package.
+
+    Downloads the package ZIP, reads its central directory and opens only the
+    XBRL/PublicDoc/*.xbrl member(s) — or, for a package that ships only Inline
+    XBRL, its *_ixbrl.htm documents. The instance bytes are returned for
+    edinet_parser to parse directly, and only the instance
+    file is kept in the package store tmp/edinet_data/{docID}/ (compressed, see
+    edinet_cache.store_members) so later runs hit the cache. PDFs, images,
+    AuditDoc and linkbases are never written to disk unless `extract` is set.
+    Concurrent calls for the same docID download it once (see _package_lock).
+
+    Args:
+        doc_id: EDINET document ID string (e.g. "S100XXXX").
+        output_dir: Package store directory (default: tmp/edinet_data).
+        refresh: If True, ignore the cached package and download again.
+        extract: If True, also extract the whole package (debugging).
+
+    Returns:
+        dict with keys:
+            'doc_id': The document ID used.
+            'instance_kind': "xbrl", or "ixbrl" for an Inline XBRL-only package.
+            'instance_name': File name of the (first) instance document.
+            'instance_bytes': Raw bytes of the (first) instance document.
+            'documents': (package-relative name, bytes) of every member read.
+            'members': Package-relative names of the member(s).
+            'extract_dir': Package directory under output_dir.
+            'from_cache': True if served from the package cache.
+
+    Raises:
+        EdinetApiError: On download failure, invalid ZIP or missing instance.
+    """
+    output_dir = _default_output_dir(output_dir)
+    extract_dir = os.path.join(output_dir, doc_id)
+
+    if extract:
+        result = download_and_extract_xbrl(doc_id, output_dir, refresh=refresh)
+        kind = "xbrl"
+        xbrl_files = [f for f in result["xbrl_files"] if f.lower().endswith(".xbrl")]
+        if not xbrl_files:
+            kind = "ixbrl"
+            xbrl_files = [f for f in result["xbrl_files"] if f.lower().endswith(".htm")]
+        if not xbrl_files:
+            raise EdinetApiError(f"No XBRL instance document in docID={doc_id}.")
+        contents = []
+        for path in xbrl_files:
+            with open(path, "rb") as f:
+                contents.append((os.path.relpath(path, extract_dir).replace(os.sep, "/"),
+                                 f.read()))
+        result.update(_instance_result(doc_id, kind, contents, extract_dir,
+                                       result["from_cache"]))
+        result["xbrl_files"] = xbrl_files
+        return result
+
+    if not refresh:
+        cached = _cached_instance(doc_id, extract_dir)
+        fetch_metrics.record_cache("package", bool(cached))
+        if cached:
+            return cached
+
+    with _package_lock(extract_dir) as waited:
+        if waited and not refresh:
+            cached = _cached_instance(doc_id, extract_dir)
+            if cached:
+                fetch_metrics.incr("single_flight.package")
+                return cached
+        return _download_instance(doc_id, output_dir, extract_dir)
+
+
+def _cached_instance(doc_id, extract_dir):
+    """fetch_xbrl_instance() result for a stored instance document, or None."""
+    try:
+        from scripts.edinet_parser import ixbrl_members
+    except ImportError:
+        from edinet_parser import ixbrl_members
+    members = edinet_cache.read_package(extract_dir) or []
+    kind = "xbrl"
+    cached = [(name, data) for name, data in members if name.lower().endswith(".xbrl")]
+    if not cached:
+        kind = "ixbrl"
+        names = set(ixbrl_members([name for name, _ in members]))
+        cached = [(name, data) for name, data in members if name in names]
+    if not cached:
+        return None
+    logger.info("Using cached instance for docID=%s", doc_id)
+    return _instance_result(doc_id, kind, cached, extract_dir, True)
+
+
+def _download_instance(doc_id, output_dir, extract_dir):
+    """Download step of fetch_xbrl_instance() (caller holds the package lock)."""
+    zip_path = _download_package_zip(doc_id, output_dir)
+    try:
+        with zipfile.ZipFile(zip_path, "r") as zf:
+            kind, members = _instance_members(zf)
+            if not members:
+                raise EdinetApiError(f"No XBRL instance document in docID={doc_id}.")
+            contents = [(name, zf.read(name)) for name in members]
+    except zipfile.BadZipFile as e:
+        raise EdinetApiError(
+            f"Downloaded file for docID={doc_id} is not a valid ZIP: {e}"
+        ) from e
+    finally:
+        os.remove(zip_path)
+
+    # Keep only the instance document(s) in the store, at their package-relative paths
+    edinet_cache.store_members(extract_dir, doc_id, contents)
+
+    logger.info("Read %d %s member(s) from docID=%s: %s",
+                len(contents), "Inline XBRL" if kind == "ixbrl" else "instance", doc_id,
+                ", ".join(n.rsplit("/", 1)[-1] for n, _ in contents))
+
+    return _instance_result(doc_id, kind, contents, extract_dir, False)
+
+
+def _csv_members(zf):
+    """Names of the main-report CSVs in a type=5 ZIP (auditor reports excluded)."""
+    return sorted(
+        info.filename for info in zf.infolist()
+        if info.filename.lower().endswith(".csv")
+        and not info.filename.rsplit("/", 1)[-1].startswith("jpaud")
+    )
+
+
+def fetch_xbrl_csv(doc_id, output_dir=None, refresh=False):
+    """Fetch EDINET's XBRL-to-CSV rendering (type=5) of a filing.
+
+    The CSV holds the same facts as the instance document (element ID,
+    context ID, value) and is loaded by edinet_parser.parse_xbrl_csv().
+    The CSV is kept (compressed) in the package store under
+    tmp/edinet_data/{docID}_csv/.
+
+    Args:
+        doc_id: EDINET document ID string (e.g. "S100XXXX").
+        output_dir: Package store directory (default: tmp/edinet_data).
+        refresh: If True, ignore the cached CSV and download again.
+
+    Returns:
+        dict with keys:
+            'doc_id': The document ID used.
+            'csv_name': File name of the main-report CSV.
+            'csv_bytes': Raw bytes of that CSV (UTF-16, tab-separated).
+            'members': Package-relative names of the CSV member(s).
+            'extract_dir': Cache directory under output_dir.
+            'from_cache': True if served from the package cache.
+
+    Raises:
+        EdinetApiError: On download failure, invalid ZIP or missing CSV.
+    """
+    output_dir = _default_output_dir(output_dir)
+    extract_dir = os.path.join(output_dir, f"{doc_id}_csv")
+
+    if not refresh:
+        cached = _cached_csv(doc_id, extract_dir)
+        fetch_metrics.record_cache("csv", bool(cached))
+        if cached:
+            return cached
+
+    with _package_lock(extract_dir) as waited:
+        if waited and not refresh:
+            cached = _cached_csv(doc_id, extract_dir)
+            if cached:
+                fetch_metrics.incr("single_flight.package")
+                return cached
+        return _download_csv(doc_id, output_dir, extract_dir)
+
+
+def _cached_csv(doc_id, extract_dir):
+    """fetch_xbrl_csv() result for a stored CSV, or None."""
+    cached = edinet_cache.read_package(extract_dir)
+    if not cached:
+        return None
+    logger.info("Using cached CSV for docID=%s", doc_id)
+    return {
+        "doc_id": doc_id,
+        "csv_name": cached[0][0].rsplit("/", 1)[-1],
+        "csv_bytes": cached[0][1],
+        "members": [name for name, _ in cached],
+        "extract_dir": extract_dir,
+        "from_cache": True,
+    }
+
+
+def _download_csv(doc_id, output_dir, extract_dir):
+    """Download step of fetch_xbrl_csv() (caller holds the package lock)."""
+    zip_path = _download_package_zip(doc_id, output_dir, download_type=DOWNLOAD_TYPE_CSV)
+    try:
+        with zipfile.ZipFile(zip_path, "r") as zf:
+            members = _csv_members(zf)
+            if not members:
+                raise EdinetApiError(f"No XBRL-to-CSV file in docID={doc_id}.")
+            contents = [(name, zf.read(name)) for name in members]
+    except zipfile.BadZipFile as e:
+        raise EdinetApiError(
+            f"Downloaded CSV file for docID={doc_id} is not a valid ZIP: {e}"
+        ) from e
+    finally:
+        os.remove(zip_path)
+
+    edinet_cache.store_members(extract_dir, doc_id, contents)
+
+    return {
+        "doc_id": doc_id,
+        "csv_name": contents[0][0].rsplit("/", 1)[-1],
+        "csv_bytes": contents[0][1],
+        "members": [name for name, _ in contents],
+        "extract_dir": extract_dir,
+        "from_cache": False,
+    }
+
+
+def _resolve_parse_source(source=None):
+    """Pick the fact source: argument > EDINET_PARSE_SOURCE > DEFAULT_PARSE_SOURCE."""
+    source = (source or os.environ.get("EDINET_PARSE_SOURCE") or DEFAULT_PARSE_SOURCE).lower()
+    if source not in PARSE_SOURCES:
+        raise ValueError(
+            f"Unknown parse source '{source}' (expected one of {', '.join(PARSE_SOURCES)})"
+        )
+    return source
+
+
+def _is_fact_document(name):
+    """True for the package members _find_xbrl_files() looks for (AuditDoc excluded)."""
+    lower = name.lower()
+    return (lower.endswith((".xbrl", "ixbrl.htm"))
+            and "AuditDoc" not in name.replace("\\", "/").split("/"))
+
+
 def _find_xbrl_files(extract_dir, search_all=False):
     """Locate XBRL/iXBRL files within the extracted directory.
 
@@ -716,7 +2109,7 @@ def _find_xbrl_files(extract_dir, search_all=False):
             XBRL/
                 PublicDoc/          <- Main disclosure documents
                     *.xbrl          <- XBRL instance documents
-                    *.htm           <- Inline XBRL (iXBRL) documents
+                    *_ixbrl.htm     <- Inline XBRL (iXBRL) documents
                     *.xsd           <- Schema files
                 AuditDoc/           <- Audit-related documents
             ...
@@ -726,7 +2119,8 @@ def _find_xbrl_files(extract_dir, search_all=False):
         search_all: If True, search the entire directory tree (fallback).
 
     Returns:
-        List of absolute paths to .xbrl and .htm files (excluding schemas/stylesheets).
+        List of absolute paths to .xbrl and *_ixbrl.htm files (excluding
+        schemas/stylesheets).
     """
     xbrl_files = []
 
@@ -741,16 +2135,17 @@ def _find_xbrl_files(extract_dir, search_all=False):
             if not os.path.isfile(fpath):
                 continue
             lower = fname.lower()
-            # Include XBRL instance documents and Inline XBRL (htm) files
+            # Include XBRL instance documents and Inline XBRL (*_ixbrl.htm) files
             # Exclude: .xsd (schema), .xml (linkbase), .css, .js
-            if lower.endswith(".xbrl") or (lower.endswith(".htm") and "ixbrl" not in lower):
+            if lower.endswith(".xbrl") or lower.endswith("ixbrl.htm"):
                 xbrl_files.append(os.path.abspath(fpath))
     else:
-        # Fallback: search entire tree
-        for dirpath, _dirs, filenames in os.walk(extract_dir):
+        # Fallback: search entire tree (audit reports excluded)
+        for dirpath, dirs, filenames in os.walk(extract_dir):
+            dirs[:] = [d for d in dirs if d != "AuditDoc"]
             for fname in filenames:
                 lower = fname.lower()
-                if lower.endswith(".xbrl") or lower.endswith(".htm"):
+                if lower.endswith(".xbrl") or lower.endswith("ixbrl.htm"):
                     xbrl_files.append(os.path.abspath(os.path.join(dirpath, fname)))
 
     # Sort for deterministic output (instance docs first, then htm)
@@ -758,17 +2153,367 @@ def _find_xbrl_files(extract_dir, search_all=False):
     return xbrl_files
 
 
-def fetch_and_parse_multi_year(ticker_code, num_years=5, output_dir=None):
+def _fetch_filing_source(doc_id, output_dir=None, refresh=False, extract=False, source=None):
+    """Download a filing's fact source without parsing it.
+
+    With source="csv" the type=5 CSV is fetched; if EDINET has no CSV for the
+    filing, the XBRL instance is used instead.
+
+    Returns:
+        tuple: (kind, payload, name) with kind "csv" or "xbrl" and the raw
+        bytes, or kind "ixbrl" and the (name, bytes) documents of an Inline
+        XBRL-only package; name is the file they came from. Pass to
+        _load_filing_facts().
+
+    Raises:
+        EdinetApiError: If the filing cannot be downloaded.
+    """
+    if _resolve_parse_source(source) == "csv" and not extract:
+        try:
+            result = fetch_xbrl_csv(doc_id, output_dir, refresh=refresh)
+            return "csv", result["csv_bytes"], result["csv_name"]
+        except EdinetApiError as e:
+            logger.warning("CSV unavailable for docID=%s (%s), parsing XBRL instead.",
+                           doc_id, e)
+
+    result = fetch_xbrl_instance(doc_id, output_dir, refresh=refresh, extract=extract)
+    return _instance_payload(result) + (result["instance_name"],)
+
+
+def _load_filing_facts(kind, payload):
+    """Load a payload from _fetch_filing_source() through the parser's fact cache.
+
+    Returns:
+        CachedFacts for a document parsed before, else XbrlFacts, CsvFacts
+        or IxbrlFacts.
+    """
+    try:
+        from scripts.edinet_parser import parse_xbrl_cached, CachedFacts
+    except ImportError:
+        from edinet_parser import parse_xbrl_cached, CachedFacts
+    with fetch_metrics.timer(f"parse.{kind}"):
+        doc = parse_xbrl_cached(payload, kind)
+    fetch_metrics.record_cache("facts", isinstance(doc, CachedFacts))
+    return doc
+
+
+def fetch_filing_facts(doc_id, output_dir=None, refresh=False, extract=False, source=None):
+    """Fetch a filing and load its facts from the configured source.
+
+    Returns:
+        tuple: (doc, name) where doc is an XbrlFacts, CsvFacts or CachedFacts
+        table (all accepted by the edinet_parser extraction functions) and name is the
+        file the facts were read from.
+
+    Raises:
+        EdinetApiError: If the filing cannot be downloaded.
+    """
+    kind, payload, name = _fetch_filing_source(doc_id, output_dir, refresh=refresh,
+                                               extract=extract, source=source)
+    try:
+        return _load_filing_facts(kind, payload), name
+    except ValueError:
+        if kind != "csv":
+            raise
+        logger.warning("Unreadable CSV for docID=%s, parsing XBRL instead.", doc_id)
+        result = fetch_xbrl_instance(doc_id, output_dir, refresh=refresh)
+        return _load_filing_facts(*_instance_payload(result)), result["instance_name"]
+
+
+# =====================================================================
+# AMENDMENTS & EXTRACTION CACHE
+# =====================================================================
+def _document_versions(doc_info):
+    """(doc_id, parent_doc_id) of a filing and of its XBRL-bearing amendments, oldest first.
+
+    Amendments without XBRL (text-only corrections) do not change any fact and
+    are skipped. The docIDs of the merged amendments are noted in
+    doc_info["amendments"].
+    """
+    amendments = [a for a in edinet_index.amendment_chain(doc_info["doc_id"])
+                  if a["has_xbrl"]]
+    doc_info["amendments"] = [a["doc_id"] for a in amendments]
+    return ([(doc_info["doc_id"], None)]
+            + [(a["doc_id"], a["parent_doc_id"]) for a in amendments])
+
+
+def _load_extraction(doc_id, source, refresh=False):
+    """Extraction result of a docID from an earlier run, or None."""
+    cached = None if refresh else edinet_cache.load_extraction(doc_id, source,
+                                                               EXTRACTION_VERSION)
+    fetch_metrics.record_cache("extraction", cached is not None)
+    return cached
+
+
+def _extract_annual(kind, payload):
+    """Parse one annual report and extract (company_info, financial data).
+
+    Runs in a parse_executor() worker (see extract_filings).
+    """
+    try:
+        from scripts.edinet_parser import (
+            identify_clean_contexts, extract_financial_data, extract_company_info,
+        )
+    except ImportError:
+        from edinet_parser import (
+            identify_clean_contexts, extract_financial_data, extract_company_info,
+        )
+    soup = _load_filing_facts(kind, payload)
+    contexts = identify_clean_contexts(soup)
+    return extract_company_info(soup), extract_financial_data(soup, contexts)
+
+
+def _extract_interim(kind, payload):
+    """Parse one interim report and extract its quarterly data (or None)."""
+    try:
+        from scripts.edinet_parser import identify_quarterly_contexts, extract_quarterly_data
+    except ImportError:
+        from edinet_parser import identify_quarterly_contexts, extract_quarterly_data
+    q_soup = _load_filing_facts(kind, payload)
+    q_contexts = identify_quarterly_contexts(q_soup)
+    if not q_contexts:
+        return None
+    return extract_quarterly_data(q_soup, q_contexts)
+
+
+# =====================================================================
+# PARALLEL EXTRACTION
+# =====================================================================
+def _resolve_parse_workers(workers=None):
+    """Worker processes for parsing: argument > EDINET_PARSE_WORKERS > one per CPU."""
+    if workers is None:
+        env = os.environ.get("EDINET_PARSE_WORKERS")
+        workers = int(env) if env else DEFAULT_PARSE_WORKERS
+    return max(0, int(workers))
+
+
+def parse_executor(workers=None, max_tasks=None):
+    """Executor for _submit_extraction(): worker processes, or in-process parsing.
+
+    Workers are started by forkserver (spawn on Windows) rather than fork: the
+    fetch pipeline forks while its download threads hold locks.
+
+    Args:
+        workers: Worker processes (see _resolve_parse_workers); 0 parses in
+                 the calling process, one filing at a time.
+        max_tasks: Upper bound on the tasks to be submitted, if known; no more
+                   workers than that are started.
+    """
+    workers = _resolve_parse_workers(workers)
+    if max_tasks is not None:
+        workers = min(workers, max(1, max_tasks))
+    if workers > 0:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn")
+        try:
+            return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        except (NotImplementedError, OSError) as e:
+            logger.warning("Worker processes unavailable (%s), parsing in-process.", e)
+    return ThreadPoolExecutor(max_workers=1)
+
+
+def _report_kind(doc_info):
+    """"annual" for (amended) annual reports, else "interim"."""
+    if doc_info.get("doc_type_code_raw") in (DOC_TYPE_ANNUAL_REPORT,
+                                             DOC_TYPE_AMENDED_ANNUAL_REPORT):
+        return "annual"
+    return "interim"
+
+
+def _extraction_task(report, kind, payload, isolated):
+    """Worker side of _submit_extraction(): (data, error, metrics of a worker process).
+
+    In a worker process the metrics it recorded are returned for the parent
+    to merge; parse failures come back as a message rather than an exception.
+    """
+    if isolated:
+        fetch_metrics.reset()
+    extract = _extract_annual if report == "annual" else _extract_interim
+    try:
+        data, error = extract(kind, payload), None
+    except ValueError as e:
+        data, error = None, str(e)
+    return data, error, fetch_metrics.snapshot() if isolated else None
+
+
+def _submit_extraction(executor, report, kind, payload):
+    """Queue parse -> identify contexts -> extract of one filing on a parse_executor()."""
+    return executor.submit(_extraction_task, report, kind, payload,
+                           isinstance(executor, ProcessPoolExecutor))
+
+
+def _extraction_result(future):
+    """Extracted data of a _submit_extraction() future; merges the worker's metrics.
+
+    Raises:
+        ValueError: If the filing could not be parsed.
+    """
+    data, error, snap = future.result()
+    if snap:
+        fetch_metrics.merge(snap)
+    if error is not None:
+        raise ValueError(error)
+    return data
+
+
+def extract_filings(filings, workers=None):
+    """Parse and extract many downloaded filings in parallel worker processes.
+
+    Each filing goes through parse -> identify contexts -> extract in a worker;
+    only the extracted dicts cross the process boundary.
+
+    Args:
+        filings: Iterable of (doc_info, kind, payload), with doc_info carrying
+                 doc_id, period_end and doc_type_code_raw, and kind/payload as
+                 returned by _fetch_filing_source().
+        workers: Worker processes (default: EDINET_PARSE_WORKERS, else one per
+                 CPU); 0 parses in this process.
+
+    Returns:
+        list[tuple]: (doc_info, data, error) ordered by period end, then docID.
+        data is (company_info, financial_data) for annual reports and the
+        quarterly dict (or None) for interim reports; error is the parse
+        error message, else None.
+    """
+    filings = list(filings)
+    results = []
+    with parse_executor(workers, max_tasks=len(filings)) as executor:
+        futures = [(doc_info, _submit_extraction(executor, _report_kind(doc_info),
+                                                 kind, payload))
+                   for doc_info, kind, payload in filings]
+        for doc_info, future in futures:
+            try:
+                results.append((doc_info, _extraction_result(future), None))
+            except ValueError as e:
+                results.append((doc_info, None, str(e)))
+    results.sort(key=lambda r: (r[0].get("period_end") or "", r[0]["doc_id"]))
+    return results
+
+
+def prefetch_filing(doc_info, output_dir=None, source=None, refresh=False):
+    """Download a filing and cache its extracted data ahead of a model run.
+
+    Warms the package store and the extraction cache (see edinet_prefetch.py),
+    so fetch_and_parse_multi_year() later finds the filing without any
+    network wait or parse.
+
+    Args:
+        doc_info: Filing dict with doc_id and doc_type_code_raw; parent_doc_id
+                  for amendments.
+        output_dir: Package store directory (default: tmp/edinet_data).
+        source: "xbrl" or "csv" (see PARSE_SOURCES).
+        refresh: If True, download and parse again even if cached.
+
+    Returns:
+        bool: True if the filing's extracted data is cached, False if it has
+        no financial data to extract.
+
+    Raises:
+        EdinetApiError: If the filing cannot be downloaded.
+        ValueError: If the filing cannot be parsed.
+    """
+    source = _resolve_parse_source(source)
+    doc_id = doc_info["doc_id"]
+    if _load_extraction(doc_id, source, refresh) is not None:
+        return True
+
+    kind, payload, _ = _fetch_filing_source(doc_id, output_dir, refresh=refresh,
+                                            source=source)
+    if _report_kind(doc_info) == "annual":
+        data = _extract_annual(kind, payload)
+    else:
+        data = _extract_interim(kind, payload)
+    if data is None:
+        return False
+    edinet_cache.save_extraction(doc_id, source, EXTRACTION_VERSION, data,
+                                 parent_doc_id=doc_info.get("parent_doc_id"))
+    return True
+
+
+def prefetch_filings(doc_infos, output_dir=None, source=None, refresh=False, workers=None):
+    """prefetch_filing() for many filings: downloaded in turn, parsed in worker processes.
+
+    Each landed package is parsed in a parse_executor() worker while the next
+    one downloads, so a backfill is bounded by the rate limiter rather than by
+    parsing.
+
+    Args:
+        doc_infos: Filing dicts as for prefetch_filing().
+        workers: Parse worker processes (see extract_filings).
+
+    Returns:
+        list[tuple]: (doc_info, cached, error) in input order; cached as
+        returned by prefetch_filing(), error the EdinetApiError / ValueError
+        that failed the filing (None on success).
+
+    Raises:
+        EdinetApiKeyMissing: If no API key is configured.
+    """
+    source = _resolve_parse_source(source)
+    doc_infos = list(doc_infos)
+    outcomes = {}
+    with parse_executor(workers, max_tasks=len(doc_infos)) as executor:
+        futures = []
+        for doc_info in doc_infos:
+            doc_id = doc_info["doc_id"]
+            if _load_extraction(doc_id, source, refresh) is not None:
+                outcomes[doc_id] = (True, None)
+                continue
+            try:
+                kind, payload, _ = _fetch_filing_source(doc_id, output_dir, refresh=refresh,
+                                                        source=source)
+            except EdinetApiKeyMissing:
+                raise
+            except EdinetApiError as e:
+                outcomes[doc_id] = (False, e)
+                continue
+            futures.append((doc_info, _submit_extraction(
+                executor, _report_kind(doc_info), kind, payload)))
+
+        for doc_info, future in futures:
+            try:
+                data = _extraction_result(future)
+            except ValueError as e:
+                outcomes[doc_info["doc_id"]] = (False, e)
+                continue
+            if data is not None:
+                edinet_cache.save_extraction(doc_info["doc_id"], source, EXTRACTION_VERSION,
+                                             data, parent_doc_id=doc_info.get("parent_doc_id"))
+            outcomes[doc_info["doc_id"]] = (data is not None, None)
+    return [(d,) + outcomes[d["doc_id"]] for d in doc_infos]
+
+
+def fetch_and_parse_multi_year(ticker_code, num_years=5, output_dir=None, refresh=False,
+                               extract=False, source=None, parse_workers=None):
     """Fetch multiple years of annual reports + latest quarterly, return merged data with LTM.
 
     Downloads up to `num_years` annual reports and the latest quarterly report,
     parses each XBRL file, merges annual data, and computes LTM if quarterly
     data is available.
 
+    The work is pipelined: annual downloads run DOWNLOAD_CONCURRENCY at a time
+    (still paced by the shared rate limiter), each landed file is parsed in a
+    worker process (see extract_filings) while the next downloads are in
+    flight, and the interim-report search + download runs alongside the
+    annual downloads.
+
+    Corrected reports (訂正報告書) known to the filing index are parsed and
+    merged over the report they amend (edinet_parser.merge_amended_data).
+    Every filing's extracted data is cached per docID, so once a correction
+    appears only the amendment package is downloaded and parsed.
+
     Args:
         ticker_code: Stock ticker code (e.g. "2359").
         num_years: Number of years to fetch (default: 5).
         output_dir: Directory for downloaded files (default: tmp/edinet_data).
+        refresh: If True, re-download packages even if they are cached.
+        extract: If True, extract whole packages to disk (debugging). By default
+                 only the XBRL instance member of each ZIP is read.
+        source: "xbrl" or "csv" (see PARSE_SOURCES); defaults to the
+                EDINET_PARSE_SOURCE env var, else "xbrl".
+        parse_workers: Parse worker processes (default: EDINET_PARSE_WORKERS,
+                       else one per CPU); 0 parses in this process.
 
     Returns:
         tuple: (company_info, merged_data) where merged_data is an OrderedDict
@@ -776,111 +2521,154 @@ def fetch_and_parse_multi_year(ticker_code, num_years=5, output_dir=None):
     """
     try:
         from scripts.edinet_parser import (
-            parse_xbrl_file, identify_clean_contexts, extract_financial_data,
-            extract_company_info, merge_multi_year_data,
-            identify_quarterly_contexts, extract_quarterly_data, calculate_ltm,
+            merge_multi_year_data, merge_amended_data, calculate_ltm,
         )
     except ImportError:
-        from edinet_parser import (
-            parse_xbrl_file, identify_clean_contexts, extract_financial_data,
-            extract_company_info, merge_multi_year_data,
-            identify_quarterly_contexts, extract_quarterly_data, calculate_ltm,
-        )
+        from edinet_parser import merge_multi_year_data, merge_amended_data, calculate_ltm
+    source = _resolve_parse_source(source)
 
     # Step 1: Find annual report document IDs
     doc_infos = get_document_ids(ticker_code, num_years=num_years)
 
+    versions = [v for d in doc_infos for v in _document_versions(d)]
+
     print(f"\nFound {len(doc_infos)} annual report(s):")
     for i, d in enumerate(doc_infos, 1):
         print(f"  [{i}] docID={d['doc_id']}  period={d['period_end']}  filer={d['filer_name']}")
+        for amendment_id in d["amendments"]:
+            print(f"      amended by docID={amendment_id}")
 
-    # Step 2: Download and extract annual reports
-    xbrl_paths_by_period = []
-    for doc_info in doc_infos:
-        doc_id = doc_info["doc_id"]
-        period_end = doc_info["period_end"]
-
-        try:
-            result = download_and_extract_xbrl(doc_id, output_dir)
-        except EdinetApiError as e:
-            logger.warning("Failed to download docID=%s: %s", doc_id, e)
-            continue
-
-        xbrl_files = [f for f in result["xbrl_files"] if f.lower().endswith(".xbrl")]
-        if xbrl_files:
-            xbrl_paths_by_period.append((period_end, xbrl_files[0]))
-            print(f"  Downloaded: {doc_id} -> {os.path.basename(xbrl_files[0])}")
-
-        time.sleep(REQUEST_DELAY_SEC)
-
-    if not xbrl_paths_by_period:
-        raise EdinetApiError("No XBRL files could be downloaded.")
-
-    xbrl_paths_by_period.sort(key=lambda x: x[0], reverse=True)
-
-    # Step 3: Parse annual XBRL files
-    all_year_data = []
-    company_info = None
-
-    for period_end, xbrl_path in xbrl_paths_by_period:
-        soup = parse_xbrl_file(xbrl_path)
-        if company_info is None:
-            company_info = extract_company_info(soup)
-        contexts = identify_clean_contexts(soup)
-        data = extract_financial_data(soup, contexts)
-        all_year_data.append((period_end, data))
-
-    # Step 4: Merge annual data
-    merged = merge_multi_year_data(all_year_data)
-
-    # Step 5: Search for latest quarterly report and compute LTM
-    print("\nSearching for latest interim report (quarterly/semi-annual)...")
     fiscal_year_end = doc_infos[0]["period_end"] if doc_infos else None
-    quarterly_doc = get_latest_interim_id(ticker_code, fiscal_year_end=fiscal_year_end)
+    fetch_kwargs = {"refresh": refresh, "extract": extract, "source": source}
+
+    def search_and_extract_interim():
+        """Latest interim report and its quarterly data, amendments merged in."""
+        doc = get_latest_interim_id(ticker_code, fiscal_year_end=fiscal_year_end)
+        if not doc:
+            return None, None
+        q_data = None
+        for doc_id, parent_doc_id in _document_versions(doc):
+            data = _load_extraction(doc_id, source, refresh)
+            if data is None:
+                try:
+                    kind, payload, _ = _fetch_filing_source(doc_id, output_dir, **fetch_kwargs)
+                    data = _extraction_result(
+                        _submit_extraction(parse_pool, "interim", kind, payload))
+                except (EdinetApiError, ValueError) as e:
+                    logger.warning("Failed to process quarterly report docID=%s: %s",
+                                   doc_id, e)
+                    continue
+                if data is not None:
+                    edinet_cache.save_extraction(doc_id, source, EXTRACTION_VERSION, data,
+                                                 parent_doc_id=parent_doc_id)
+            q_data = merge_amended_data(q_data, data)
+        return doc, q_data
+
+    with ThreadPoolExecutor(max_workers=1) as interim_pool, \
+            ThreadPoolExecutor(max_workers=DOWNLOAD_CONCURRENCY) as download_pool, \
+            parse_executor(parse_workers, max_tasks=len(versions) + 1) as parse_pool:
+        # Step 2: Interim search runs concurrently with the annual pipeline
+        interim_future = interim_pool.submit(search_and_extract_interim)
+
+        # Step 3: Download annual reports and their amendments; parse each one
+        # as soon as it lands. Filings extracted by an earlier run are reused.
+        extracted = {}
+        download_futures = {}
+        for doc_id, parent_doc_id in versions:
+            cached = _load_extraction(doc_id, source, refresh)
+            if cached is not None:
+                extracted[doc_id] = cached
+                continue
+            future = download_pool.submit(_fetch_filing_source, doc_id, output_dir,
+                                          **fetch_kwargs)
+            download_futures[future] = (doc_id, parent_doc_id)
+        parse_futures = []
+        for future in as_completed(download_futures):
+            doc_id, parent_doc_id = download_futures[future]
+            try:
+                kind, payload, name = future.result()
+            except EdinetApiError as e:
+                logger.warning("Failed to download docID=%s: %s", doc_id, e)
+                continue
+            print(f"  Downloaded: {doc_id} -> {name}")
+            parse_futures.append(
+                (doc_id, parent_doc_id,
+                 _submit_extraction(parse_pool, "annual", kind, payload))
+            )
 
-    if quarterly_doc:
-        print(f"  Found: docID={quarterly_doc['doc_id']}  "
-              f"period={quarterly_doc['period_end']}  "
-              f"desc={quarterly_doc['doc_description']}")
+        if not parse_futures and not extracted:
+            raise EdinetApiError("No XBRL files could be downloaded.")
 
-        try:
-            q_result = download_and_extract_xbrl(quarterly_doc["doc_id"], output_dir)
-            q_xbrl_files = [f for f in q_result["xbrl_files"] if f.lower().endswith(".xbrl")]
-
-            if q_xbrl_files:
-                q_soup = parse_xbrl_file(q_xbrl_files[0])
-                q_contexts = identify_quarterly_contexts(q_soup)
-
-                if q_contexts:
-                    q_data = extract_quarterly_data(q_soup, q_contexts)
-
-                    # Get the latest FY data for LTM calculation
-                    fy_keys = [k for k in merged if k.startswith("FY")]
-                    if fy_keys:
-                        latest_fy_key = fy_keys[0]
-                        latest_fy_data = merged[latest_fy_key]
-
-                        ltm_data, ltm_label = calculate_ltm(
-                            latest_fy_data, q_data,
-                            quarterly_doc["period_end"]
-                        )
-
-                        if ltm_data:
-                            # Insert LTM as first column
-                            new_merged = OrderedDict()
-                            new_merged[ltm_label] = ltm_data
-                            for k, v in merged.items():
-                                if k != "_meta":
-                                    new_merged[k] = v
-                            new_merged["_meta"] = merged.get("_meta", {})
-                            merged = new_merged
-                            print(f"  LTM computed: {ltm_label}")
-                else:
-                    logger.warning("No quarterly contexts found in XBRL.")
-        except EdinetApiError as e:
-            logger.warning("Failed to process quarterly report: %s", e)
-    else:
-        print("  No quarterly report found (may already be latest FY).")
+        for doc_id, parent_doc_id, future in parse_futures:
+            try:
+                extracted[doc_id] = _extraction_result(future)
+            except ValueError as e:
+                logger.warning("Failed to parse report docID=%s: %s", doc_id, e)
+                continue
+            edinet_cache.save_extraction(doc_id, source, EXTRACTION_VERSION,
+                                         extracted[doc_id], parent_doc_id=parent_doc_id)
+
+        all_year_data = []
+        company_info = None
+        for d in sorted(doc_infos, key=lambda d: d["period_end"], reverse=True):
+            info, data = extracted.get(d["doc_id"], (None, None))
+            for amendment_id in d["amendments"]:
+                if amendment_id in extracted:
+                    amended_info, amended_data = extracted[amendment_id]
+                    info = merge_amended_data(info, amended_info)
+                    data = merge_amended_data(data, amended_data)
+            if data is None:
+                continue
+            if company_info is None:
+                company_info = info
+            all_year_data.append((d["period_end"], data))
+
+        # Step 4: Merge annual data
+        merged = merge_multi_year_data(all_year_data)
+
+        # Step 5: Latest quarterly report (already searched/downloaded) and LTM
+        print("\nSearching for latest interim report (quarterly/semi-annual)...")
+        quarterly_doc, q_data = interim_future.result()
+        if quarterly_doc:
+            print(f"  Found: docID={quarterly_doc['doc_id']}  "
+                  f"period={quarterly_doc['period_end']}  "
+                  f"desc={quarterly_doc['doc_description']}")
+            for amendment_id in quarterly_doc["amendments"]:
+                print(f"      amended by docID={amendment_id}")
+            if q_data is None:
+                logger.warning("No quarterly contexts found in XBRL.")
+        else:
+            print("  No quarterly report found (may already be latest FY).")
+
+    # Keep the package store within its byte budget; this run's packages are
+    # the most recently used, so they are never the ones evicted.
+    used_docs = doc_infos + ([quarterly_doc] if quarterly_doc else [])
+    in_use = {doc_id for d in used_docs for doc_id in [d["doc_id"]] + d["amendments"]}
+    edinet_cache.gc_store(_default_output_dir(output_dir),
+                          protect=in_use | {f"{doc_id}_csv" for doc_id in in_use})
+
+    if q_data:
+        # Get the latest FY data for LTM calculation
+        fy_keys = [k for k in merged if k.startswith("FY")]
+        if fy_keys:
+            latest_fy_key = fy_keys[0]
+            latest_fy_data = merged[latest_fy_key]
+
+            ltm_data, ltm_label = calculate_ltm(
+                latest_fy_data, q_data,
+                quarterly_doc["period_end"]
+            )
+
+            if ltm_data:
+                # Insert LTM as first column
+                new_merged = OrderedDict()
+                new_merged[ltm_label] = ltm_data
+                for k, v in merged.items():
+                    if k != "_meta":
+                        new_merged[k] = v
+                new_merged["_meta"] = merged.get("_meta", {})
+                merged = new_merged
+                print(f"  LTM computed: {ltm_label}")
 
     return company_info, merged
 
@@ -928,8 +2716,23 @@ def main():
     parser.add_argument("ticker", help="Stock ticker code (e.g. 2359)")
     parser.add_argument("--years", type=int, default=5, help="Number of years to fetch (default: 5)")
     parser.add_argument("--output-dir", default=None, help="Output directory for downloads")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Re-download packages even if they are cached")
+    parser.add_argument("--extract-all", action="store_true",
+                        help="Extract the fact documents to disk, uncompressed (debugging)")
+    parser.add_argument("--source", choices=PARSE_SOURCES, default=None,
+                        help="Read facts from the XBRL instance or EDINET's CSV "
+                             "(default: $EDINET_PARSE_SOURCE or xbrl)")
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="Parse worker processes, 0 = in-process "
+                             "(default: $EDINET_PARSE_WORKERS or one per CPU)")
+    parser.add_argument("--base-url", default=None,
+                        help="EDINET API root (default: $EDINET_BASE_URL or the official API)")
     args = parser.parse_args()
 
+    if args.base_url:
+        set_base_url(args.base_url)
+
     ticker_code = args.ticker.strip()
     num_years = min(args.years, 5)
 
@@ -939,7 +2742,9 @@ def main():
 
     try:
         company_info, merged_data = fetch_and_parse_multi_year(
-            ticker_code, num_years=num_years, output_dir=args.output_dir
+            ticker_code, num_years=num_years, output_dir=args.output_dir,
+            refresh=args.refresh, extract=args.extract_all, source=args.source,
+            parse_workers=args.parse_workers,
         )
     except EdinetDocumentNotFound as e:
         print(f"\nERROR: {e}")
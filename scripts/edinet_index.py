@@ -0,0 +1,724 @@
+"""
+edinet_index.py - Local index of EDINET filings (secCode -> documents).
+
+Instead of probing filing-season date windows for every ticker, the index keeps
+one row per filing of the document types we parse, built from the daily
+documents.json listings:
+
+    filings(doc_id, sec_code, edinet_code, doc_type_code, period_end,
+            submit_date_time, filer_name, doc_description, parent_doc_id)
+    synced_dates(date, final)   <- which submission dates have been ingested
+    filing_calendar(sec_code, doc_type_code, period_end, submit_date)
+                                <- per-issuer submit dates seen by date searches
+    issuers(edinet_code, sec_code, name, fiscal_year_end, consolidated, ...)
+                                <- issuer master from the EDINET code list
+    amendments(doc_id, parent_doc_id, sec_code, doc_type_code, ...)
+                                <- corrected reports (訂正報告書) and the docID
+                                   they amend
+
+Once the index covers a date range, "5 years of 有価証券報告書" or "the latest
+interim report" is a single SQLite query instead of 15-40 API calls.
+
+Without a backfilled index, the date searches in edinet_fetcher.py still learn
+each issuer's filing calendar (when it files each docTypeCode, and its fiscal
+year end) so the next search probes the most likely date first.
+
+The issuer master (EDINET code list, EdinetcodeDlInfo.csv) lets the fetcher
+reject unknown or delisted tickers before any API call, and supplies the fiscal
+year end of issuers the filing calendar has not seen yet.
+
+Amendments are recorded from every listing the fetcher requests (not only from
+syncs), so amendment_chain() knows the corrections of a report as soon as the
+day they were filed on has been seen.
+
+Usage:
+    python scripts/edinet_index.py backfill --years 6   # one-time crawl
+    python scripts/edinet_index.py sync                 # append days since last sync
+    python scripts/edinet_index.py status
+    python scripts/edinet_index.py query 2359 [--types 120 160]   # with amendments
+    python scripts/edinet_index.py calendar 2359        # learned filing calendar
+    python scripts/edinet_index.py issuers --download   # refresh the issuer master
+    python scripts/edinet_index.py issuers --file Edinetcode.zip
+    python scripts/edinet_index.py issuer 2359
+
+The database lives next to the listing cache:
+    tmp/edinet_cache/filing_index.sqlite
+"""
+
+import io
+import os
+import re
+import csv
+import sys
+import sqlite3
+import logging
+import zipfile
+import calendar
+import unicodedata
+from datetime import date, datetime, timedelta
+
+try:
+    from scripts import edinet_cache
+except ImportError:
+    import edinet_cache
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# CONSTANTS
+# =====================================================================
+INDEX_FILENAME = "filing_index.sqlite"
+
+# docTypeCodes kept in the index (annual, amended annual, quarterly, semi-annual)
+INDEXED_DOC_TYPES = ("120", "130", "140", "160")
+
+# Corrected reports recorded in the amendments table: 訂正有価証券報告書 (130),
+# 訂正四半期報告書 (150), 訂正半期報告書 (170)
+AMENDMENT_DOC_TYPES = ("130", "150", "170")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    doc_id           TEXT PRIMARY KEY,
+    sec_code         TEXT,
+    edinet_code      TEXT,
+    doc_type_code    TEXT,
+    period_end       TEXT,
+    submit_date_time TEXT,
+    filer_name       TEXT,
+    doc_description  TEXT,
+    parent_doc_id    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_filings_sec
+    ON filings (sec_code, doc_type_code, period_end);
+CREATE TABLE IF NOT EXISTS synced_dates (
+    date  TEXT PRIMARY KEY,
+    final INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS filing_calendar (
+    sec_code      TEXT,
+    doc_type_code TEXT,
+    period_end    TEXT,
+    submit_date   TEXT,
+    PRIMARY KEY (sec_code, doc_type_code, period_end)
+);
+CREATE TABLE IF NOT EXISTS issuers (
+    edinet_code      TEXT PRIMARY KEY,
+    sec_code         TEXT,
+    name             TEXT,
+    name_en          TEXT,
+    submitter_type   TEXT,
+    listed           INTEGER,
+    consolidated     INTEGER,
+    fiscal_year_end  TEXT,
+    industry         TEXT,
+    corporate_number TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_issuers_sec ON issuers (sec_code);
+CREATE TABLE IF NOT EXISTS amendments (
+    doc_id           TEXT PRIMARY KEY,
+    parent_doc_id    TEXT,
+    sec_code         TEXT,
+    doc_type_code    TEXT,
+    period_end       TEXT,
+    submit_date_time TEXT,
+    xbrl_flag        INTEGER,
+    csv_flag         INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_amendments_parent ON amendments (parent_doc_id);
+CREATE TABLE IF NOT EXISTS index_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# EDINET code list (EdinetcodeDlInfo.csv, cp932): header name (NFKC) -> column
+ISSUER_LIST_COLUMNS = {
+    "EDINETコード": "edinet_code",
+    "提出者種別": "submitter_type",
+    "上場区分": "listed",
+    "連結の有無": "consolidated",
+    "決算日": "fiscal_year_end",
+    "提出者名": "name",
+    "提出者名(英字)": "name_en",
+    "提出者業種": "industry",
+    "証券コード": "sec_code",
+    "提出者法人番号": "corporate_number",
+}
+ISSUER_LIST_ENCODING = "cp932"
+
+
+# =====================================================================
+# CONNECTION
+# =====================================================================
+def get_index_path(cache_dir=None):
+    """Path of the SQLite index file inside the EDINET cache root."""
+    return os.path.join(edinet_cache.get_cache_dir(cache_dir), INDEX_FILENAME)
+
+
+def _connect(cache_dir=None):
+    path = get_index_path(cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+# =====================================================================
+# INGEST
+# =====================================================================
+def ingest_listing(target_date, results, final=True, cache_dir=None):
+    """Add one day's documents.json results to the index.
+
+    Args:
+        target_date: Submission date the listing belongs to.
+        results: Raw EDINET result rows for that date.
+        final: False for today's (still growing) listing, so the next sync
+               fetches the date again.
+
+    Returns:
+        int: Number of filing rows written.
+    """
+    rows = [
+        (doc["docID"], doc.get("secCode"), doc.get("edinetCode", ""),
+         doc.get("docTypeCode"), doc.get("periodEnd", ""),
+         doc.get("submitDateTime", ""), doc.get("filerName", ""),
+         doc.get("docDescription", ""), doc.get("parentDocID"))
+        for doc in results
+        if doc.get("secCode") and doc.get("docTypeCode") in INDEXED_DOC_TYPES
+    ]
+    conn = _connect(cache_dir)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            _insert_amendments(conn, results)
+            conn.execute(
+                "INSERT OR REPLACE INTO synced_dates VALUES (?, ?)",
+                (target_date.isoformat(), 1 if final else 0),
+            )
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def _insert_amendments(conn, results):
+    rows = [
+        (doc["docID"], doc["parentDocID"], doc.get("secCode"), doc.get("docTypeCode"),
+         doc.get("periodEnd", ""), doc.get("submitDateTime", ""),
+         1 if doc.get("xbrlFlag") == "1" else 0, 1 if doc.get("csvFlag") == "1" else 0)
+        for doc in results
+        if doc.get("parentDocID") and doc.get("docTypeCode") in AMENDMENT_DOC_TYPES
+    ]
+    conn.executemany(
+        "INSERT OR REPLACE INTO amendments VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    return len(rows)
+
+
+def record_amendments(results, cache_dir=None):
+    """Record the corrected reports of one day's listing, without marking it synced.
+
+    Called for every listing the fetcher requests, so amendments filed on any
+    probed date are known even when the index has not been backfilled.
+
+    Returns:
+        int: Number of amendment rows written.
+    """
+    if not any(doc.get("parentDocID") for doc in results):
+        return 0
+    conn = _connect(cache_dir)
+    try:
+        with conn:
+            return _insert_amendments(conn, results)
+    finally:
+        conn.close()
+
+
+# =====================================================================
+# COVERAGE
+# =====================================================================
+def last_synced_date(cache_dir=None):
+    """Latest submission date whose listing is final in the index, or None."""
+    conn = _connect(cache_dir)
+    try:
+        row = conn.execute(
+            "SELECT MAX(date) FROM synced_dates WHERE final = 1"
+        ).fetchone()
+    finally:
+        conn.close()
+    return date.fromisoformat(row[0]) if row and row[0] else None
+
+
+def first_synced_date(cache_dir=None):
+    """Earliest submission date present in the index, or None."""
+    conn = _connect(cache_dir)
+    try:
+        row = conn.execute("SELECT MIN(date) FROM synced_dates").fetchone()
+    finally:
+        conn.close()
+    return date.fromisoformat(row[0]) if row and row[0] else None
+
+
+def covers(start, end, cache_dir=None):
+    """True if every weekday listing in [start, end] has been ingested (final).
+
+    EDINET does not accept filings on weekends, so only weekdays count.
+    """
+    if end < start:
+        return True
+    expected = sum(1 for i in range((end - start).days + 1)
+                   if (start + timedelta(days=i)).weekday() < 5)
+    conn = _connect(cache_dir)
+    try:
+        row = conn.execute(
+            "SELECT COUNT(*) FROM synced_dates "
+            "WHERE final = 1 AND date BETWEEN ? AND ? "
+            "AND strftime('%w', date) NOT IN ('0', '6')",
+            (start.isoformat(), end.isoformat()),
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0] >= expected
+
+
+def missing_dates(start, end, cache_dir=None):
+    """Weekdays in [start, end] that still need to be synced, oldest first."""
+    conn = _connect(cache_dir)
+    try:
+        done = {r[0] for r in conn.execute(
+            "SELECT date FROM synced_dates WHERE final = 1 AND date BETWEEN ? AND ?",
+            (start.isoformat(), end.isoformat()),
+        )}
+    finally:
+        conn.close()
+    days = []
+    d = start
+    while d <= end:
+        if d.weekday() < 5 and d.isoformat() not in done:
+            days.append(d)
+        d += timedelta(days=1)
+    return days
+
+
+# =====================================================================
+# QUERY
+# =====================================================================
+def query_filings(sec_code, doc_type_codes=None, cache_dir=None):
+    """Return indexed filings for a secCode, newest period first.
+
+    Rows use the same keys as edinet_fetcher._search_single_date() matches.
+
+    Args:
+        sec_code: 5-digit EDINET secCode (e.g. "23590").
+        doc_type_codes: Optional iterable of docTypeCodes to restrict to.
+    """
+    sql = "SELECT * FROM filings WHERE sec_code = ?"
+    params = [sec_code]
+    if doc_type_codes:
+        doc_type_codes = list(doc_type_codes)
+        sql += f" AND doc_type_code IN ({', '.join('?' * len(doc_type_codes))})"
+        params.extend(doc_type_codes)
+    sql += " ORDER BY period_end DESC, submit_date_time ASC"
+
+    conn = _connect(cache_dir)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+    return [{
+        "doc_id": r["doc_id"],
+        "filer_name": r["filer_name"],
+        "doc_description": r["doc_description"],
+        "submit_date": r["submit_date_time"],
+        "period_end": r["period_end"],
+        "edinet_code": r["edinet_code"],
+        "doc_type_code_raw": r["doc_type_code"],
+    } for r in rows]
+
+
+def amendment_chain(doc_id, cache_dir=None):
+    """Return the known amendments of a docID, oldest first.
+
+    Follows chains: a correction of a correction is included as well.
+
+    Returns:
+        list[dict]: One dict per amendment with doc_id, parent_doc_id,
+        doc_type_code_raw, period_end, submit_date, has_xbrl and has_csv.
+    """
+    conn = _connect(cache_dir)
+    try:
+        rows = conn.execute(
+            "WITH RECURSIVE chain(doc_id) AS ("
+            "  SELECT doc_id FROM amendments WHERE parent_doc_id = ?"
+            "  UNION"
+            "  SELECT a.doc_id FROM amendments a JOIN chain c ON a.parent_doc_id = c.doc_id"
+            ") SELECT a.* FROM amendments a JOIN chain USING (doc_id) "
+            "ORDER BY a.submit_date_time ASC",
+            (doc_id,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return [{
+        "doc_id": r["doc_id"],
+        "parent_doc_id": r["parent_doc_id"],
+        "doc_type_code_raw": r["doc_type_code"],
+        "period_end": r["period_end"],
+        "submit_date": r["submit_date_time"],
+        "has_xbrl": bool(r["xbrl_flag"]),
+        "has_csv": bool(r["csv_flag"]),
+    } for r in rows]
+
+
+def filings_since(sec_codes, submitted_since, cache_dir=None):
+    """Return filings and XBRL-bearing amendments of several secCodes submitted since a date.
+
+    Args:
+        sec_codes: Iterable of 5-digit secCodes.
+        submitted_since: datetime.date; filings submitted on or after it count.
+
+    Returns:
+        list[dict]: Rows with the query_filings() keys plus sec_code and
+        parent_doc_id (None for original reports), oldest submission first.
+    """
+    sec_codes = list(sec_codes)
+    if not sec_codes:
+        return []
+    marks = ", ".join("?" * len(sec_codes))
+    since = submitted_since.isoformat()
+    conn = _connect(cache_dir)
+    try:
+        rows = conn.execute(
+            "SELECT doc_id, sec_code, edinet_code, doc_type_code, period_end, "
+            "       submit_date_time, filer_name, doc_description, NULL AS parent_doc_id "
+            f"FROM filings WHERE sec_code IN ({marks}) AND submit_date_time >= ? "
+            f"AND doc_type_code NOT IN ({', '.join('?' * len(AMENDMENT_DOC_TYPES))}) "
+            "UNION "
+            "SELECT a.doc_id, a.sec_code, f.edinet_code, a.doc_type_code, a.period_end, "
+            "       a.submit_date_time, f.filer_name, f.doc_description, a.parent_doc_id "
+            "FROM amendments a LEFT JOIN filings f ON f.doc_id = a.doc_id "
+            f"WHERE a.sec_code IN ({marks}) AND a.submit_date_time >= ? AND a.xbrl_flag = 1 "
+            "ORDER BY submit_date_time ASC",
+            sec_codes + [since, *AMENDMENT_DOC_TYPES] + sec_codes + [since],
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return [{
+        "doc_id": r["doc_id"],
+        "sec_code": r["sec_code"],
+        "filer_name": r["filer_name"] or "",
+        "doc_description": r["doc_description"] or "",
+        "submit_date": r["submit_date_time"],
+        "period_end": r["period_end"],
+        "edinet_code": r["edinet_code"] or "",
+        "doc_type_code_raw": r["doc_type_code"],
+        "parent_doc_id": r["parent_doc_id"],
+    } for r in rows]
+
+
+# =====================================================================
+# FILING CALENDAR
+# =====================================================================
+def record_filing_dates(sec_code, docs, cache_dir=None):
+    """Remember when an issuer filed the given documents.
+
+    Args:
+        sec_code: 5-digit EDINET secCode.
+        docs: Filing dicts as returned by the fetcher searches (need
+              doc_type_code[_raw], period_end and submit_date).
+    """
+    rows = []
+    for doc in docs:
+        doc_type = doc.get("doc_type_code_raw") or doc.get("doc_type_code")
+        submit = (doc.get("submit_date") or "")[:10]
+        if doc_type and doc.get("period_end") and submit:
+            rows.append((sec_code, doc_type, doc["period_end"], submit))
+    if not rows:
+        return
+    conn = _connect(cache_dir)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO filing_calendar VALUES (?, ?, ?, ?)", rows
+            )
+    finally:
+        conn.close()
+
+
+def filing_calendar(sec_code, cache_dir=None):
+    """Return the learned filing calendar of an issuer.
+
+    Returns:
+        dict with keys:
+            'fiscal_year_end': period_end of the latest known annual report
+                               (e.g. "2025-03-31"); else the latest FY end
+                               implied by the issuer master's year end; else None.
+            'submit_dates': {doc_type_code: [(period_end, submit_date), ...]}
+                            as ISO strings, newest period first.
+    """
+    conn = _connect(cache_dir)
+    try:
+        rows = conn.execute(
+            "SELECT doc_type_code, period_end, submit_date FROM filing_calendar "
+            "WHERE sec_code = ? ORDER BY period_end DESC",
+            (sec_code,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    submit_dates = {}
+    for r in rows:
+        submit_dates.setdefault(r["doc_type_code"], []).append(
+            (r["period_end"], r["submit_date"]))
+    annual = submit_dates.get("120")
+    fiscal_year_end = annual[0][0] if annual else None
+    if fiscal_year_end is None:
+        issuer = lookup_issuer(sec_code, cache_dir)
+        if issuer and issuer["fiscal_year_end"]:
+            fiscal_year_end = latest_fiscal_year_end(issuer["fiscal_year_end"])
+    return {
+        "fiscal_year_end": fiscal_year_end,
+        "submit_dates": submit_dates,
+    }
+
+
+# =====================================================================
+# ISSUER MASTER
+# =====================================================================
+def _parse_fiscal_year_end(text):
+    """'3月31日' -> '03-31' (None if blank or unparseable)."""
+    m = re.match(r"\s*(\d{1,2})月(\d{1,2})日", unicodedata.normalize("NFKC", text or ""))
+    if not m:
+        return None
+    return f"{int(m.group(1)):02d}-{int(m.group(2)):02d}"
+
+
+def parse_issuer_list(source):
+    """Parse the EDINET code list into issuer rows.
+
+    Args:
+        source: Path to Edinetcode.zip / EdinetcodeDlInfo.csv, or their bytes.
+
+    Returns:
+        list[dict]: One dict per filer with the ISSUER_LIST_COLUMNS keys;
+        fiscal_year_end as "MM-DD", listed / consolidated as 1/0.
+
+    Raises:
+        ValueError: If no EDINET code list header is found.
+    """
+    data = source
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            data = f.read()
+    if data[:2] == b"PK":
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            name = next(n for n in zf.namelist() if n.lower().endswith(".csv"))
+            data = zf.read(name)
+
+    reader = csv.reader(io.StringIO(data.decode(ISSUER_LIST_ENCODING, errors="replace")))
+    columns = None
+    issuers = []
+    for row in reader:
+        if columns is None:
+            # The first line is a download-date banner; the header row follows it
+            header = [unicodedata.normalize("NFKC", cell).strip() for cell in row]
+            if "EDINETコード" in header:
+                columns = {ISSUER_LIST_COLUMNS[h]: i for i, h in enumerate(header)
+                           if h in ISSUER_LIST_COLUMNS}
+            continue
+        rec = {key: (row[i].strip() if i < len(row) else "") for key, i in columns.items()}
+        if not rec.get("edinet_code"):
+            continue
+        rec["sec_code"] = rec.get("sec_code") or None
+        rec["listed"] = 1 if rec.get("listed") == "上場" else 0
+        rec["consolidated"] = {"有": 1, "無": 0}.get(rec.get("consolidated"))
+        rec["fiscal_year_end"] = _parse_fiscal_year_end(rec.get("fiscal_year_end"))
+        issuers.append(rec)
+
+    if columns is None:
+        raise ValueError("Not an EDINET code list (no EDINETコード header row).")
+    return issuers
+
+
+def ingest_issuer_list(source, cache_dir=None):
+    """Replace the issuer master with the contents of an EDINET code list.
+
+    Args:
+        source: Path or bytes accepted by parse_issuer_list().
+
+    Returns:
+        int: Number of issuers stored.
+    """
+    issuers = parse_issuer_list(source)
+    keys = ("edinet_code", "sec_code", "name", "name_en", "submitter_type", "listed",
+            "consolidated", "fiscal_year_end", "industry", "corporate_number")
+    conn = _connect(cache_dir)
+    try:
+        with conn:
+            conn.execute("DELETE FROM issuers")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO issuers VALUES ({', '.join('?' * len(keys))})",
+                [tuple(rec.get(k) for k in keys) for rec in issuers],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO index_meta VALUES ('issuers_loaded_at', ?)",
+                (datetime.now().isoformat(timespec="seconds"),),
+            )
+    finally:
+        conn.close()
+    return len(issuers)
+
+
+def issuer_list_loaded_at(cache_dir=None):
+    """When the issuer master was last loaded (ISO string), or None if never."""
+    conn = _connect(cache_dir)
+    try:
+        row = conn.execute(
+            "SELECT value FROM index_meta WHERE key = 'issuers_loaded_at'"
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def lookup_issuer(sec_code, cache_dir=None):
+    """Return the issuer master row of a 5-digit secCode, or None if unknown."""
+    conn = _connect(cache_dir)
+    try:
+        row = conn.execute(
+            "SELECT * FROM issuers WHERE sec_code = ? ORDER BY listed DESC LIMIT 1",
+            (sec_code,),
+        ).fetchone()
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+
+def latest_fiscal_year_end(month_day, today=None):
+    """Most recent FY end date (ISO) on or before today for an 'MM-DD' year end."""
+    today = today or date.today()
+    month, day = int(month_day[:2]), int(month_day[3:5])
+    for year in (today.year, today.year - 1):
+        fy_end = date(year, month, min(day, calendar.monthrange(year, month)[1]))
+        if fy_end <= today:
+            return fy_end.isoformat()
+    return None
+
+
+# =====================================================================
+# CLI ENTRY POINT
+# =====================================================================
+def main():
+    """CLI interface for the local filing index."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    import argparse
+    parser = argparse.ArgumentParser(description="Local EDINET filing index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_backfill = sub.add_parser("backfill", help="Crawl N years of daily listings")
+    p_backfill.add_argument("--years", type=int, default=6,
+                            help="Years of listings to crawl (default: 6)")
+    sub.add_parser("sync", help="Ingest listings since the last sync")
+    sub.add_parser("status", help="Show index coverage")
+    p_query = sub.add_parser("query", help="List indexed filings for a ticker")
+    p_query.add_argument("ticker", help="Stock ticker code (e.g. 2359)")
+    p_query.add_argument("--types", nargs="*", default=None,
+                         help="docTypeCodes to include (default: all indexed)")
+    p_calendar = sub.add_parser("calendar", help="Show a ticker's learned filing calendar")
+    p_calendar.add_argument("ticker", help="Stock ticker code (e.g. 2359)")
+    p_issuers = sub.add_parser("issuers", help="Load or show the issuer master (EDINET code list)")
+    p_issuers.add_argument("--file", default=None,
+                           help="Edinetcode.zip or EdinetcodeDlInfo.csv to load")
+    p_issuers.add_argument("--download", action="store_true",
+                           help="Download the current code list from EDINET and load it")
+    p_issuer = sub.add_parser("issuer", help="Show a ticker's issuer master row")
+    p_issuer.add_argument("ticker", help="Stock ticker code (e.g. 2359)")
+    args = parser.parse_args()
+
+    if args.command in ("backfill", "sync"):
+        try:
+            from scripts.edinet_fetcher import sync_filing_index, EdinetApiError
+        except ImportError:
+            from edinet_fetcher import sync_filing_index, EdinetApiError
+        start = None
+        if args.command == "backfill":
+            start = date.today() - timedelta(days=366 * args.years)
+        try:
+            synced, stopped_at = sync_filing_index(start=start)
+        except EdinetApiError as e:
+            print(f"\nAPI ERROR: {e}")
+            sys.exit(1)
+        print(f"Synced {synced} date(s). Index: {get_index_path()}")
+        if stopped_at is not None:
+            print(f"Stopped at {stopped_at}: listing unavailable. Run again to resume.")
+            sys.exit(1)
+
+    elif args.command == "status":
+        print(f"Index:       {get_index_path()}")
+        print(f"First date:  {first_synced_date() or 'N/A'}")
+        print(f"Last final:  {last_synced_date() or 'N/A'}")
+
+    elif args.command == "issuers":
+        if args.download:
+            try:
+                from scripts.edinet_fetcher import download_issuer_list, EdinetApiError
+            except ImportError:
+                from edinet_fetcher import download_issuer_list, EdinetApiError
+            try:
+                source = download_issuer_list()
+            except EdinetApiError as e:
+                print(f"\nAPI ERROR: {e}")
+                sys.exit(1)
+        else:
+            source = args.file
+        if source is not None:
+            try:
+                count = ingest_issuer_list(source)
+            except (OSError, ValueError, zipfile.BadZipFile) as e:
+                print(f"\nERROR: {e}")
+                sys.exit(1)
+            print(f"Loaded {count:,} issuer(s).")
+        print(f"Issuer master loaded at: {issuer_list_loaded_at() or 'never'}")
+
+    elif args.command in ("query", "calendar", "issuer"):
+        try:
+            from scripts.edinet_fetcher import SEC_CODE_SUFFIX
+        except ImportError:
+            from edinet_fetcher import SEC_CODE_SUFFIX
+        sec_code = args.ticker.strip() + SEC_CODE_SUFFIX
+        if args.command == "issuer":
+            issuer = lookup_issuer(sec_code)
+            if issuer is None:
+                print(f"secCode={sec_code} is not in the issuer master.")
+                sys.exit(1)
+            for key, value in issuer.items():
+                print(f"  {key:<17s} {value}")
+            return
+        if args.command == "calendar":
+            cal = filing_calendar(sec_code)
+            print(f"FY end:  {cal['fiscal_year_end'] or 'N/A'}")
+            for doc_type, rows in sorted(cal["submit_dates"].items()):
+                for period_end, submit in rows:
+                    print(f"  {doc_type}  period={period_end}  submitted={submit}")
+            return
+        for doc in query_filings(sec_code, args.types):
+            print(f"  {doc['doc_type_code_raw']}  {doc['doc_id']}  "
+                  f"period={doc['period_end']}  submitted={doc['submit_date']}  "
+                  f"{doc['doc_description']}")
+            for amendment in amendment_chain(doc["doc_id"]):
+                print(f"      amended by {amendment['doc_type_code_raw']}  "
+                      f"{amendment['doc_id']}  submitted={amendment['submit_date']}  "
+                      f"xbrl={'yes' if amendment['has_xbrl'] else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
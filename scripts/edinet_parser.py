@@ -3,20 +3,37 @@ edinet_parser.py - Parse EDINET XBRL instance files to extract financial data.
 
 Reads a .xbrl file downloaded via edinet_fetcher.py, identifies the correct
 consolidated contexts, and extracts key financial metrics (PL, BS, CF) needed
-for DCF modeling.
+for DCF modeling. The same facts can also be loaded from EDINET's
+XBRL-to-CSV download (type=5) via parse_xbrl_csv(), or streamed from the
+instance with bounded memory via parse_xbrl_stream(). Packages that ship
+only Inline XBRL (*_ixbrl.htm) are read with parse_ixbrl_stream().
+parse_xbrl_cached() reads a document parsed before from the fact cache instead.
 
 Usage:
     python scripts/edinet_parser.py path/to/file.xbrl
+    python scripts/edinet_parser.py path/to/package.zip          # instance inside the ZIP
+    python scripts/edinet_parser.py path/to/PublicDoc/*_ixbrl.htm  # Inline XBRL document set
+    python scripts/edinet_parser.py path/to/XBRL_TO_CSV/jpcrp030000-asr-....csv
 
 Output values are in JPY millions (百万円) by default.
 """
 
+import io
 import os
+import re
 import sys
+import csv
+import hashlib
+import zipfile
+import calendar
 import logging
 from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal, InvalidOperation
 
 from bs4 import BeautifulSoup
+from lxml import etree
 
 logger = logging.getLogger(__name__)
 
@@ -358,24 +375,907 @@ _SUM_COMPONENTS = {
 # =====================================================================
 # CORE FUNCTIONS
 # =====================================================================
-def parse_xbrl_file(xbrl_file_path):
-    """Parse an XBRL instance file and return a BeautifulSoup object.
+def parse_xbrl_file(source):
+    """Parse an XBRL instance and return a BeautifulSoup object.
 
     Args:
-        xbrl_file_path: Absolute or relative path to a .xbrl file.
+        source: Path to a .xbrl file, the raw instance bytes (e.g. read
+                straight out of the EDINET ZIP), or a binary file-like object.
 
     Returns:
         BeautifulSoup object parsed with lxml-xml parser.
     """
-    logger.info("Parsing XBRL file: %s", xbrl_file_path)
-
-    with open(xbrl_file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    if isinstance(source, (bytes, bytearray)):
+        logger.info("Parsing XBRL instance (%d bytes)", len(source))
+        content = bytes(source)
+    elif hasattr(source, "read"):
+        logger.info("Parsing XBRL instance from stream")
+        content = source.read()
+    else:
+        logger.info("Parsing XBRL file: %s", source)
+        with open(source, "r", encoding="utf-8") as f:
+            content = f.read()
 
     soup = BeautifulSoup(content, "lxml-xml")
     return soup
 
 
+# =====================================================================
+# CONTEXT TABLE
+# =====================================================================
+# Every context of a document is resolved once — period type and dates plus
+# the dimension -> member map of its scenario — and the context identification
+# functions and the _meta periods are lookups in that table.
+def _local_name(qname):
+    """'jppfs_cor:NonConsolidatedMember' -> 'NonConsolidatedMember'."""
+    return qname.rpartition(":")[2]
+
+
+class XbrlContext:
+    """One context: ID, period and dimension members."""
+
+    __slots__ = ("id", "period_type", "start", "end", "instant", "dims", "has_scenario")
+
+    def __init__(self, context_id, period, dims=None, has_scenario=None):
+        """
+        Args:
+            context_id: Context ID.
+            period: {"instant": d} or {"start": s, "end": e} (ISO strings), or {}.
+            dims: {dimension: member} of the scenario (QNames; typed members
+                  map to their value).
+            has_scenario: Whether the context has a scenario (default: bool(dims)).
+        """
+        self.id = context_id
+        self.instant = period.get("instant")
+        self.start = period.get("start")
+        self.end = period.get("end")
+        if self.instant:
+            self.period_type = "instant"
+        elif self.start and self.end:
+            self.period_type = "duration"
+        else:
+            self.period_type = None
+        self.dims = dims or {}
+        self.has_scenario = bool(self.dims) if has_scenario is None else has_scenario
+
+    @property
+    def is_clean(self):
+        """True for contexts without scenario (top-level totals)."""
+        return not self.has_scenario
+
+    @property
+    def period(self):
+        """{"instant": d} or {"start": s, "end": e}; {} if unknown."""
+        if self.period_type == "instant":
+            return {"instant": self.instant}
+        if self.period_type == "duration":
+            return {"start": self.start, "end": self.end}
+        return {}
+
+    def members(self):
+        """Local names of the scenario's dimension members."""
+        return [_local_name(m) for m in self.dims.values()]
+
+    def has_member(self, member):
+        """True if a dimension has the given member (local name)."""
+        return member in self.members()
+
+    def __repr__(self):
+        return f"XbrlContext({self.id!r}, {self.period}, {self.dims})"
+
+
+class ContextTable:
+    """All contexts of one document, by ID in document order."""
+
+    def __init__(self, contexts):
+        self._by_id = OrderedDict((ctx.id, ctx) for ctx in contexts)
+
+    @classmethod
+    def from_soup(cls, soup):
+        """Build the table of a parsed instance in one pass over its contexts."""
+        def contexts():
+            for el in soup.find_all("xbrli:context"):
+                period = {}
+                period_el = el.find("xbrli:period")
+                if period_el is not None:
+                    for key, tag in (("instant", "xbrli:instant"),
+                                     ("start", "xbrli:startDate"),
+                                     ("end", "xbrli:endDate")):
+                        child = period_el.find(tag)
+                        if child is not None and child.text.strip():
+                            period[key] = child.text.strip()
+                dims = OrderedDict()
+                scenario = el.find("xbrli:scenario")
+                if scenario is not None:
+                    for member in scenario.find_all(["xbrldi:explicitMember",
+                                                     "xbrldi:typedMember"]):
+                        dims[member.get("dimension", "")] = member.get_text().strip()
+                yield XbrlContext(el.get("id", ""), period, dims,
+                                  has_scenario=scenario is not None)
+        return cls(contexts())
+
+    def get(self, context_id):
+        """Context by ID, or None."""
+        return self._by_id.get(context_id)
+
+    def clean(self, context_id):
+        """Context by ID if it exists and has no scenario, else None."""
+        ctx = self._by_id.get(context_id)
+        return ctx if ctx is not None and ctx.is_clean else None
+
+    def period(self, context_id):
+        """Period dict of a context ({} if unknown)."""
+        ctx = self._by_id.get(context_id)
+        return ctx.period if ctx is not None else {}
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def __len__(self):
+        return len(self._by_id)
+
+
+def get_context_table(soup):
+    """Return the ContextTable of a parsed document, building it on first use.
+
+    Args:
+        soup: BeautifulSoup object, CsvFacts, XbrlFacts or CachedFacts.
+    """
+    # vars() rather than getattr(): a missing attribute on a soup is a tag search
+    table = vars(soup).get("_context_table")
+    if table is None:
+        if isinstance(soup, CsvFacts):
+            table = ContextTable(soup.contexts())
+        else:
+            table = ContextTable.from_soup(soup)
+        soup._context_table = table
+    return table
+
+
+def _log_context(label, ctx, width=25):
+    if ctx.period_type == "instant":
+        logger.info("  %s %-*s -> %s", label, width, ctx.id, ctx.instant)
+    elif ctx.period_type == "duration":
+        logger.info("  %s %-*s -> %s to %s", label, width, ctx.id, ctx.start, ctx.end)
+
+
+# =====================================================================
+# XBRL-TO-CSV FACTS (EDINET type=5)
+# =====================================================================
+# EDINET also publishes each filing's facts as a flat CSV (UTF-16, tab-separated).
+# Loading it is far cheaper than building a DOM of the multi-MB instance, and
+# the extraction functions above accept either representation.
+CSV_COL_ELEMENT_ID = "要素ID"
+CSV_COL_CONTEXT_ID = "コンテキストID"
+CSV_COL_VALUE = "値"
+
+# Standard EDINET context IDs whose periods can be derived from the DEI dates
+_CSV_PERIOD_CONTEXT_RE = re.compile(
+    r"^(?:Current|Prior(?P<prior>\d+))?"
+    r"(?P<kind>YearDuration|YearInstant|AccumulatedQ\dDuration|QuarterInstant"
+    r"|InterimDuration|InterimInstant)$"
+)
+
+
+def _shift_years(date_str, years):
+    """Shift an ISO date back by `years`, keeping month-end dates at month end."""
+    d = date.fromisoformat(date_str)
+    year = d.year - years
+    last_day = calendar.monthrange(year, d.month)[1]
+    if d.day == calendar.monthrange(d.year, d.month)[1]:
+        return date(year, d.month, last_day).isoformat()
+    return date(year, d.month, min(d.day, last_day)).isoformat()
+
+
+class CsvFacts:
+    """Facts of one filing loaded from its EDINET XBRL-to-CSV file.
+
+    The CSV carries element ID, context ID and value but no period dates, so
+    the periods of the standard contexts (CurrentYearDuration,
+    Prior1AccumulatedQ2Duration, InterimInstant, ...) are derived from the
+    DEI fiscal-year dates of the filing.
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: Iterable of (element_id, context_id, value) string tuples.
+        """
+        self._facts = {}        # (local_name, context_id) -> [value, ...]
+        self._first_text = {}   # local_name -> first value in file order
+        self._context_ids = OrderedDict()
+        for element_id, context_id, value in rows:
+            local = element_id.split(":")[-1]
+            self._facts.setdefault((local, context_id), []).append(value)
+            self._first_text.setdefault(local, value)
+            self._context_ids[context_id] = None
+        self._periods = self._derive_periods()
+
+    def items(self):
+        """((local_name, context_id), [value, ...]) pairs in file order."""
+        return self._facts.items()
+
+    def values(self, local_name, context_id):
+        """Raw values reported for an element in a context, in file order."""
+        return self._facts.get((local_name, context_id), [])
+
+    def first_text(self, local_name):
+        """First reported value of an element in any context (for DEI items)."""
+        text = self._first_text.get(local_name)
+        return text.strip() if text else None
+
+    def contexts(self):
+        """Yield an XbrlContext per context ID.
+
+        The CSV names no dimensions, so the members come from the context ID
+        ("CurrentYearDuration_NonConsolidatedMember") and are keyed by
+        themselves.
+        """
+        for ctx_id in self._context_ids:
+            base, _, members = ctx_id.partition("_")
+            dims = OrderedDict((m, m) for m in members.split("_") if m)
+            yield XbrlContext(ctx_id, self._periods.get(base, {}), dims)
+
+    def _derive_periods(self):
+        fy_start = self.first_text("CurrentFiscalYearStartDateDEI")
+        fy_end = self.first_text("CurrentFiscalYearEndDateDEI")
+        period_end = self.first_text("CurrentPeriodEndDateDEI") or fy_end
+        if not (fy_start and fy_end):
+            return {}
+
+        periods = {}
+        for ctx_id in self._context_ids:
+            base = ctx_id.partition("_")[0]
+            m = _CSV_PERIOD_CONTEXT_RE.match(base)
+            if not m or base in periods:
+                continue
+            n = int(m.group("prior") or 0)
+            kind = m.group("kind")
+            try:
+                if kind == "YearDuration":
+                    periods[base] = {"start": _shift_years(fy_start, n),
+                                     "end": _shift_years(fy_end, n)}
+                elif kind == "YearInstant":
+                    periods[base] = {"instant": _shift_years(fy_end, n)}
+                elif kind.endswith("Duration"):
+                    periods[base] = {"start": _shift_years(fy_start, n),
+                                     "end": _shift_years(period_end, n)}
+                else:
+                    periods[base] = {"instant": _shift_years(period_end, n)}
+            except ValueError:
+                logger.warning("Unparseable DEI dates in CSV facts, periods unknown.")
+                return {}
+        return periods
+
+
+def parse_xbrl_csv(source):
+    """Load an EDINET XBRL-to-CSV file (download type=5) into a CsvFacts table.
+
+    Args:
+        source: Path to the .csv file, its raw bytes, or a binary file-like object.
+
+    Returns:
+        CsvFacts usable wherever the extraction functions take a soup.
+
+    Raises:
+        ValueError: If the file does not have the EDINET CSV columns.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        logger.info("Parsing XBRL CSV (%d bytes)", len(source))
+        raw = bytes(source)
+    elif hasattr(source, "read"):
+        logger.info("Parsing XBRL CSV from stream")
+        raw = source.read()
+    else:
+        logger.info("Parsing XBRL CSV file: %s", source)
+        with open(source, "rb") as f:
+            raw = f.read()
+
+    try:
+        text = raw.decode("utf-16")
+    except UnicodeDecodeError:
+        text = raw.decode("utf-8-sig")
+
+    reader = csv.reader(io.StringIO(text), delimiter="\t")
+    header = next(reader, [])
+    try:
+        i_elem = header.index(CSV_COL_ELEMENT_ID)
+        i_ctx = header.index(CSV_COL_CONTEXT_ID)
+        i_val = header.index(CSV_COL_VALUE)
+    except ValueError:
+        raise ValueError(f"Not an EDINET XBRL-to-CSV file (header: {header[:9]})")
+
+    width = max(i_elem, i_ctx, i_val)
+    return CsvFacts(
+        (row[i_elem], row[i_ctx], row[i_val])
+        for row in reader if len(row) > width
+    )
+
+
+# =====================================================================
+# FACT INDEX
+# =====================================================================
+# Every extraction lookup is (element local name, contextRef) -> number. The
+# index answers it with one dict hit; it is built in a single pass over the
+# document on first use and kept on the parsed document.
+XSI_NIL_ATTRS = ("xsi:nil", "{http://www.w3.org/2001/XMLSchema-instance}nil")
+
+
+class FactIndex:
+    """Numeric facts of one filing keyed by (local_name, context_id).
+
+    Nil and empty facts are dropped and values converted to float when the
+    index is built; the first parseable value of a (name, context) pair in
+    document order wins, as in the former per-lookup scan.
+    """
+
+    def __init__(self, facts):
+        """
+        Args:
+            facts: Iterable of (local_name, context_id, text, is_nil) in
+                   document order.
+        """
+        self._numbers = {}
+        self._first_text = {}
+        for local, context_id, text, is_nil in facts:
+            self._first_text.setdefault(local, text)
+            key = (local, context_id)
+            if is_nil or key in self._numbers or not text:
+                continue
+            try:
+                self._numbers[key] = float(text.strip())
+            except ValueError:
+                continue
+
+    @classmethod
+    def from_soup(cls, soup):
+        """Build the index of a parsed instance in one pass over its facts."""
+        def facts():
+            for el in soup.find_all(True, attrs={"contextRef": True}):
+                yield (el.name.split(":")[-1], el["contextRef"], el.get_text(),
+                       any(el.get(attr) == "true" for attr in XSI_NIL_ATTRS))
+        return cls(facts())
+
+    @classmethod
+    def from_tables(cls, numbers, texts):
+        """Rebuild an index from its numbers() and texts() (the fact cache rows)."""
+        index = cls(())
+        index._numbers = dict(numbers)
+        index._first_text = dict(texts)
+        return index
+
+    @classmethod
+    def from_csv(cls, csv_facts):
+        """Build the index of a CsvFacts table (its rows carry no nil flag)."""
+        return cls((local, context_id, value, False)
+                   for (local, context_id), values in csv_facts.items()
+                   for value in values)
+
+    def number(self, local_name, context_id):
+        """Value in JPY of an element in a context, or None if not reported."""
+        return self._numbers.get((local_name, context_id))
+
+    def first_text(self, local_name):
+        """First reported value of an element in any context (for DEI items)."""
+        text = self._first_text.get(local_name)
+        return text.strip() if text else None
+
+    def numbers(self):
+        """((local_name, context_id), value) pairs of the index."""
+        return self._numbers.items()
+
+    def texts(self):
+        """(local_name, first text) pairs of the index, TextBlock notes excluded."""
+        return ((local, text) for local, text in self._first_text.items()
+                if not local.endswith("TextBlock"))
+
+    def __len__(self):
+        return len(self._numbers)
+
+
+def get_fact_index(soup):
+    """Return the FactIndex of a parsed document, building it on first use.
+
+    Args:
+        soup: BeautifulSoup object from parse_xbrl_file(), CsvFacts,
+              XbrlFacts or CachedFacts.
+    """
+    # vars() rather than getattr(): a missing attribute on a soup is a tag search
+    index = vars(soup).get("_fact_index")
+    if index is None:
+        if isinstance(soup, CsvFacts):
+            index = FactIndex.from_csv(soup)
+        else:
+            index = FactIndex.from_soup(soup)
+        soup._fact_index = index
+    return index
+
+
+# =====================================================================
+# STREAMING INSTANCE READER (lxml iterparse)
+# =====================================================================
+# parse_xbrl_file() keeps the whole instance as a string plus a DOM, most of it
+# TextBlock HTML notes nothing here reads. The streaming reader handles one
+# top-level element at a time and frees it at once, so peak memory is bounded
+# by the largest single element rather than by the filing.
+XBRLI_NS = "{http://www.xbrl.org/2003/instance}"
+XBRLDI_NS = "{http://xbrl.org/2006/xbrldi}"
+XSI_NIL = "{http://www.w3.org/2001/XMLSchema-instance}nil"
+
+
+class XbrlFacts:
+    """Contexts, units and facts of one instance document, read in one streaming pass.
+
+    Accepted wherever the extraction functions take a soup. TextBlock facts
+    are skipped; other facts go straight into the document's FactIndex.
+    """
+
+    def __init__(self, stream):
+        """
+        Args:
+            stream: Binary file-like object positioned at the instance XML.
+        """
+        contexts = []
+        self.units = {}                  # unit_id -> measure ("iso4217:JPY", "a/b")
+        self._fact_index = FactIndex(self._read(stream, contexts))
+        self._context_table = ContextTable(contexts)
+
+    def _read(self, stream, contexts):
+        """Stream the instance, yielding facts for FactIndex and collecting contexts/units."""
+        depth = 0
+        for event, el in etree.iterparse(stream, events=("start", "end"), huge_tree=True,
+                                         remove_comments=True, remove_pis=True):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue   # nested parts are read with (and freed with) their top-level element
+
+            tag = el.tag
+            if tag == XBRLI_NS + "context":
+                contexts.append(self._context(el))
+            elif tag == XBRLI_NS + "unit":
+                self._add_unit(el)
+            else:
+                context_id = el.get("contextRef")
+                local = tag.rpartition("}")[2]
+                if context_id is not None and not local.endswith("TextBlock"):
+                    yield local, context_id, el.text or "", el.get(XSI_NIL) == "true"
+
+            # Free the element and everything already processed before it
+            el.clear()
+            parent = el.getparent()
+            while el.getprevious() is not None:
+                del parent[0]
+
+    @staticmethod
+    def _context(el):
+        period = {}
+        period_el = el.find(XBRLI_NS + "period")
+        if period_el is not None:
+            for key, tag in (("instant", "instant"), ("start", "startDate"),
+                             ("end", "endDate")):
+                child = period_el.find(XBRLI_NS + tag)
+                if child is not None and child.text:
+                    period[key] = child.text.strip()
+
+        dims = OrderedDict()
+        scenario = el.find(XBRLI_NS + "scenario")
+        if scenario is not None:
+            for member in scenario:
+                if member.tag == XBRLDI_NS + "explicitMember":
+                    dims[member.get("dimension")] = (member.text or "").strip()
+                elif member.tag == XBRLDI_NS + "typedMember":
+                    dims[member.get("dimension")] = "".join(member.itertext()).strip()
+        return XbrlContext(el.get("id", ""), period, dims, has_scenario=scenario is not None)
+
+    def _add_unit(self, el):
+        measures = [m.text.strip() for m in el.iter(XBRLI_NS + "measure") if m.text]
+        divide = el.find(XBRLI_NS + "divide")
+        if divide is not None and len(measures) == 2:
+            self.units[el.get("id", "")] = f"{measures[0]}/{measures[1]}"
+        elif measures:
+            self.units[el.get("id", "")] = measures[0]
+
+
+def _instance_member(zf):
+    """Name of the instance document in an EDINET package ZIP (PublicDoc first)."""
+    names = [n for n in zf.namelist() if n.lower().endswith(".xbrl")]
+    names.sort(key=lambda n: ("/PublicDoc/" not in n, n))
+    if not names:
+        raise ValueError("No .xbrl instance document in the ZIP.")
+    return names[0]
+
+
+def _is_zip_stream(f):
+    """True if a seekable binary stream holds a ZIP (the position is kept)."""
+    if not (hasattr(f, "seekable") and f.seekable()):
+        return False
+    pos = f.tell()
+    try:
+        return zipfile.is_zipfile(f)
+    finally:
+        f.seek(pos)
+
+
+@contextmanager
+def _open_instance(source, member=None):
+    """Open an instance document for streaming; see parse_xbrl_stream() for `source`."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        if member is None and not zipfile.is_zipfile(source):
+            with open(source, "rb") as f:
+                yield f
+            return
+
+    if isinstance(source, zipfile.ZipFile):
+        zf, owned = source, False
+    elif (member is not None or isinstance(source, (str, os.PathLike))
+          or _is_zip_stream(source)):
+        zf, owned = zipfile.ZipFile(source), True
+    else:
+        yield source
+        return
+    try:
+        with zf.open(member or _instance_member(zf)) as f:
+            yield f
+    finally:
+        if owned:
+            zf.close()
+
+
+def parse_xbrl_stream(source, member=None):
+    """Read an XBRL instance with lxml iterparse, in bounded memory.
+
+    Unlike parse_xbrl_file(), no document tree is kept: contexts, units and
+    non-TextBlock facts are collected into compact tables as the file is read.
+
+    Args:
+        source: Path to a .xbrl file or package ZIP, raw bytes of either, a
+                binary file-like object, or an open zipfile.ZipFile.
+        member: Name of the instance inside a ZIP (default: the first .xbrl
+                under PublicDoc).
+
+    Returns:
+        XbrlFacts usable wherever the extraction functions take a soup.
+
+    Raises:
+        ValueError: If the source is not well-formed XML (or has no instance).
+    """
+    if isinstance(source, (bytes, bytearray)):
+        logger.info("Streaming XBRL instance (%d bytes)", len(source))
+    elif isinstance(source, (str, os.PathLike)):
+        logger.info("Streaming XBRL file: %s%s", source, f" [{member}]" if member else "")
+    else:
+        logger.info("Streaming XBRL instance from %s",
+                    "ZIP" if isinstance(source, zipfile.ZipFile) else "stream")
+    try:
+        with _open_instance(source, member) as f:
+            return XbrlFacts(f)
+    except (etree.XMLSyntaxError, zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Unreadable XBRL instance: {e}") from e
+
+
+# =====================================================================
+# INLINE XBRL READER (ix:nonFraction / ix:nonNumeric)
+# =====================================================================
+# An Inline XBRL filing is a set of XHTML documents (*_ixbrl.htm under
+# PublicDoc) whose tagged values are the facts; contexts and units sit in
+# ix:resources of one of them. Values are shown as formatted ("1,234", "△56",
+# "2025年3月31日") and are normalised with the ix scale/sign/format attributes.
+IX_NAMESPACES = ("{http://www.xbrl.org/2013/inlineXBRL}",
+                 "{http://www.xbrl.org/2008/inlineXBRL}")
+IX_NON_FRACTION = tuple(ns + "nonFraction" for ns in IX_NAMESPACES)
+IX_NON_NUMERIC = tuple(ns + "nonNumeric" for ns in IX_NAMESPACES)
+IX_CONTINUATION = tuple(ns + "continuation" for ns in IX_NAMESPACES)
+IX_EXCLUDE = tuple(ns + "exclude" for ns in IX_NAMESPACES)
+IXBRL_SUFFIX = "ixbrl.htm"
+
+# ixt numeric formats with a decimal comma; all others use a decimal point
+_IX_DECIMAL_COMMA_FORMATS = ("numcommadecimal", "numdotcomma", "numspacecomma")
+_IX_ZERO_FORMATS = ("zerodash", "fixedzero", "numdash")
+# Japanese eras: era name -> year before its first year
+_IX_ERAS = {"令和": 2018, "平成": 1988, "昭和": 1925}
+
+
+def _ix_format_name(fmt):
+    """'ixt:num-dot-decimal' -> 'numdotdecimal' (ixt versions differ in hyphenation)."""
+    return (fmt or "").rpartition(":")[2].lower().replace("-", "")
+
+
+def _ix_number(text, fmt):
+    """Displayed amount of an ix:nonFraction as a Decimal (sign and scale not applied)."""
+    name = _ix_format_name(fmt)
+    if name in _IX_ZERO_FORMATS:
+        return Decimal(0)
+    if name in _IX_DECIMAL_COMMA_FORMATS:
+        digits = re.sub(r"[^\d,]", "", text).replace(",", ".")
+    else:
+        digits = re.sub(r"[^\d.]", "", text)
+    try:
+        return Decimal(digits) if digits else None
+    except InvalidOperation:
+        return None
+
+
+def _ix_text_value(text, fmt):
+    """Value of an ix:nonNumeric: dates as YYYY-MM-DD, booleans as true/false."""
+    name = _ix_format_name(fmt)
+    if not name:
+        return text
+    if name.startswith("boolean"):
+        return "true" if name == "booleantrue" else "false"
+    if name == "nocontent":
+        return ""
+    if not name.startswith("date"):
+        return text
+
+    era = next((base for era_name, base in _IX_ERAS.items() if era_name in text), None)
+    nums = [int(n) for n in re.findall(r"\d+", text.replace("元年", "1年"))]
+    if len(nums) < 3:
+        return text
+    if "daymonthyear" in name or name.endswith(("eu", "dmy")):
+        d, m, y = nums[:3]
+    elif "monthdayyear" in name or name.endswith(("us", "mdy")):
+        m, d, y = nums[:3]
+    else:
+        y, m, d = nums[:3]
+    if era is not None:
+        y += era
+    elif y < 100:
+        y += 2000
+    try:
+        return date(y, m, d).isoformat()
+    except ValueError:
+        return text
+
+
+def _ix_text(el):
+    """Text content of an ix element without its ix:exclude parts."""
+    parts = [el.text or ""]
+    for child in el:
+        if child.tag not in IX_EXCLUDE:
+            parts.append(_ix_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+class IxbrlFacts(XbrlFacts):
+    """Contexts, units and facts of an Inline XBRL document set, read in one streaming pass.
+
+    Accepted wherever the extraction functions take a soup. Numeric facts get
+    their scale, sign and format applied; ix:nonNumeric values are joined with
+    their ix:continuation parts. TextBlock facts are skipped.
+    """
+
+    def __init__(self, streams):
+        """
+        Args:
+            streams: Iterable of binary file-like objects, one per document of the set.
+        """
+        contexts = []
+        self.units = {}
+        self._fact_index = FactIndex(self._read_set(streams, contexts))
+        self._context_table = ContextTable(contexts)
+        if not len(self._fact_index) and not contexts:
+            raise ValueError("No Inline XBRL facts in the document set.")
+
+    def _read_set(self, streams, contexts):
+        """Yield the facts of every document; continued facts once all parts are read."""
+        continuations = {}   # continuation id -> (text, next id)
+        continued = []       # (local, context_id, text, format, first continuation id)
+        for stream in streams:
+            yield from self._read(stream, contexts, continuations, continued)
+        for local, context_id, text, fmt, next_id in continued:
+            seen = set()
+            while next_id and next_id in continuations and next_id not in seen:
+                seen.add(next_id)
+                part, next_id = continuations[next_id]
+                text += part
+            yield local, context_id, _ix_text_value(text, fmt), False
+
+    def _read(self, stream, contexts, continuations, continued):
+        """Stream one document, yielding its facts and collecting contexts/units/continuations."""
+        # Elements read as a whole: nothing inside them is freed until they end.
+        # TextBlock notes are not among them, so their HTML is freed as it streams.
+        holders = (IX_NON_FRACTION + IX_NON_NUMERIC + IX_CONTINUATION
+                   + (XBRLI_NS + "context", XBRLI_NS + "unit"))
+        open_holders = 0
+        for event, el in etree.iterparse(stream, events=("start", "end"), huge_tree=True,
+                                         recover=True, remove_comments=True,
+                                         remove_pis=True):
+            tag = el.tag
+            held = tag in holders and not (tag in IX_NON_NUMERIC
+                                           and el.get("name", "").endswith("TextBlock"))
+            if event == "start":
+                if held:
+                    open_holders += 1
+                continue
+            if not held:
+                if not open_holders:
+                    self._free(el)
+                continue
+            open_holders -= 1
+
+            if tag == XBRLI_NS + "context":
+                contexts.append(self._context(el))
+            elif tag == XBRLI_NS + "unit":
+                self._add_unit(el)
+            elif tag in IX_CONTINUATION:
+                continuations[el.get("id")] = (_ix_text(el), el.get("continuedAt"))
+            else:
+                local = el.get("name", "").rpartition(":")[2]
+                context_id = el.get("contextRef")
+                if context_id is not None and not local.endswith("TextBlock"):
+                    if el.get(XSI_NIL) == "true":
+                        yield local, context_id, "", True
+                    elif tag in IX_NON_FRACTION:
+                        yield local, context_id, self._number(el), False
+                    elif el.get("continuedAt"):
+                        continued.append((local, context_id, _ix_text(el),
+                                          el.get("format"), el.get("continuedAt")))
+                    else:
+                        yield local, context_id, _ix_text_value(_ix_text(el),
+                                                                el.get("format")), False
+            if not open_holders:
+                self._free(el)
+
+    @staticmethod
+    def _number(el):
+        value = _ix_number("".join(el.itertext()), el.get("format"))
+        if value is None:
+            return ""
+        if el.get("scale"):
+            value = value.scaleb(int(el.get("scale")))
+        if el.get("sign") == "-":
+            value = -value
+        return format(value, "f")
+
+    @staticmethod
+    def _free(el):
+        # Free the element and everything already processed before it
+        el.clear()
+        parent = el.getparent()
+        if parent is not None:
+            while el.getprevious() is not None:
+                del parent[0]
+
+
+def ixbrl_members(names):
+    """Inline XBRL documents among package member names (PublicDoc first, AuditDoc never)."""
+    docs = [n for n in names if n.lower().endswith(IXBRL_SUFFIX)
+            and "AuditDoc" not in n.replace("\\", "/").split("/")]
+    public = [n for n in docs if "PublicDoc" in n.replace("\\", "/").split("/")]
+    return sorted(public or docs)
+
+
+def _ixbrl_streams(source):
+    """Yield one binary stream per document of an Inline XBRL set; see parse_ixbrl_stream()."""
+    if isinstance(source, (bytes, bytearray)):
+        source = zipfile.ZipFile(io.BytesIO(source))
+    elif isinstance(source, (str, os.PathLike)):
+        source = zipfile.ZipFile(source)
+    if isinstance(source, zipfile.ZipFile):
+        names = ixbrl_members(source.namelist())
+        if not names:
+            raise ValueError("No Inline XBRL (*_ixbrl.htm) documents in the ZIP.")
+        for name in names:
+            with source.open(name) as f:
+                yield f
+        return
+
+    for doc in source:
+        if isinstance(doc, tuple):
+            doc = doc[1]
+        if isinstance(doc, (bytes, bytearray)):
+            yield io.BytesIO(doc)
+        elif isinstance(doc, (str, os.PathLike)):
+            with open(doc, "rb") as f:
+                yield f
+        else:
+            yield doc
+
+
+def parse_ixbrl_stream(source):
+    """Read an Inline XBRL document set with lxml iterparse, in bounded memory.
+
+    Args:
+        source: The documents — a list of paths, raw bytes, (name, bytes)
+                pairs or binary file-like objects — or a package ZIP (path,
+                bytes or open zipfile.ZipFile) whose *_ixbrl.htm members are read.
+
+    Returns:
+        IxbrlFacts usable wherever the extraction functions take a soup.
+
+    Raises:
+        ValueError: If no document of the set holds Inline XBRL.
+    """
+    if isinstance(source, (bytes, bytearray, str, os.PathLike, zipfile.ZipFile)):
+        logger.info("Streaming Inline XBRL set from package ZIP")
+    else:
+        source = list(source)
+        logger.info("Streaming Inline XBRL set (%d document(s))", len(source))
+    try:
+        return IxbrlFacts(_ixbrl_streams(source))
+    except (etree.XMLSyntaxError, zipfile.BadZipFile, KeyError, OSError) as e:
+        raise ValueError(f"Unreadable Inline XBRL: {e}") from e
+
+
+# =====================================================================
+# FACT CACHE
+# =====================================================================
+# The fact index and context table of a document are all the extraction
+# functions read, so they are persisted per document (edinet_cache fact cache,
+# keyed by content hash) and a known document is never parsed again. Bump
+# FACT_CACHE_VERSION whenever what the readers put into them changes.
+FACT_CACHE_VERSION = 1
+
+
+class CachedFacts:
+    """Fact index and context table of a document loaded from the fact cache.
+
+    Accepted wherever the extraction functions take a soup.
+    """
+
+    def __init__(self, numbers, texts, contexts):
+        """
+        Args:
+            numbers, texts, contexts: Rows as returned by edinet_cache.load_facts().
+        """
+        self._fact_index = FactIndex.from_tables(numbers, texts)
+        self._context_table = ContextTable(
+            XbrlContext(ctx_id, period, dims, has_scenario)
+            for ctx_id, period, dims, has_scenario in contexts)
+
+
+def parse_xbrl_cached(data, kind="xbrl"):
+    """Load a document's facts from the fact cache, parsing (and caching) it on a miss.
+
+    Args:
+        data: Document bytes — an instance document (kind="xbrl") or an
+              XBRL-to-CSV file (kind="csv") — or, for kind="ixbrl", the
+              (name, bytes) pairs of an Inline XBRL document set.
+        kind: "xbrl", "csv" or "ixbrl".
+
+    Returns:
+        CachedFacts on a cache hit, else the XbrlFacts / CsvFacts / IxbrlFacts
+        just parsed.
+
+    Raises:
+        ValueError: If the document cannot be parsed.
+    """
+    try:
+        from scripts import edinet_cache
+    except ImportError:
+        import edinet_cache
+
+    if kind == "ixbrl":
+        digest = hashlib.sha256()
+        for name, content in data:
+            digest.update(name.rsplit("/", 1)[-1].encode("utf-8") + b"\0")
+            digest.update(content)
+        content_hash = digest.hexdigest()
+    else:
+        content_hash = hashlib.sha256(data).hexdigest()
+    cached = edinet_cache.load_facts(content_hash, kind, FACT_CACHE_VERSION)
+    if cached is not None:
+        return CachedFacts(*cached)
+
+    if kind == "csv":
+        doc = parse_xbrl_csv(data)
+    elif kind == "ixbrl":
+        doc = parse_ixbrl_stream(data)
+    else:
+        doc = parse_xbrl_stream(data)
+    index, table = get_fact_index(doc), get_context_table(doc)
+    edinet_cache.save_facts(
+        content_hash, kind, FACT_CACHE_VERSION, index.numbers(), index.texts(),
+        ((ctx.id, ctx.period, ctx.dims, ctx.has_scenario) for ctx in table))
+    return doc
+
+
 def identify_clean_contexts(soup):
     """Identify 'clean' context IDs — those without scenario/dimension members.
 
@@ -394,27 +1294,14 @@ def identify_clean_contexts(soup):
         dict mapping context pattern keys to their clean context IDs.
         Example: {"current_duration": "CurrentYearDuration", ...}
     """
+    table = get_context_table(soup)
     clean_contexts = {}
-
-    for ctx in soup.find_all("xbrli:context"):
-        ctx_id = ctx.get("id", "")
+    for key, pattern in CONTEXT_PATTERNS.items():
         # A context is "clean" if it has no scenario element (no dimensions)
-        scenario = ctx.find("xbrli:scenario")
-        if scenario is not None:
-            continue
-
-        for key, pattern in CONTEXT_PATTERNS.items():
-            if ctx_id == pattern:
-                clean_contexts[key] = ctx_id
-                period = ctx.find("xbrli:period")
-                if period:
-                    instant = period.find("xbrli:instant")
-                    start = period.find("xbrli:startDate")
-                    end = period.find("xbrli:endDate")
-                    if instant:
-                        logger.info("  Context %-25s -> %s", ctx_id, instant.text)
-                    elif start and end:
-                        logger.info("  Context %-25s -> %s to %s", ctx_id, start.text, end.text)
+        ctx = table.clean(pattern)
+        if ctx is not None:
+            clean_contexts[key] = ctx.id
+            _log_context("Context", ctx)
 
     # --- Fallback for non-consolidated (単体) companies ---
     # If clean contexts found no revenue data, try NonConsolidatedMember contexts
@@ -431,30 +1318,13 @@ def identify_clean_contexts(soup):
             return clean_contexts
 
     # Look for NonConsolidatedMember contexts as fallback
+    # (single dimension: ConsolidatedOrNonConsolidatedAxis:NonConsolidatedMember)
     noncon_contexts = {}
-    for ctx in soup.find_all("xbrli:context"):
-        ctx_id = ctx.get("id", "")
-        scenario = ctx.find("xbrli:scenario")
-        if scenario is None:
-            continue
-        # Check if this is a pure NonConsolidatedMember context
-        # (single dimension: ConsolidatedOrNonConsolidatedAxis:NonConsolidatedMember)
-        if "NonConsolidatedMember" not in ctx_id:
-            continue
-
-        for key, pattern in CONTEXT_PATTERNS.items():
-            expected_id = f"{pattern}_NonConsolidatedMember"
-            if ctx_id == expected_id:
-                noncon_contexts[key] = ctx_id
-                period = ctx.find("xbrli:period")
-                if period:
-                    instant = period.find("xbrli:instant")
-                    start = period.find("xbrli:startDate")
-                    end = period.find("xbrli:endDate")
-                    if instant:
-                        logger.info("  NonCon Context %-25s -> %s", ctx_id, instant.text)
-                    elif start and end:
-                        logger.info("  NonCon Context %-25s -> %s to %s", ctx_id, start.text, end.text)
+    for key, pattern in CONTEXT_PATTERNS.items():
+        ctx = table.get(f"{pattern}_NonConsolidatedMember")
+        if ctx is not None and ctx.has_member("NonConsolidatedMember"):
+            noncon_contexts[key] = ctx.id
+            _log_context("NonCon Context", ctx)
 
     if noncon_contexts:
         logger.info("Using NonConsolidatedMember contexts (単体 company fallback)")
@@ -466,38 +1336,176 @@ def identify_clean_contexts(soup):
 def _get_value(soup, tag_local_name, context_id):
     """Extract a numeric value for a given tag and context from the XBRL soup.
 
-    Searches for elements with the given local name (ignoring namespace prefix)
-    that have contextRef matching the specified context ID.
+    Looks the element up by local name (ignoring namespace prefix) and
+    contextRef in the document's FactIndex (see get_fact_index()).
 
     Args:
-        soup: BeautifulSoup object.
+        soup: BeautifulSoup object (or CsvFacts from parse_xbrl_csv()).
         tag_local_name: Local element name (e.g. "NetSales").
         context_id: The context reference string (e.g. "CurrentYearDuration").
 
     Returns:
         float value in JPY, or None if not found.
     """
-    # Search across all namespace prefixes (jppfs_cor, jpcrp_cor, etc.)
-    for el in soup.find_all(True):
-        local = el.name.split(":")[-1] if ":" in el.name else el.name
-        if local != tag_local_name:
-            continue
-        if el.get("contextRef") != context_id:
-            continue
-        # Skip nil values
-        if el.get("{http://www.w3.org/2001/XMLSchema-instance}nil") == "true":
-            continue
-        if el.get("xsi:nil") == "true":
-            continue
-        try:
-            text = el.text.strip()
-            if not text:
-                continue
-            return float(text)
-        except (ValueError, TypeError):
-            continue
+    return get_fact_index(soup).number(tag_local_name, context_id)
+
+
+# =====================================================================
+# EXTRACTION PLAN
+# =====================================================================
+# FINANCIAL_ITEMS is compiled once into an ExtractionPlan: per period type,
+# the distinct tags its items read (each looked up once per context) and, per
+# item, its mode, negate flag and tag slots. Evaluating a document is then one
+# lookup pass per context over those tags followed by array arithmetic, for
+# all items and all year contexts at once.
+PLAN_FIRST, PLAN_SUM, PLAN_FALLBACK = 0, 1, 2
+
+
+class ExtractionPlan:
+    """Compiled form of an item spec such as FINANCIAL_ITEMS.
 
-    return None
+    For each item, ``primary`` holds the tag slots tried in order (PLAN_FIRST),
+    summed (PLAN_SUM) or tried as aggregates (PLAN_FALLBACK), and
+    ``components`` the slots summed when no aggregate is reported.
+    """
+
+    def __init__(self, items, components=None):
+        """
+        Args:
+            items: Ordered mapping of item_key -> item definition
+                   ("type", "tags", optional "sum" and "negate").
+            components: Mapping of item_key -> component tags of a
+                        sum="fallback" item (default: none).
+        """
+        components = components or {}
+        self.keys = list(items)
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+        self.types = []
+        self.modes = []
+        self.negate = []
+        self.primary = []
+        self.components = []
+        self.tags = {}  # period type -> distinct tags, in slot order
+        slots = {}      # period type -> {tag: slot}
+        for item_key, item_def in items.items():
+            period_type = item_def["type"]
+            type_tags = self.tags.setdefault(period_type, [])
+            type_slots = slots.setdefault(period_type, {})
+
+            def slot(tag):
+                if tag not in type_slots:
+                    type_slots[tag] = len(type_tags)
+                    type_tags.append(tag)
+                return type_slots[tag]
+
+            sum_mode = item_def.get("sum", False)
+            tags = item_def["tags"]
+            parts = ()
+            if sum_mode == "fallback":
+                parts = components.get(item_key, [])
+                tags = [t for t in tags if t not in parts]
+                mode = PLAN_FALLBACK
+            else:
+                mode = PLAN_SUM if sum_mode else PLAN_FIRST
+            self.types.append(period_type)
+            self.modes.append(mode)
+            self.negate.append(bool(item_def.get("negate", False)))
+            self.primary.append(tuple(slot(t) for t in tags))
+            self.components.append(tuple(slot(t) for t in parts))
+
+    def _values(self, index, period_type, context_id):
+        """Values of the period type's tags in a context (None where missing)."""
+        number = index.number
+        return [number(tag, context_id) for tag in self.tags[period_type]]
+
+    @staticmethod
+    def _sum(value, slots):
+        """Sum of the reported values of ``slots``, or None if none is."""
+        total, found = 0.0, False
+        for s in slots:
+            v = value(s)
+            if v is not None:
+                total += v
+                found = True
+        return total if found else None
+
+    def _item(self, i, value, scale):
+        """Scaled value of item ``i``, or None.
+
+        ``value(slot)`` returns the value of a tag slot of the item's type.
+        """
+        if self.modes[i] == PLAN_SUM:
+            total = self._sum(value, self.primary[i])
+        else:
+            total = None
+            for s in self.primary[i]:
+                total = value(s)
+                if total is not None:
+                    break
+            if total is None and self.modes[i] == PLAN_FALLBACK:
+                total = self._sum(value, self.components[i])
+        if total is None:
+            return None
+        result = total / scale if scale else total
+        return abs(result) if self.negate[i] else result
+
+    def evaluate_item(self, index, item_key, context_id, scale=SCALE_TO_MN):
+        """Value of one item in one context, looking up only the tags it reads."""
+        i = self._positions[item_key]
+        tags = self.tags[self.types[i]]
+        number = index.number
+        return self._item(i, lambda s: number(tags[s], context_id), scale)
+
+    def evaluate(self, index, contexts, scale=SCALE_TO_MN):
+        """Evaluate every item for a set of labelled contexts in one pass.
+
+        Args:
+            index: FactIndex of the document (see get_fact_index()).
+            contexts: {label: {period_type: context_id_or_None}}. Only items of
+                      the period types a label lists are evaluated for it;
+                      a None context yields None for all of them.
+            scale: Divisor for unit conversion (default: 1_000_000 for JPY mn).
+
+        Returns:
+            dict: {label: {item_key: value_or_None}} in item spec order.
+        """
+        values = {}
+        for by_type in contexts.values():
+            for period_type, context_id in by_type.items():
+                key = (period_type, context_id)
+                if context_id is not None and period_type in self.tags \
+                        and key not in values:
+                    values[key] = self._values(index, period_type, context_id)
+
+        result = {}
+        for label, by_type in contexts.items():
+            items = {}
+            for i, (item_key, period_type) in enumerate(zip(self.keys, self.types)):
+                if period_type not in by_type:
+                    continue
+                type_values = values.get((period_type, by_type[period_type]))
+                items[item_key] = (None if type_values is None
+                                   else self._item(i, type_values.__getitem__, scale))
+            result[label] = items
+        return result
+
+
+_FINANCIAL_PLAN = ExtractionPlan(FINANCIAL_ITEMS, _SUM_COMPONENTS)
+
+# One-item plans of item definitions outside FINANCIAL_ITEMS:
+# item_key -> (item_def, plan), reused while the same definition is passed
+_ITEM_PLANS = {}
+
+
+def _item_plan(item_key, item_def):
+    """Compiled plan evaluating `item_def`, built once per definition."""
+    if FINANCIAL_ITEMS.get(item_key) is item_def:
+        return _FINANCIAL_PLAN
+    cached = _ITEM_PLANS.get(item_key)
+    if cached is None or cached[0] is not item_def:
+        cached = (item_def, ExtractionPlan({item_key: item_def}, _SUM_COMPONENTS))
+        _ITEM_PLANS[item_key] = cached
+    return cached[1]
 
 
 def extract_item(soup, item_key, item_def, context_id, scale=SCALE_TO_MN):
@@ -508,6 +1516,9 @@ def extract_item(soup, item_key, item_def, context_id, scale=SCALE_TO_MN):
     2. For sum=True: sum all matching tags.
     3. For sum="fallback": try single aggregate tags first, then sum components.
 
+    Items of FINANCIAL_ITEMS are evaluated with its precompiled plan, other
+    definitions with a one-item plan compiled on first use.
+
     Args:
         soup: BeautifulSoup object.
         item_key: Key in FINANCIAL_ITEMS (e.g. "revenue").
@@ -518,59 +1529,8 @@ def extract_item(soup, item_key, item_def, context_id, scale=SCALE_TO_MN):
     Returns:
         Scaled float value, or None if not found.
     """
-    tags = item_def["tags"]
-    sum_mode = item_def.get("sum", False)
-    negate = item_def.get("negate", False)
-
-    if sum_mode == "fallback":
-        # Strategy: try aggregate tags first (before the component tags)
-        components = _SUM_COMPONENTS.get(item_key, [])
-        aggregate_tags = [t for t in tags if t not in components]
-
-        # Try aggregate tags first
-        for tag in aggregate_tags:
-            val = _get_value(soup, tag, context_id)
-            if val is not None:
-                result = val / scale if scale else val
-                return abs(result) if negate else result
-
-        # Fallback: sum components
-        total = 0.0
-        found_any = False
-        for tag in components:
-            val = _get_value(soup, tag, context_id)
-            if val is not None:
-                total += val
-                found_any = True
-
-        if found_any:
-            result = total / scale if scale else total
-            return abs(result) if negate else result
-
-        return None
-
-    elif sum_mode:
-        # Sum all matching tags
-        total = 0.0
-        found_any = False
-        for tag in tags:
-            val = _get_value(soup, tag, context_id)
-            if val is not None:
-                total += val
-                found_any = True
-        if found_any:
-            result = total / scale if scale else total
-            return abs(result) if negate else result
-        return None
-
-    else:
-        # Try each tag in order, return first match
-        for tag in tags:
-            val = _get_value(soup, tag, context_id)
-            if val is not None:
-                result = val / scale if scale else val
-                return abs(result) if negate else result
-        return None
+    return _item_plan(item_key, item_def).evaluate_item(
+        get_fact_index(soup), item_key, context_id, scale)
 
 
 def extract_financial_data(soup, contexts, years=None, scale=SCALE_TO_MN):
@@ -595,8 +1555,7 @@ def extract_financial_data(soup, contexts, years=None, scale=SCALE_TO_MN):
             year_prefixes.add(prefix)
         years = sorted(year_prefixes, key=lambda x: (x != "current", x))
 
-    result = {}
-
+    year_contexts = {}
     for year_key in years:
         dur_ctx = contexts.get(f"{year_key}_duration")
         inst_ctx = contexts.get(f"{year_key}_instant")
@@ -604,15 +1563,11 @@ def extract_financial_data(soup, contexts, years=None, scale=SCALE_TO_MN):
         if not dur_ctx and not inst_ctx:
             logger.warning("No contexts found for year '%s', skipping.", year_key)
             continue
+        year_contexts[year_key] = {"duration": dur_ctx, "instant": inst_ctx}
 
-        year_data = {}
-        for item_key, item_def in FINANCIAL_ITEMS.items():
-            ctx_id = dur_ctx if item_def["type"] == "duration" else inst_ctx
-            if ctx_id is None:
-                year_data[item_key] = None
-                continue
-            year_data[item_key] = extract_item(soup, item_key, item_def, ctx_id, scale)
+    result = _FINANCIAL_PLAN.evaluate(get_fact_index(soup), year_contexts, scale)
 
+    for year_key, year_data in result.items():
         # Derive computed fields
         if year_data.get("short_term_debt") is not None or year_data.get("long_term_debt") is not None:
             st = year_data.get("short_term_debt") or 0
@@ -626,22 +1581,13 @@ def extract_financial_data(soup, contexts, years=None, scale=SCALE_TO_MN):
         else:
             year_data["net_debt"] = None
 
-        result[year_key] = year_data
-
     # Add metadata: period dates from contexts
     meta = {}
+    table = get_context_table(soup)
     for key, ctx_id in contexts.items():
-        ctx_el = soup.find("xbrli:context", id=ctx_id)
-        if ctx_el:
-            period = ctx_el.find("xbrli:period")
-            if period:
-                instant = period.find("xbrli:instant")
-                start = period.find("xbrli:startDate")
-                end = period.find("xbrli:endDate")
-                if instant:
-                    meta[key] = {"instant": instant.text}
-                elif start and end:
-                    meta[key] = {"start": start.text, "end": end.text}
+        period = table.period(ctx_id)
+        if period:
+            meta[key] = period
     result["_meta"] = meta
 
     return result
@@ -666,18 +1612,12 @@ def extract_company_info(soup):
         "current_period_end": ["CurrentPeriodEndDateDEI"],
     }
 
+    facts = get_fact_index(soup)
     for key, tags in dei_items.items():
         for tag in tags:
-            el = soup.find(True, {"name": lambda n: n and n.endswith(f":{tag}")})
-            if el is None:
-                # Try without namespace
-                for candidate in soup.find_all(True):
-                    local = candidate.name.split(":")[-1] if ":" in candidate.name else candidate.name
-                    if local == tag:
-                        el = candidate
-                        break
-            if el and el.text.strip():
-                info[key] = el.text.strip()
+            text = facts.first_text(tag)
+            if text:
+                info[key] = text
                 break
 
     return info
@@ -700,19 +1640,12 @@ def extract_forecast_data(soup, scale=SCALE_TO_MN):
         dict: {item_key: value_in_jpy_mn, ...} or empty dict if no forecasts found.
               Keys: forecast_revenue, forecast_operating_income, forecast_net_income.
     """
-    # Find contexts with ForecastMember in scenario dimension
-    forecast_ctx_ids = []
-    for ctx in soup.find_all("xbrli:context"):
-        ctx_id = ctx.get("id", "")
-        scenario = ctx.find("xbrli:scenario")
-        if scenario is None:
-            continue
-        # Check for ForecastMember in scenario (covers both explicit dimension
-        # members and context ID naming conventions)
-        scenario_str = str(scenario)
-        if "ForecastMember" in scenario_str or "ResultForecastMember" in scenario_str:
-            # Prefer CurrentYearDuration forecast (next FY forecast)
-            forecast_ctx_ids.append(ctx_id)
+    # Find contexts with a ForecastMember among their dimension members
+    # (ForecastMember, ResultForecastMember, ...)
+    forecast_ctx_ids = [
+        ctx.id for ctx in get_context_table(soup)
+        if any(m.endswith("ForecastMember") for m in ctx.members())
+    ]
 
     if not forecast_ctx_ids:
         logger.info("No forecast contexts (ForecastMember) found in XBRL.")
@@ -774,91 +1707,56 @@ def identify_quarterly_contexts(soup):
             'period_end': quarter end date string
         Returns empty dict if no quarterly contexts found.
     """
+    table = get_context_table(soup)
     result = {}
     quarter_number = None
 
-    for ctx in soup.find_all("xbrli:context"):
-        ctx_id = ctx.get("id", "")
-        scenario = ctx.find("xbrli:scenario")
-        if scenario is not None:
-            continue  # skip dimensioned contexts
-
-        # Detect cumulative duration contexts
-        for q in [3, 2, 1]:
-            current_pattern = f"CurrentAccumulatedQ{q}Duration"
-            prior_pattern = f"Prior1AccumulatedQ{q}Duration"
-
-            if ctx_id == current_pattern:
-                result["current_accumulated_duration"] = ctx_id
-                quarter_number = q
-                period = ctx.find("xbrli:period")
-                if period:
-                    end = period.find("xbrli:endDate")
-                    if end:
-                        result["period_end"] = end.text
-                    start = period.find("xbrli:startDate")
-                    if start and end:
-                        logger.info("  Q%d Context %-35s -> %s to %s",
-                                    q, ctx_id, start.text, end.text)
-
-            if ctx_id == prior_pattern:
-                result["prior1_accumulated_duration"] = ctx_id
-                period = ctx.find("xbrli:period")
-                if period:
-                    start = period.find("xbrli:startDate")
-                    end = period.find("xbrli:endDate")
-                    if start and end:
-                        logger.info("  Q%d Context %-35s -> %s to %s",
-                                    q, ctx_id, start.text, end.text)
-
-        # Detect quarterly instant contexts (BS)
-        if ctx_id == "CurrentQuarterInstant":
-            result["current_quarter_instant"] = ctx_id
-            period = ctx.find("xbrli:period")
-            if period:
-                instant = period.find("xbrli:instant")
-                if instant:
-                    logger.info("  Context %-35s -> %s", ctx_id, instant.text)
-
-        if ctx_id == "Prior1QuarterInstant":
-            result["prior1_quarter_instant"] = ctx_id
-
-        # --- New semi-annual report (docType 160) context patterns ---
-        # InterimDuration = current H1 cumulative (equivalent to AccumulatedQ2)
-        if ctx_id == "InterimDuration":
-            result["current_accumulated_duration"] = ctx_id
-            if quarter_number is None:
-                quarter_number = 2  # semi-annual = Q2
-            period = ctx.find("xbrli:period")
-            if period:
-                end = period.find("xbrli:endDate")
-                if end:
-                    result["period_end"] = end.text
-                start = period.find("xbrli:startDate")
-                if start and end:
-                    logger.info("  H1 Context %-35s -> %s to %s",
-                                ctx_id, start.text, end.text)
-
-        if ctx_id == "Prior1InterimDuration":
-            result["prior1_accumulated_duration"] = ctx_id
-            period = ctx.find("xbrli:period")
-            if period:
-                start = period.find("xbrli:startDate")
-                end = period.find("xbrli:endDate")
-                if start and end:
-                    logger.info("  H1 Context %-35s -> %s to %s",
-                                ctx_id, start.text, end.text)
-
-        if ctx_id == "InterimInstant":
-            result["current_quarter_instant"] = ctx_id
-            period = ctx.find("xbrli:period")
-            if period:
-                instant = period.find("xbrli:instant")
-                if instant:
-                    logger.info("  Context %-35s -> %s", ctx_id, instant.text)
-
-        if ctx_id == "Prior1InterimInstant":
-            result["prior1_quarter_instant"] = ctx_id
+    # Cumulative duration contexts (the latest quarter present wins)
+    for q in (3, 2, 1):
+        ctx = table.clean(f"CurrentAccumulatedQ{q}Duration")
+        if ctx is None:
+            continue
+        result["current_accumulated_duration"] = ctx.id
+        quarter_number = q
+        if ctx.end:
+            result["period_end"] = ctx.end
+        _log_context(f"Q{q} Context", ctx, 35)
+        prior = table.clean(f"Prior1AccumulatedQ{q}Duration")
+        if prior is not None:
+            result["prior1_accumulated_duration"] = prior.id
+            _log_context(f"Q{q} Context", prior, 35)
+        break
+
+    # Quarterly instant contexts (BS)
+    ctx = table.clean("CurrentQuarterInstant")
+    if ctx is not None:
+        result["current_quarter_instant"] = ctx.id
+        _log_context("Context", ctx, 35)
+    ctx = table.clean("Prior1QuarterInstant")
+    if ctx is not None:
+        result["prior1_quarter_instant"] = ctx.id
+
+    # --- New semi-annual report (docType 160) context patterns ---
+    # InterimDuration = current H1 cumulative (equivalent to AccumulatedQ2)
+    ctx = table.clean("InterimDuration")
+    if ctx is not None:
+        result["current_accumulated_duration"] = ctx.id
+        if quarter_number is None:
+            quarter_number = 2  # semi-annual = Q2
+        if ctx.end:
+            result["period_end"] = ctx.end
+        _log_context("H1 Context", ctx, 35)
+    ctx = table.clean("Prior1InterimDuration")
+    if ctx is not None:
+        result["prior1_accumulated_duration"] = ctx.id
+        _log_context("H1 Context", ctx, 35)
+    ctx = table.clean("InterimInstant")
+    if ctx is not None:
+        result["current_quarter_instant"] = ctx.id
+        _log_context("Context", ctx, 35)
+    ctx = table.clean("Prior1InterimInstant")
+    if ctx is not None:
+        result["prior1_quarter_instant"] = ctx.id
 
     if quarter_number:
         result["quarter_number"] = quarter_number
@@ -879,49 +1777,44 @@ def identify_quarterly_contexts(soup):
                       if k in ("quarter_number", "period_end")}
 
     if _need_noncon_fallback:
-        for ctx in soup.find_all("xbrli:context"):
-            ctx_id = ctx.get("id", "")
-            if "NonConsolidatedMember" not in ctx_id:
-                continue
+        def noncon(pattern):
+            return table.get(f"{pattern}_NonConsolidatedMember")
+
+        if "current_accumulated_duration" not in result:
+            for q in (3, 2, 1):
+                ctx = noncon(f"CurrentAccumulatedQ{q}Duration")
+                if ctx is None:
+                    continue
+                result["current_accumulated_duration"] = ctx.id
+                quarter_number = q
+                result["quarter_number"] = q
+                if ctx.end:
+                    result["period_end"] = ctx.end
+                logger.info("  NonCon Q%d Context %s", q, ctx.id)
+                prior = noncon(f"Prior1AccumulatedQ{q}Duration")
+                if prior is not None:
+                    result.setdefault("prior1_accumulated_duration", prior.id)
+                    logger.info("  NonCon Q%d Context %s", q, prior.id)
+                break
 
-            for q in [3, 2, 1]:
-                cur_pat = f"CurrentAccumulatedQ{q}Duration_NonConsolidatedMember"
-                pri_pat = f"Prior1AccumulatedQ{q}Duration_NonConsolidatedMember"
-
-                if ctx_id == cur_pat and "current_accumulated_duration" not in result:
-                    result["current_accumulated_duration"] = ctx_id
-                    quarter_number = q
-                    result["quarter_number"] = q
-                    period = ctx.find("xbrli:period")
-                    if period:
-                        end = period.find("xbrli:endDate")
-                        if end:
-                            result["period_end"] = end.text
-                    logger.info("  NonCon Q%d Context %s", q, ctx_id)
-
-                if ctx_id == pri_pat and "prior1_accumulated_duration" not in result:
-                    result["prior1_accumulated_duration"] = ctx_id
-                    logger.info("  NonCon Q%d Context %s", q, ctx_id)
-
-            if ctx_id == "CurrentQuarterInstant_NonConsolidatedMember":
-                result["current_quarter_instant"] = ctx_id
-            if ctx_id == "Prior1QuarterInstant_NonConsolidatedMember":
-                result["prior1_quarter_instant"] = ctx_id
-            if ctx_id == "InterimInstant_NonConsolidatedMember":
-                result.setdefault("current_quarter_instant", ctx_id)
-            if ctx_id == "Prior1InterimInstant_NonConsolidatedMember":
-                result.setdefault("prior1_quarter_instant", ctx_id)
-            if ctx_id == "InterimDuration_NonConsolidatedMember":
-                result.setdefault("current_accumulated_duration", ctx_id)
-                if not result.get("quarter_number"):
-                    result["quarter_number"] = 2
-                period = ctx.find("xbrli:period")
-                if period:
-                    end = period.find("xbrli:endDate")
-                    if end:
-                        result.setdefault("period_end", end.text)
-            if ctx_id == "Prior1InterimDuration_NonConsolidatedMember":
-                result.setdefault("prior1_accumulated_duration", ctx_id)
+        for key, pattern in (("current_quarter_instant", "CurrentQuarterInstant"),
+                             ("prior1_quarter_instant", "Prior1QuarterInstant")):
+            ctx = noncon(pattern)
+            if ctx is not None:
+                result[key] = ctx.id
+        for key, pattern in (("current_quarter_instant", "InterimInstant"),
+                             ("prior1_quarter_instant", "Prior1InterimInstant"),
+                             ("current_accumulated_duration", "InterimDuration"),
+                             ("prior1_accumulated_duration", "Prior1InterimDuration")):
+            ctx = noncon(pattern)
+            if ctx is not None:
+                result.setdefault(key, ctx.id)
+        ctx = noncon("InterimDuration")
+        if ctx is not None:
+            if not result.get("quarter_number"):
+                result["quarter_number"] = 2
+            if ctx.end:
+                result.setdefault("period_end", ctx.end)
 
         if result.get("current_accumulated_duration"):
             logger.info("Using NonConsolidatedMember quarterly contexts (単体 company fallback)")
@@ -950,21 +1843,19 @@ def extract_quarterly_data(soup, q_contexts, scale=SCALE_TO_MN):
     pri_dur = q_contexts.get("prior1_accumulated_duration")
     cur_inst = q_contexts.get("current_quarter_instant")
 
+    label_contexts = {}
     for label, ctx_id in [("current_cumulative", cur_dur),
                            ("prior1_cumulative", pri_dur),
                            ("current_instant", cur_inst)]:
+        result[label] = {}
         if ctx_id is None:
-            result[label] = {}
             continue
+        period_type = "instant" if label.endswith("_instant") else "duration"
+        label_contexts[label] = {period_type: ctx_id}
 
-        data = {}
-        for item_key, item_def in FINANCIAL_ITEMS.items():
-            if label.endswith("_instant") and item_def["type"] != "instant":
-                continue
-            if label.endswith("_cumulative") and item_def["type"] != "duration":
-                continue
-            data[item_key] = extract_item(soup, item_key, item_def, ctx_id, scale)
+    values = _FINANCIAL_PLAN.evaluate(get_fact_index(soup), label_contexts, scale)
 
+    for label, data in values.items():
         # Derive total_debt and net_debt for instant data
         if label == "current_instant":
             st = data.get("short_term_debt") or 0
@@ -1136,6 +2027,34 @@ def merge_multi_year_data(all_year_data):
     return result
 
 
+def merge_amended_data(original, amended):
+    """Merge data extracted from a corrected report (訂正報告書) over the original's.
+
+    A correction re-files the instance document, so its values supersede the
+    original's; values it leaves empty (None) keep the original's. Works on any
+    nesting of dicts, e.g. extract_financial_data(), extract_quarterly_data()
+    or extract_company_info() output.
+
+    Args:
+        original: Data extracted from the original filing (or None).
+        amended: Data extracted from the amendment (or None).
+
+    Returns:
+        Merged copy of the data; the inputs are not modified.
+    """
+    if original is None:
+        return amended
+    if amended is None:
+        return original
+    merged = OrderedDict(original)
+    for key, value in amended.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_amended_data(merged[key], value)
+        elif value is not None:
+            merged[key] = value
+    return merged
+
+
 # =====================================================================
 # PRETTY PRINT
 # =====================================================================
@@ -1229,8 +2148,9 @@ def main():
     )
 
     if len(sys.argv) < 2:
-        print("Usage: python scripts/edinet_parser.py <path_to_xbrl_file>")
+        print("Usage: python scripts/edinet_parser.py <path_to_xbrl_zip_or_csv_file | ixbrl.htm ...>")
         print("Example: python scripts/edinet_parser.py tmp/edinet_data/S100XXXX/XBRL/PublicDoc/xxx.xbrl")
+        print("         python scripts/edinet_parser.py tmp/edinet_data/S100XXXX.type1.zip")
         sys.exit(1)
 
     xbrl_path = sys.argv[1]
@@ -1239,7 +2159,16 @@ def main():
         sys.exit(1)
 
     # Parse
-    soup = parse_xbrl_file(xbrl_path)
+    if xbrl_path.lower().endswith(".csv"):
+        soup = parse_xbrl_csv(xbrl_path)
+    elif xbrl_path.lower().endswith(".htm"):
+        soup = parse_ixbrl_stream(sys.argv[1:])
+    elif zipfile.is_zipfile(xbrl_path):
+        with zipfile.ZipFile(xbrl_path) as zf:
+            has_instance = any(n.lower().endswith(".xbrl") for n in zf.namelist())
+        soup = parse_xbrl_stream(xbrl_path) if has_instance else parse_ixbrl_stream(xbrl_path)
+    else:
+        soup = parse_xbrl_stream(xbrl_path)
 
     # Company info
     company_info = extract_company_info(soup)
@@ -0,0 +1,376 @@
+"""
+edinet_prefetch.py - Filing-season prefetch job that warms the EDINET caches.
+
+Around late June and mid-November many watchlist names file within days of each
+other. Instead of every generate_dcf.py run discovering and downloading its
+filings on demand, this job polls the daily documents.json listings and, for
+every new filing of a watchlist ticker, downloads the package into the package
+store and caches its extracted financial data (edinet_fetcher.prefetch_filings,
+which parses in worker processes while the next package downloads).
+A model refresh on filing day then runs from disk.
+
+Prefetched documents:
+    120 / 140 / 160   annual, quarterly and semi-annual reports
+    130 / 150 / 170   their corrections (訂正報告書), if they carry XBRL
+
+Watchlist: the tickers of data/overrides/{ticker}_overrides*.json, plus any
+given with --tickers.
+
+Cadence: one poll every PEAK_POLL_INTERVAL_SEC inside the annual filing seasons
+and interim filing windows of edinet_fetcher, else every
+OFF_PEAK_POLL_INTERVAL_SEC. A poll syncs the listings since the previous poll
+into the local filing index (edinet_index.py) — one request per weekday — and
+downloads at most MAX_DOWNLOADS_PER_POLL packages. Every request goes through
+the fetcher's shared rate limiter, and the cross-process cache locks let a
+model run and the prefetch job share the cache without duplicate downloads.
+
+Poll state (last poll date, prefetched / failed docIDs) is kept in:
+    tmp/edinet_cache/prefetch_state.json
+
+Usage:
+    python scripts/edinet_prefetch.py run                    # poll until Ctrl+C
+    python scripts/edinet_prefetch.py once                   # single poll (cron)
+    python scripts/edinet_prefetch.py once --tickers 7974 --since 2025-06-01
+    python scripts/edinet_prefetch.py watchlist
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import threading
+from datetime import date, datetime, timedelta
+
+try:
+    from scripts import edinet_cache, edinet_index, fetch_metrics
+    from scripts import edinet_fetcher
+except ImportError:
+    import edinet_cache
+    import edinet_index
+    import fetch_metrics
+    import edinet_fetcher
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# CONSTANTS
+# =====================================================================
+DEFAULT_OVERRIDES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "data", "overrides"
+)
+
+# data/overrides/{ticker}_overrides[_suffix].json -> ticker
+OVERRIDES_FILE_PATTERN = re.compile(r"^([0-9A-Z]{4})_overrides.*\.json$")
+
+STATE_FILENAME = "prefetch_state.json"
+
+# Poll cadence. Inside a filing season, poll as often as today's listing may be
+# re-fetched (its cache TTL); outside, a few times a day catches stragglers.
+PEAK_POLL_INTERVAL_SEC = edinet_cache.LISTING_TODAY_TTL_SEC
+OFF_PEAK_POLL_INTERVAL_SEC = 6 * 60 * 60
+
+# First poll (no state yet) looks back this many days
+FIRST_POLL_LOOKBACK_DAYS = 7
+
+# Downloads per poll; the rest are picked up by the next poll
+MAX_DOWNLOADS_PER_POLL = 25
+
+# A filing that fails to download or parse this many times is given up on
+MAX_ATTEMPTS = 3
+
+# Only one prefetch job per cache
+DAEMON_LOCK_NAME = "prefetch-daemon"
+
+
+# =====================================================================
+# WATCHLIST
+# =====================================================================
+def load_watchlist(overrides_dir=None, extra=()):
+    """Tickers to prefetch: one per overrides file, plus `extra`.
+
+    Args:
+        overrides_dir: Directory of {ticker}_overrides*.json files
+                       (default: data/overrides).
+        extra: Additional ticker codes.
+
+    Returns:
+        list[str]: Sorted, de-duplicated ticker codes.
+    """
+    overrides_dir = overrides_dir or DEFAULT_OVERRIDES_DIR
+    tickers = {str(t).strip() for t in extra if str(t).strip()}
+    try:
+        names = os.listdir(overrides_dir)
+    except FileNotFoundError:
+        logger.warning("Overrides directory %s not found.", overrides_dir)
+        names = []
+    for name in names:
+        m = OVERRIDES_FILE_PATTERN.match(name)
+        if m:
+            tickers.add(m.group(1))
+    return sorted(tickers)
+
+
+# =====================================================================
+# CADENCE
+# =====================================================================
+def _in_window(day, window):
+    """True if day falls in a (start_month, start_day, end_month, end_day) window."""
+    ms, ds, me, de = window
+    start, end = (ms, ds), (me, de)
+    today = (day.month, day.day)
+    if start <= end:
+        return start <= today <= end
+    return today >= start or today <= end   # window spans the new year
+
+
+def is_filing_season(day=None):
+    """True inside an annual filing season or an interim filing window."""
+    day = day or date.today()
+    windows = edinet_fetcher.ANNUAL_FILING_SEASONS + edinet_fetcher.INTERIM_WINDOWS
+    return any(_in_window(day, w) for w in windows)
+
+
+def poll_interval(day=None):
+    """Seconds until the next poll."""
+    return PEAK_POLL_INTERVAL_SEC if is_filing_season(day) else OFF_PEAK_POLL_INTERVAL_SEC
+
+
+# =====================================================================
+# STATE
+# =====================================================================
+def _state_path(cache_dir=None):
+    return os.path.join(edinet_cache.get_cache_dir(cache_dir), STATE_FILENAME)
+
+
+def load_state(cache_dir=None):
+    """Return the poll state.
+
+    Returns:
+        dict with keys:
+            'last_polled': ISO date of the last complete poll (or the submit
+                date of the oldest filing still to retry), or None.
+            'done': {docID: submit date} prefetched in the current window.
+            'failed': {docID: {'attempts': n, 'submitted': submit date}}.
+    """
+    state = {"last_polled": None, "done": {}, "failed": {}}
+    try:
+        with open(_state_path(cache_dir), encoding="utf-8") as f:
+            state.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning("Unreadable prefetch state (%s), starting over.", e)
+    return state
+
+
+def save_state(state, cache_dir=None):
+    """Write the poll state atomically."""
+    path = _state_path(cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+# =====================================================================
+# POLL
+# =====================================================================
+def poll_once(tickers, state=None, since=None, output_dir=None, source=None, today=None,
+              parse_workers=None):
+    """Sync new listings and prefetch the watchlist's new filings.
+
+    Args:
+        tickers: Ticker codes to prefetch.
+        state: Poll state from load_state(); updated in place (not saved).
+        since: First submission date to look at (default: the last poll date,
+               else FIRST_POLL_LOOKBACK_DAYS ago).
+        output_dir: Package store directory (default: tmp/edinet_data).
+        source: "xbrl" or "csv" (see edinet_fetcher.PARSE_SOURCES).
+        parse_workers: Parse worker processes (see edinet_fetcher.extract_filings).
+
+    Returns:
+        dict: Counts of the poll: dates, filings, prefetched, skipped, failed,
+        deferred (left for the next poll). Failed filings are retried by the
+        next polls until they reach MAX_ATTEMPTS.
+
+    Raises:
+        EdinetApiError: On auth failure.
+    """
+    state = state if state is not None else load_state()
+    today = today or date.today()
+    if since is None:
+        since = (date.fromisoformat(state["last_polled"]) if state.get("last_polled")
+                 else today - timedelta(days=FIRST_POLL_LOOKBACK_DAYS))
+
+    # The last poll's date is synced again: its listing may have grown since
+    synced, unsynced = edinet_fetcher.sync_filing_index(start=since, end=today)
+
+    sec_of = {t + edinet_fetcher.SEC_CODE_SUFFIX: t for t in tickers}
+    filings = edinet_index.filings_since(sec_of, since)
+    counts = {"dates": synced, "filings": len(filings), "prefetched": 0,
+              "skipped": 0, "failed": 0, "deferred": 0}
+
+    batch = []
+    for doc in filings:
+        doc_id = doc["doc_id"]
+        if (doc_id in state["done"]
+                or state["failed"].get(doc_id, {}).get("attempts", 0) >= MAX_ATTEMPTS):
+            continue
+        if len(batch) >= MAX_DOWNLOADS_PER_POLL:
+            counts["deferred"] += 1
+            continue
+        logger.info("Prefetching %s docID=%s (ticker=%s, type=%s, period=%s)",
+                    "amendment" if doc["parent_doc_id"] else "filing", doc_id,
+                    sec_of[doc["sec_code"]], doc["doc_type_code_raw"], doc["period_end"])
+        batch.append(doc)
+
+    for doc, cached, error in edinet_fetcher.prefetch_filings(
+            batch, output_dir, source=source, workers=parse_workers):
+        doc_id = doc["doc_id"]
+        if error is not None:
+            failed = state["failed"].get(doc_id, {}).get("attempts", 0)
+            state["failed"][doc_id] = {"attempts": failed + 1,
+                                       "submitted": doc["submit_date"][:10]}
+            counts["failed"] += 1
+            fetch_metrics.incr("prefetch.failed")
+            logger.warning("Prefetch of docID=%s failed (attempt %d/%d): %s",
+                           doc_id, failed + 1, MAX_ATTEMPTS, error)
+            continue
+        state["done"][doc_id] = doc["submit_date"][:10]
+        state["failed"].pop(doc_id, None)
+        counts["prefetched" if cached else "skipped"] += 1
+        fetch_metrics.incr("prefetch.filings")
+        if not doc["parent_doc_id"]:
+            edinet_index.record_filing_dates(doc["sec_code"], [doc])
+
+    # Deferred filings keep the poll window open so the next poll sees them;
+    # so do failed ones with attempts left (from their oldest submit date) and
+    # listings the sync could not fetch (from the first such date)
+    if not counts["deferred"]:
+        pending = [f["submitted"] for f in state["failed"].values()
+                   if f["attempts"] < MAX_ATTEMPTS]
+        if unsynced is not None:
+            pending.append(unsynced.isoformat())
+        window = min([today.isoformat()] + pending)
+        state["last_polled"] = window
+        # Filings submitted before the next poll window are never seen again
+        state["done"] = {d: s for d, s in state["done"].items() if s >= window}
+        state["failed"] = {d: f for d, f in state["failed"].items()
+                           if f["submitted"] >= window}
+    return counts
+
+
+def run(tickers, once=False, interval=None, output_dir=None, source=None, since=None,
+        parse_workers=None):
+    """Poll until interrupted (or once), saving the state after every poll.
+
+    Args:
+        tickers: Ticker codes to prefetch.
+        once: Poll a single time and return.
+        interval: Fixed seconds between polls (default: poll_interval()).
+        since: First submission date of the first poll (see poll_once()).
+        parse_workers: Parse worker processes (see poll_once()).
+
+    Raises:
+        edinet_cache.CacheLockTimeout: If another prefetch job is running.
+    """
+    with edinet_cache.cache_lock(DAEMON_LOCK_NAME, timeout=0):
+        state = load_state()
+        while True:
+            started = time.monotonic()
+            counts = poll_once(tickers, state, since=since, output_dir=output_dir,
+                               source=source, parse_workers=parse_workers)
+            save_state(state)
+            since = None
+            logger.info("Poll done in %.1fs: %d date(s) synced, %d new filing(s), "
+                        "%d prefetched, %d failed, %d deferred",
+                        time.monotonic() - started, counts["dates"], counts["filings"],
+                        counts["prefetched"], counts["failed"], counts["deferred"])
+            if once:
+                return counts
+            wait = interval if interval is not None else poll_interval()
+            logger.info("Next poll at %s",
+                        (datetime.now() + timedelta(seconds=wait)).strftime("%Y-%m-%d %H:%M"))
+            time.sleep(wait)
+
+
+# =====================================================================
+# CLI ENTRY POINT
+# =====================================================================
+def main():
+    """CLI interface for the prefetch job."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    import argparse
+    parser = argparse.ArgumentParser(description="Prefetch watchlist filings into the EDINET cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--tickers", nargs="*", default=[],
+                       help="Tickers to watch in addition to data/overrides")
+        p.add_argument("--overrides-dir", default=None,
+                       help="Overrides directory defining the watchlist (default: data/overrides)")
+
+    p_run = sub.add_parser("run", help="Poll for new filings until interrupted")
+    p_once = sub.add_parser("once", help="Poll once and exit (for cron)")
+    for p in (p_run, p_once):
+        common(p)
+        p.add_argument("--since", default=None,
+                       help="First submission date of the first poll (YYYY-MM-DD)")
+        p.add_argument("--output-dir", default=None, help="Package store directory")
+        p.add_argument("--source", choices=edinet_fetcher.PARSE_SOURCES, default=None,
+                       help="Fact source to pre-parse (default: $EDINET_PARSE_SOURCE or xbrl)")
+        p.add_argument("--parse-workers", type=int, default=None,
+                       help="Parse worker processes, 0 = in-process "
+                            "(default: $EDINET_PARSE_WORKERS or one per CPU)")
+        p.add_argument("--base-url", default=None,
+                       help="EDINET API root (default: $EDINET_BASE_URL or the official API)")
+    p_run.add_argument("--interval", type=int, default=None,
+                       help="Seconds between polls (default: %d in filing season, else %d)"
+                            % (PEAK_POLL_INTERVAL_SEC, OFF_PEAK_POLL_INTERVAL_SEC))
+    p_watch = sub.add_parser("watchlist", help="Show the watchlist and poll state")
+    common(p_watch)
+    args = parser.parse_args()
+
+    tickers = load_watchlist(args.overrides_dir, args.tickers)
+
+    if args.command == "watchlist":
+        state = load_state()
+        print(f"Watchlist ({len(tickers)}): {' '.join(tickers) or '-'}")
+        print(f"Last poll:     {state['last_polled'] or 'never'}")
+        print(f"Prefetched:    {len(state['done'])} docID(s) in the current window")
+        print(f"Failing:       {len(state['failed'])} docID(s)")
+        print(f"Filing season: {'yes' if is_filing_season() else 'no'} "
+              f"(poll every {poll_interval() // 60} min)")
+        return
+
+    if not tickers:
+        print("ERROR: empty watchlist (no overrides files and no --tickers).")
+        sys.exit(1)
+    if args.base_url:
+        edinet_fetcher.set_base_url(args.base_url)
+    since = date.fromisoformat(args.since) if args.since else None
+
+    try:
+        run(tickers, once=args.command == "once", interval=getattr(args, "interval", None),
+            output_dir=args.output_dir, source=args.source, since=since,
+            parse_workers=args.parse_workers)
+    except edinet_cache.CacheLockTimeout:
+        print("ERROR: another prefetch job is already running on this cache.")
+        sys.exit(1)
+    except edinet_fetcher.EdinetApiError as e:
+        print(f"\nAPI ERROR: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
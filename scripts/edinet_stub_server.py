@@ -0,0 +1,440 @@
+"""
+edinet_stub_server.py - Local stand-in for the EDINET API v2 (record / replay).
+
+Serves recorded documents.json listings and document ZIPs from a fixture
+directory, so the fetcher's search heuristics, concurrency and caching can be
+exercised and benchmarked offline and reproducibly.
+
+Fixture layout:
+    tmp/edinet_fixtures/listings/2025/2025-06-25.json     documents.json body
+    tmp/edinet_fixtures/documents/S100XXXX.type1.zip      documents/{docID}?type=1
+    tmp/edinet_fixtures/documents/S100XXXX.type5.zip      documents/{docID}?type=5
+
+A date without a listing fixture is answered with an empty `results` array
+(like a day without filings); a missing document is answered with HTTP 404.
+
+Modes:
+  serve   Replay fixtures. Optional fault injection: per-request latency
+          (--latency-ms / --jitter-ms), random HTTP 429s (--rate-429, with
+          --retry-after) and document bodies cut off mid-transfer
+          (--drop-rate) to exercise the client's backoff and resume paths.
+          Document downloads honour `Range: bytes=N-` (HTTP 206 / 416).
+  record  Proxy every request to the real API (--upstream) and store each
+          successful response as a fixture before returning it. The
+          Subscription-Key is forwarded but never written to disk.
+
+Usage:
+    python scripts/edinet_stub_server.py record --port 8089
+    python scripts/edinet_stub_server.py serve --port 8089 --latency-ms 150 --rate-429 0.05
+
+    # in another shell (separate cache dir so replays are not served locally)
+    export EDINET_BASE_URL=http://127.0.0.1:8089/api/v2
+    export EDINET_CACHE_DIR=tmp/edinet_cache_bench
+    python scripts/generate_dcf.py 2359
+
+Programmatic use (benchmarks):
+    server, base_url = start_stub_server(fixtures_dir, latency_ms=100)
+    edinet_fetcher.set_base_url(base_url)
+    ...
+    server.shutdown()
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# CONSTANTS
+# =====================================================================
+DEFAULT_FIXTURES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "tmp", "edinet_fixtures"
+)
+DEFAULT_UPSTREAM = "https://api.edinet-fsa.go.jp/api/v2"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8089
+
+# Path prefix the stand-in serves, mirroring the real API root
+API_PREFIX = "/api/v2"
+
+UPSTREAM_TIMEOUT = (10, 120)
+
+# Content-Type substrings of a document download worth recording (the check
+# edinet_fetcher applies before accepting a ZIP); anything else is an error page
+DOCUMENT_CONTENT_TYPES = ("zip", "octet-stream")
+
+
+# =====================================================================
+# FIXTURE STORE
+# =====================================================================
+def _listing_fixture(fixtures_dir, date_str):
+    return os.path.join(fixtures_dir, "listings", date_str[:4], f"{date_str}.json")
+
+
+def _document_fixture(fixtures_dir, doc_id, download_type):
+    return os.path.join(fixtures_dir, "documents", f"{doc_id}.type{download_type}.zip")
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _empty_listing(date_str):
+    """documents.json body for a date without filings."""
+    return {
+        "metadata": {
+            "title": "提出された書類を把握するためのAPI",
+            "parameter": {"date": date_str, "type": "2"},
+            "resultset": {"count": 0},
+            "processDateTime": f"{date_str} 00:00",
+            "status": "200",
+            "message": "OK",
+        },
+        "results": [],
+    }
+
+
+# =====================================================================
+# REQUEST HANDLER
+# =====================================================================
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers documents.json and documents/{docID} from the server's fixtures."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        logger.debug("%s - %s", self.address_string(), fmt % args)
+
+    # --- responses -----------------------------------------------------
+    def _send(self, status, body=b"", content_type="application/json; charset=utf-8",
+              headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        self.server.count(status)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send(status, body, headers=headers)
+
+    def _send_error_json(self, status, message):
+        self._send_json(status, {"metadata": {"status": str(status), "message": message}})
+
+    # --- dispatch ------------------------------------------------------
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        path = parts.path
+        if not path.startswith(API_PREFIX + "/"):
+            self._send_error_json(404, f"Unknown path {path}")
+            return
+        path = path[len(API_PREFIX):]
+
+        if self.server.require_key and not params.get("Subscription-Key"):
+            self._send_error_json(401, "Access denied due to invalid subscription key.")
+            return
+
+        self.server.inject_latency()
+        if self.server.inject_429():
+            self._send_rate_limited()
+            return
+
+        if path == "/documents.json":
+            self._handle_listing(params)
+        elif path.startswith("/documents/"):
+            self._handle_document(path[len("/documents/"):], params)
+        else:
+            self._send_error_json(404, f"Unknown path {path}")
+
+    do_HEAD = do_GET
+
+    def _send_rate_limited(self):
+        headers = {}
+        if self.server.retry_after is not None:
+            headers["Retry-After"] = str(self.server.retry_after)
+        self._send_json(429, {"metadata": {"status": "429", "message": "Too Many Requests"}},
+                        headers=headers)
+
+    def _handle_listing(self, params):
+        date_str = params.get("date", "")
+        try:
+            date.fromisoformat(date_str)
+        except ValueError:
+            self._send_error_json(400, f"Invalid date parameter '{date_str}'")
+            return
+
+        path = _listing_fixture(self.server.fixtures_dir, date_str)
+        if self.server.upstream and not os.path.isfile(path):
+            answer = self.server.record("documents.json", params, path)
+            if answer is None:
+                self._send_error_json(502, f"Upstream listing for {date_str} failed")
+                return
+            self._send(200, answer[0])
+            return
+
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                self._send(200, f.read())
+        else:
+            self._send_json(200, _empty_listing(date_str))
+
+    def _handle_document(self, doc_id, params):
+        download_type = params.get("type", "1")
+        if not doc_id or "/" in doc_id or not download_type.isdigit():
+            self._send_error_json(400, "Invalid document request")
+            return
+
+        path = _document_fixture(self.server.fixtures_dir, doc_id, download_type)
+        if self.server.upstream and not os.path.isfile(path):
+            answer = self.server.record(f"documents/{doc_id}", params, path,
+                                        content_types=DOCUMENT_CONTENT_TYPES)
+            if answer is None:
+                self._send_error_json(404, f"Document {doc_id} not available upstream")
+                return
+            self._send(200, *answer)
+            return
+
+        if not os.path.isfile(path):
+            self._send_error_json(404, f"Document {doc_id} (type={download_type}) not recorded")
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        self._send_document(body)
+
+    def _send_document(self, body):
+        """Send a ZIP body, honouring `Range: bytes=N-` and the drop injection."""
+        status, headers, total = 200, {"Accept-Ranges": "bytes"}, len(body)
+        range_header = self.headers.get("Range", "")
+        if range_header.startswith("bytes=") and range_header.endswith("-"):
+            start = range_header[len("bytes="):-1]
+            if start.isdigit():
+                start = int(start)
+                if start >= total:
+                    self._send(416, b"", content_type="application/octet-stream",
+                               headers={"Content-Range": f"bytes */{total}"})
+                    return
+                status = 206
+                headers["Content-Range"] = f"bytes {start}-{total - 1}/{total}"
+                body = body[start:]
+
+        if self.command != "HEAD" and len(body) > 1 and self.server.inject_drop():
+            # Promise the full body, send half of it and hang up
+            self.send_response(status)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            self.server.count("dropped")
+            return
+        self._send(status, body, content_type="application/octet-stream", headers=headers)
+
+
+# =====================================================================
+# SERVER
+# =====================================================================
+class EdinetStubServer(ThreadingHTTPServer):
+    """Threaded HTTP server replaying (or recording) EDINET fixtures.
+
+    Args:
+        address: (host, port) to bind; port 0 picks a free port.
+        fixtures_dir: Fixture root (see module docstring for the layout).
+        latency_ms: Mean delay added to every request.
+        jitter_ms: Uniform +/- spread around latency_ms.
+        rate_429: Probability (0-1) that a request is answered with HTTP 429.
+        retry_after: Retry-After seconds sent with injected 429s (None = omit).
+        drop_rate: Probability (0-1) that a document body is cut off halfway.
+        upstream: Real API root to proxy and record from (None = replay only).
+        require_key: Reject requests without a Subscription-Key (HTTP 401).
+        seed: Seed for the latency / 429 injection (reproducible runs).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, fixtures_dir=None, latency_ms=0, jitter_ms=0,
+                 rate_429=0.0, retry_after=None, drop_rate=0.0, upstream=None,
+                 require_key=True, seed=None):
+        super().__init__(address, _StubHandler)
+        self.fixtures_dir = os.path.abspath(fixtures_dir or DEFAULT_FIXTURES_DIR)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.drop_rate = drop_rate
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.require_key = require_key
+        self.status_counts = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._session = requests.Session() if self.upstream else None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def count(self, status):
+        with self._lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def inject_latency(self):
+        if self.latency_ms <= 0 and self.jitter_ms <= 0:
+            return
+        with self._lock:
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def inject_429(self):
+        if self.rate_429 <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.rate_429
+
+    def inject_drop(self):
+        if self.drop_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.drop_rate
+
+    def record(self, endpoint, params, path, content_types=None):
+        """Fetch `endpoint` from the upstream API, store it at `path`, return the answer.
+
+        Args:
+            endpoint: API path below the upstream root (e.g. "documents.json").
+            params: Query parameters to forward.
+            path: Fixture file to write.
+            content_types: Content-Type substrings of a recordable answer
+                (default: any). Other 200 answers, such as a JSON error body
+                in place of a ZIP, are passed through without being written.
+
+        Returns:
+            tuple: (body, content type) of the upstream answer, or None if it
+            was not a 200.
+        """
+        url = f"{self.upstream}/{endpoint}"
+        try:
+            resp = self._session.get(url, params=params, timeout=UPSTREAM_TIMEOUT)
+        except requests.RequestException as e:
+            logger.warning("Upstream request %s failed: %s", endpoint, e)
+            return None
+        if resp.status_code != 200:
+            logger.warning("Upstream %s answered HTTP %d, not recorded.",
+                           endpoint, resp.status_code)
+            return None
+        content_type = resp.headers.get("Content-Type", "application/octet-stream")
+        if content_types and not any(t in content_type for t in content_types):
+            logger.warning("Upstream %s answered Content-Type '%s', not recorded.",
+                           endpoint, content_type)
+            return resp.content, content_type
+        _write_atomic(path, resp.content)
+        logger.info("Recorded %s -> %s (%d bytes)", endpoint, path, len(resp.content))
+        return resp.content, content_type
+
+
+def start_stub_server(fixtures_dir=None, host=DEFAULT_HOST, port=0, **options):
+    """Start an EdinetStubServer on a background thread.
+
+    Args:
+        fixtures_dir: Fixture root (default: tmp/edinet_fixtures).
+        host: Bind address.
+        port: Bind port (0 = any free port).
+        **options: Passed to EdinetStubServer (latency_ms, rate_429, upstream, ...).
+
+    Returns:
+        tuple: (server, base_url). Call server.shutdown() when done.
+    """
+    server = EdinetStubServer((host, port), fixtures_dir=fixtures_dir, **options)
+    thread = threading.Thread(target=server.serve_forever, name="edinet-stub", daemon=True)
+    thread.start()
+    return server, server.base_url
+
+
+# =====================================================================
+# CLI ENTRY POINT
+# =====================================================================
+def main():
+    """CLI: replay or record EDINET fixtures."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Local stand-in EDINET API server")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR,
+                       help="Fixture directory (default: tmp/edinet_fixtures)")
+        p.add_argument("--host", default=DEFAULT_HOST, help="Bind address (default: 127.0.0.1)")
+        p.add_argument("--port", type=int, default=DEFAULT_PORT, help="Bind port (default: 8089)")
+
+    p_serve = sub.add_parser("serve", help="Replay recorded fixtures")
+    common(p_serve)
+    p_serve.add_argument("--latency-ms", type=float, default=0,
+                         help="Mean latency added to every request")
+    p_serve.add_argument("--jitter-ms", type=float, default=0,
+                         help="Uniform +/- spread around --latency-ms")
+    p_serve.add_argument("--rate-429", type=float, default=0.0,
+                         help="Probability of answering a request with HTTP 429")
+    p_serve.add_argument("--retry-after", type=int, default=None,
+                         help="Retry-After seconds sent with injected 429s")
+    p_serve.add_argument("--drop-rate", type=float, default=0.0,
+                         help="Probability of cutting a document download off halfway")
+    p_serve.add_argument("--seed", type=int, default=None,
+                         help="Random seed for latency / 429 injection")
+    p_serve.add_argument("--no-key", action="store_true",
+                         help="Accept requests without a Subscription-Key")
+
+    p_record = sub.add_parser("record", help="Proxy the real API and record responses")
+    common(p_record)
+    p_record.add_argument("--upstream", default=DEFAULT_UPSTREAM,
+                          help="Real API root (default: the official EDINET API v2)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "serve":
+        server = EdinetStubServer(
+            (args.host, args.port), fixtures_dir=args.fixtures,
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+            rate_429=args.rate_429, retry_after=args.retry_after, drop_rate=args.drop_rate,
+            require_key=not args.no_key, seed=args.seed,
+        )
+    else:
+        server = EdinetStubServer((args.host, args.port), fixtures_dir=args.fixtures,
+                                  upstream=args.upstream)
+
+    print(f"EDINET stand-in ({args.command}) on {server.base_url}")
+    print(f"  Fixtures: {server.fixtures_dir}")
+    print(f"  Use: export EDINET_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nResponses by status: {dict(sorted(server.status_counts.items(), key=lambda kv: str(kv[0])))}",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
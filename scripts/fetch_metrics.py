@@ -0,0 +1,291 @@
+"""
+fetch_metrics.py - Per-run cost metrics for the fetch layer.
+
+Counters and latency histograms recorded by edinet_fetcher.py, comps_fetcher.py,
+yfinance_quarterly.py and the DCF template's yfinance calls, so a slow run can
+be attributed to rate limits, large packages, retries or parsing.
+
+Metric names (dot-separated, endpoint last):
+    requests.<endpoint>          requests sent (each retry attempt counts)
+    status.<endpoint>.<code>     responses by HTTP status
+    errors.<endpoint>            network errors / exceptions
+    retries.<endpoint>           retries after a 429, 5xx or network error
+    bytes.<endpoint>             response bytes received
+    sleep_sec.<reason>           time spent sleeping (rate_limit, backoff)
+    cache.<name>.hit / .miss     listing / package / csv / extraction / facts cache lookups
+    latency.<endpoint>           histogram of request latency (seconds)
+    parse.<kind>                 histogram of parse time (seconds)
+
+Endpoints: documents.json, documents, yfinance.info, yfinance.quarterly.
+
+Usage:
+    from scripts import fetch_metrics
+    with fetch_metrics.timer("latency.yfinance.info"):
+        info = tkr.info
+    fetch_metrics.dump()      # -> tmp/metrics/run-YYYYMMDD-HHMMSS.json
+
+    python scripts/fetch_metrics.py summary tmp/metrics/*.json   # aggregate runs
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# =====================================================================
+# CONSTANTS
+# =====================================================================
+DEFAULT_METRICS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "tmp", "metrics"
+)
+
+# Histogram bucket upper bounds in seconds (the last bucket is open-ended)
+LATENCY_BUCKETS_SEC = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# =====================================================================
+# REGISTRY
+# =====================================================================
+class FetchMetrics:
+    """Thread-safe registry of counters and latency histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop everything recorded so far and restart the run clock."""
+        with self._lock:
+            self.started_at = datetime.now().isoformat(timespec="seconds")
+            self.counters = {}
+            self.histograms = {}
+
+    def incr(self, name, value=1):
+        """Add `value` (int or float) to a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        """Record one duration in a histogram."""
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = _empty_histogram()
+            _add_to_histogram(hist, seconds)
+
+    def merge(self, snap):
+        """Add the counters and histograms of a snapshot (e.g. from a worker process)."""
+        with self._lock:
+            for name, value in snap.get("counters", {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, hist in snap.get("histograms", {}).items():
+                merged = self.histograms.get(name)
+                if merged is None:
+                    merged = self.histograms[name] = _empty_histogram()
+                merged["count"] += hist["count"]
+                merged["sum"] += hist["sum"]
+                merged["max"] = max(merged["max"], hist["max"])
+                for i, n in enumerate(hist["buckets"][:len(merged["buckets"])]):
+                    merged["buckets"][i] += n
+
+    def snapshot(self):
+        """Return a JSON-serialisable copy of the current metrics."""
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "finished_at": datetime.now().isoformat(timespec="seconds"),
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: dict(hist, buckets=list(hist["buckets"]))
+                               for name, hist in sorted(self.histograms.items())},
+            }
+
+
+def _empty_histogram():
+    return {"count": 0, "sum": 0.0, "max": 0.0,
+            "buckets": [0] * (len(LATENCY_BUCKETS_SEC) + 1)}
+
+
+def _add_to_histogram(hist, seconds):
+    hist["count"] += 1
+    hist["sum"] += seconds
+    hist["max"] = max(hist["max"], seconds)
+    for i, bound in enumerate(LATENCY_BUCKETS_SEC):
+        if seconds <= bound:
+            hist["buckets"][i] += 1
+            return
+    hist["buckets"][-1] += 1
+
+
+_METRICS = FetchMetrics()
+
+
+# =====================================================================
+# RECORDING HELPERS
+# =====================================================================
+def incr(name, value=1):
+    """Add to a counter of the process-wide registry."""
+    _METRICS.incr(name, value)
+
+
+def observe(name, seconds):
+    """Record a duration in a histogram of the process-wide registry."""
+    _METRICS.observe(name, seconds)
+
+
+def merge(snap):
+    """Add a snapshot recorded in another process to the process-wide registry."""
+    _METRICS.merge(snap)
+
+
+def record_cache(name, hit):
+    """Count a cache lookup as cache.<name>.hit or cache.<name>.miss."""
+    _METRICS.incr(f"cache.{name}.{'hit' if hit else 'miss'}")
+
+
+@contextmanager
+def timer(name):
+    """Time the enclosed block into histogram `name`; exceptions count as errors.<name>."""
+    start = time.monotonic()
+    try:
+        yield
+    except Exception:
+        _METRICS.incr(f"errors.{name.split('.', 1)[-1]}")
+        raise
+    finally:
+        _METRICS.observe(name, time.monotonic() - start)
+
+
+def snapshot():
+    """Metrics recorded in this process so far."""
+    return _METRICS.snapshot()
+
+
+def reset():
+    """Start a new run (e.g. between tickers of a batch)."""
+    _METRICS.reset()
+
+
+def dump(path=None, extra=None, label="run"):
+    """Write the current snapshot as JSON.
+
+    Args:
+        path: Output file (default: tmp/metrics/{label}-YYYYMMDD-HHMMSS.json).
+        label: File name prefix used when path is not given (e.g. the ticker).
+        extra: Optional dict merged into the top level (e.g. {"ticker": "2359"}).
+
+    Returns:
+        str: Path written.
+    """
+    snap = snapshot()
+    if extra:
+        snap.update(extra)
+    if path is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(DEFAULT_METRICS_DIR, f"{label}-{stamp}.json")
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snap, f, ensure_ascii=False, indent=1)
+    return path
+
+
+# =====================================================================
+# AGGREGATION & REPORTING
+# =====================================================================
+def aggregate(snapshots):
+    """Sum counters and merge histograms of several run snapshots.
+
+    Args:
+        snapshots: Iterable of dicts from snapshot() / dumped JSON files.
+
+    Returns:
+        dict in the snapshot format plus 'runs' (number of snapshots merged).
+    """
+    total = {"runs": 0, "started_at": None, "finished_at": None,
+             "counters": {}, "histograms": {}}
+    for snap in snapshots:
+        total["runs"] += 1
+        for key, pick in (("started_at", min), ("finished_at", max)):
+            if snap.get(key):
+                total[key] = pick(filter(None, [total[key], snap[key]]))
+        for name, value in snap.get("counters", {}).items():
+            total["counters"][name] = total["counters"].get(name, 0) + value
+        for name, hist in snap.get("histograms", {}).items():
+            merged = total["histograms"].setdefault(name, _empty_histogram())
+            merged["count"] += hist["count"]
+            merged["sum"] += hist["sum"]
+            merged["max"] = max(merged["max"], hist["max"])
+            for i, n in enumerate(hist["buckets"][:len(merged["buckets"])]):
+                merged["buckets"][i] += n
+    total["counters"] = dict(sorted(total["counters"].items()))
+    total["histograms"] = dict(sorted(total["histograms"].items()))
+    return total
+
+
+def _percentile(hist, q):
+    """Upper bucket bound containing the q-quantile (inf for the open bucket)."""
+    if not hist["count"]:
+        return 0.0
+    rank = q * hist["count"]
+    seen = 0
+    for i, n in enumerate(hist["buckets"]):
+        seen += n
+        if seen >= rank:
+            return LATENCY_BUCKETS_SEC[i] if i < len(LATENCY_BUCKETS_SEC) else float("inf")
+    return float("inf")
+
+
+def format_summary(snap):
+    """Human-readable summary lines of a snapshot or aggregate."""
+    lines = []
+    if snap.get("runs"):
+        lines.append(f"  Runs:        {snap['runs']}")
+    counters = snap.get("counters", {})
+    for name, value in counters.items():
+        if isinstance(value, float):
+            lines.append(f"  {name:<40s} {value:>12.2f}")
+        else:
+            lines.append(f"  {name:<40s} {value:>12,}")
+    for name, hist in snap.get("histograms", {}).items():
+        mean = hist["sum"] / hist["count"] if hist["count"] else 0.0
+        lines.append(
+            f"  {name:<40s} n={hist['count']:<6d} mean={mean:.3f}s "
+            f"p50<={_percentile(hist, 0.5):g}s p95<={_percentile(hist, 0.95):g}s "
+            f"max={hist['max']:.3f}s"
+        )
+    return lines
+
+
+# =====================================================================
+# CLI ENTRY POINT
+# =====================================================================
+def main():
+    """CLI: aggregate dumped run metrics."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Fetch-layer run metrics")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_summary = sub.add_parser("summary", help="Aggregate and print dumped run metrics")
+    p_summary.add_argument("files", nargs="+", help="Metrics JSON files")
+    p_summary.add_argument("--json", action="store_true", help="Print the aggregate as JSON")
+    args = parser.parse_args()
+
+    snapshots = []
+    for path in args.files:
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"WARNING: skipping {path}: {e}", file=sys.stderr)
+
+    total = aggregate(snapshots)
+    if args.json:
+        print(json.dumps(total, ensure_ascii=False, indent=1))
+    else:
+        print("\n".join(format_summary(total)))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,12 @@ Usage:
     python scripts/generate_dcf.py 2359
     python scripts/generate_dcf.py 2359 --years 3
     python scripts/generate_dcf.py 2359 --output-dir output
+    python scripts/generate_dcf.py 2359 --refresh   # re-download EDINET packages
+    python scripts/generate_dcf.py 2359 --metrics-out tmp/metrics/2359.json
+
+Fetch-layer metrics (requests, latency, bytes, retries, sleeps, cache hits) are
+written to tmp/metrics/ at the end of every run; aggregate a batch with
+    python scripts/fetch_metrics.py summary tmp/metrics/*.json
 """
 
 import argparse
@@ -21,6 +27,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from scripts.edinet_fetcher import fetch_and_parse_multi_year, fetch_tanshin
 from scripts.comps_fetcher import get_comps_data
+from scripts import fetch_metrics
 from scripts.yfinance_quarterly import enrich_merged_data_with_yfinance
 from templates.dcf_comps_template import generate_dcf_workbook, get_live_market_data
 
@@ -422,6 +429,10 @@ def main():
                         help="Path to JSON override file (e.g. data/overrides/2359_overrides.json)")
     parser.add_argument("--force", action="store_true",
                         help="Overwrite existing output file without warning")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Re-download EDINET packages even if they are cached")
+    parser.add_argument("--metrics-out", default=None,
+                        help="Path for the fetch metrics JSON (default: tmp/metrics/<ticker>-<timestamp>.json)")
     args = parser.parse_args()
 
     ticker_code = args.ticker.strip()
@@ -447,7 +458,8 @@ def main():
 
     # Step 1: EDINET fetch + parse
     print(f"\n[Step 1/7] Fetching {num_years} years of financial data from EDINET...")
-    company_info, merged_data = fetch_and_parse_multi_year(ticker_code, num_years)
+    company_info, merged_data = fetch_and_parse_multi_year(ticker_code, num_years,
+                                                           refresh=args.refresh)
 
     # Step 2: Check LTM coverage, yfinance fallback if needed
     print(f"\n[Step 2/7] Checking LTM data coverage...")
@@ -462,22 +474,45 @@ def main():
     print(f"\n[Step 3/7] Extracting company guidance (業績予想)...")
     forecast_data = None
     try:
-        from scripts.edinet_parser import parse_xbrl_file, extract_forecast_data
+        from scripts.edinet_parser import (
+            parse_xbrl_cached, extract_forecast_data, extract_company_info, ixbrl_members,
+        )
     except ImportError:
-        from edinet_parser import parse_xbrl_file, extract_forecast_data
+        from edinet_parser import (
+            parse_xbrl_cached, extract_forecast_data, extract_company_info, ixbrl_members,
+        )
 
-    # Try extracting forecasts from already-downloaded XBRL files first
-    import glob
-    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    edinet_cache = os.path.join(project_root, "tmp", "edinet_data")
-    xbrl_candidates = glob.glob(os.path.join(edinet_cache, "**", "*.xbrl"), recursive=True)
-    for xbrl_path in xbrl_candidates:
+    # Try extracting forecasts from this company's already-downloaded XBRL
+    # files first (each one parsed at most once — later runs read the fact
+    # cache). EDINET member names carry the filer's EDINET code, so other
+    # companies' packages are skipped without reading them.
+    from scripts import edinet_cache
+    edinet_code = company_info.get("edinet_code")
+    sec_code = ticker_4digit + "0"
+
+    def xbrl_candidates():
+        for pkg in edinet_cache.list_packages():
+            if edinet_code and not any(f"_{edinet_code}-" in n for n in pkg["members"]):
+                continue
+            members = edinet_cache.read_package(pkg["path"], touch=False) or []
+            instances = [(n, d) for n, d in members if n.lower().endswith(".xbrl")]
+            for name, data in instances:
+                yield name, "xbrl", data
+            # Inline XBRL-only packages: the *_ixbrl.htm set is one document
+            inline = set(ixbrl_members([n for n, _ in members])) if not instances else ()
+            if inline:
+                docs = [(n, d) for n, d in members if n in inline]
+                yield docs[0][0], "ixbrl", docs
+
+    for xbrl_name, kind, payload in xbrl_candidates():
         try:
-            soup = parse_xbrl_file(xbrl_path)
-            fd = extract_forecast_data(soup)
+            facts = parse_xbrl_cached(payload, kind)
+            if extract_company_info(facts).get("securities_code") != sec_code:
+                continue
+            fd = extract_forecast_data(facts)
             if fd and fd.get("forecast_revenue"):
                 forecast_data = fd
-                print(f"  Found guidance in: {os.path.basename(xbrl_path)}")
+                print(f"  Found guidance in: {xbrl_name.rsplit('/', 1)[-1]}")
                 print(f"    Revenue forecast: {fd['forecast_revenue']:,.0f} mn")
                 if fd.get("forecast_operating_income"):
                     print(f"    OI forecast:     {fd['forecast_operating_income']:,.0f} mn")
@@ -489,7 +524,7 @@ def main():
     if not forecast_data:
         print("  No guidance in existing XBRL. Trying fetch_tanshin...")
         try:
-            tanshin_result = fetch_tanshin(ticker_code)
+            tanshin_result = fetch_tanshin(ticker_code, refresh=args.refresh)
             if tanshin_result:
                 forecast_data = tanshin_result["forecast_data"]
                 print(f"  Found guidance in tanshin docID={tanshin_result['doc_id']}")
@@ -557,9 +592,10 @@ def main():
     # Step 5: Fetch live market data via yfinance (price, shares, beta)
     print(f"\n[Step 5/7] Fetching market data...")
     ticker_str = config["ticker"]
-    config["current_price"], config["shares_outstanding"], live_beta = get_live_market_data(
-        ticker_str, config["current_price"], config["shares_outstanding"]
-    )
+    with fetch_metrics.timer("latency.yfinance.info"):
+        config["current_price"], config["shares_outstanding"], live_beta = get_live_market_data(
+            ticker_str, config["current_price"], config["shares_outstanding"]
+        )
     config["beta"] = live_beta  # raw value; template normalizes to [0.6, 1.5]
 
     # Override shares from overrides["shares"] (single source of truth)
@@ -645,6 +681,13 @@ def main():
     print(f"  Proj Start: {config['projection_start_fy']}")
     print(f"  Comps:      {len(config['comps'])} companies")
 
+    # Fetch-layer metrics for this run
+    metrics_path = fetch_metrics.dump(args.metrics_out, extra={"ticker": ticker_code},
+                                      label=ticker_code)
+    print(f"\nFetch metrics ({metrics_path}):")
+    for line in fetch_metrics.format_summary(fetch_metrics.snapshot()):
+        print(line)
+
 
 if __name__ == "__main__":
     main()
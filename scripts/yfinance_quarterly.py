@@ -15,6 +15,11 @@ from datetime import date
 
 import yfinance as yf
 
+try:
+    from scripts import fetch_metrics
+except ImportError:
+    import fetch_metrics
+
 # =====================================================================
 # yfinance → EDINET key mappings
 # =====================================================================
@@ -192,7 +197,8 @@ def fetch_yf_quarterly(ticker_str):
 
     # --- Income Statement ---
     try:
-        qf = tkr.quarterly_financials
+        with fetch_metrics.timer("latency.yfinance.quarterly"):
+            qf = tkr.quarterly_financials
         if qf is not None and not qf.empty:
             _extract_from_df(qf, IS_MAP, quarters, is_flow=True)
     except Exception as e:
@@ -200,7 +206,8 @@ def fetch_yf_quarterly(ticker_str):
 
     # --- Cash Flow ---
     try:
-        qcf = tkr.quarterly_cashflow
+        with fetch_metrics.timer("latency.yfinance.quarterly"):
+            qcf = tkr.quarterly_cashflow
         if qcf is not None and not qcf.empty:
             _extract_from_df(qcf, CF_MAP, quarters, is_flow=True)
     except Exception as e:
@@ -208,7 +215,8 @@ def fetch_yf_quarterly(ticker_str):
 
     # --- Balance Sheet ---
     try:
-        qbs = tkr.quarterly_balance_sheet
+        with fetch_metrics.timer("latency.yfinance.quarterly"):
+            qbs = tkr.quarterly_balance_sheet
         if qbs is not None and not qbs.empty:
             _extract_from_df(qbs, BS_MAP, quarters, is_flow=False)
     except Exception as e:
@@ -0,0 +1,80 @@
+"""Parity of the XBRL-to-CSV (type=5) fact source with the XBRL instance.
+
+Each fixture pair under tests/fixtures is one small filing as an instance
+(.xbrl) and as its EDINET XBRL-to-CSV file (.csv, UTF-16). Extraction must
+not depend on which of the two a filing was loaded from.
+
+Run with:  python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.edinet_parser import (  # noqa: E402
+    parse_xbrl_file,
+    parse_xbrl_csv,
+    parse_xbrl_stream,
+    identify_clean_contexts,
+    identify_quarterly_contexts,
+    extract_financial_data,
+    extract_quarterly_data,
+    extract_company_info,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _load(name):
+    """(instance soup, streamed instance, CSV facts) of a fixture filing."""
+    instance = os.path.join(FIXTURES_DIR, f"{name}.xbrl")
+    return (parse_xbrl_file(instance), parse_xbrl_stream(instance),
+            parse_xbrl_csv(os.path.join(FIXTURES_DIR, f"{name}.csv")))
+
+
+@pytest.mark.parametrize("name, suffix", [
+    ("asr_consolidated", ""),
+    ("asr_nonconsolidated", "_NonConsolidatedMember"),
+])
+def test_annual_parity(name, suffix):
+    soup, streamed, csv_facts = _load(name)
+
+    contexts = identify_clean_contexts(soup)
+    assert contexts["current_duration"] == f"CurrentYearDuration{suffix}"
+    assert contexts["prior1_instant"] == f"Prior1YearInstant{suffix}"
+
+    expected = extract_financial_data(soup, contexts)
+    assert expected["current"]["revenue"] == 10_000.0
+    assert expected["prior1"]["revenue"] == 9_000.0
+    assert expected["current"]["accounts_receivable"] == 1_500.0
+    assert expected["current"]["total_debt"] == 1_500.0
+
+    for facts in (streamed, csv_facts):
+        assert identify_clean_contexts(facts) == contexts
+        assert extract_financial_data(facts, contexts) == expected
+        assert extract_company_info(facts) == extract_company_info(soup)
+
+
+@pytest.mark.parametrize("name, suffix", [
+    ("q3r_consolidated", ""),
+    ("q3r_nonconsolidated", "_NonConsolidatedMember"),
+])
+def test_quarterly_parity(name, suffix):
+    soup, streamed, csv_facts = _load(name)
+
+    q_contexts = identify_quarterly_contexts(soup)
+    assert q_contexts["quarter_number"] == 3
+    assert q_contexts["period_end"] == "2024-12-31"
+    assert q_contexts["current_accumulated_duration"] == f"CurrentAccumulatedQ3Duration{suffix}"
+
+    expected = extract_quarterly_data(soup, q_contexts)
+    assert expected["current_cumulative"]["revenue"] == 7_800.0
+    assert expected["prior1_cumulative"]["revenue"] == 7_100.0
+    assert expected["current_instant"]["cash"] == 2_600.0
+
+    for facts in (streamed, csv_facts):
+        assert identify_quarterly_contexts(facts) == q_contexts
+        assert extract_quarterly_data(facts, q_contexts) == expected
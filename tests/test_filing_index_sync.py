@@ -0,0 +1,63 @@
+"""Filing index sync must not record a date whose listing failed to download.
+
+Run with:  python -m pytest tests
+"""
+
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import edinet_fetcher, edinet_index  # noqa: E402
+from scripts.edinet_fetcher import EdinetNetworkError  # noqa: E402
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, results):
+        self._results = results
+        self.content = b"{}"
+
+    def json(self):
+        return {"results": self._results}
+
+
+class _FlakyClient:
+    """Answers documents.json with no filings, except for the dates in `failing`."""
+
+    def __init__(self, failing):
+        self.failing = set(failing)
+
+    def get(self, endpoint, url, params=None, **kwargs):
+        if params["date"] in self.failing:
+            raise EdinetNetworkError(f"Connection reset on {params['date']}")
+        return _Response([])
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("EDINET_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("EDINET_API_KEY", "test-key")
+    return tmp_path
+
+
+def test_network_error_leaves_date_missing(cache_dir, monkeypatch):
+    # Mon 2025-06-02 .. Fri 2025-06-06; the Wednesday listing fails
+    start, end = date(2025, 6, 2), date(2025, 6, 6)
+    monkeypatch.setattr(edinet_fetcher, "get_client", lambda: _FlakyClient({"2025-06-04"}))
+
+    synced, stopped_at = edinet_fetcher.sync_filing_index(start=start, end=end)
+
+    assert (synced, stopped_at) == (2, date(2025, 6, 4))
+    assert edinet_index.missing_dates(start, end) == [
+        date(2025, 6, 4), date(2025, 6, 5), date(2025, 6, 6)]
+    assert not edinet_index.covers(start, end)
+
+    # The next sync fetches the failed date again and completes the range
+    monkeypatch.setattr(edinet_fetcher, "get_client", lambda: _FlakyClient(()))
+    assert edinet_fetcher.sync_filing_index(start=start, end=end) == (3, None)
+    assert edinet_index.missing_dates(start, end) == []